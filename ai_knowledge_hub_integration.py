@@ -20,12 +20,17 @@ from typing import Dict, List, Any, Optional
 from datetime import datetime
 import hashlib
 import re
+import time
 import sqlite3
 from dataclasses import dataclass, asdict
 import whisper
-import PyPDF2
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).resolve().parent / "scripts" / "utilities"))
+from audio_cache import AudioCache
+from pdf_extractor import PDFTextExtractor
+from keyword_matcher import KeywordMatcher
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -37,6 +42,60 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Long transcripts are indexed as several sections of at most this many
+# characters, so every part of the text is searchable
+SEARCH_SECTION_CHARS = 5000
+
+TOPIC_KEYWORDS = {
+    'crm': ['customer relationship', 'sales pipeline', 'lead management', 'opportunity', 'contact'],
+    'bpm': ['business process', 'workflow', 'automation', 'process optimization'],
+    'integration': ['api', 'integration', 'connector', 'webhook', 'data sync'],
+    'development': ['development', 'coding', 'programming', 'javascript', 'c#'],
+    'configuration': ['configuration', 'setup', 'customization', 'settings'],
+    'ui_ux': ['user interface', 'user experience', 'design', 'layout', 'form'],
+    'database': ['database', 'sql', 'entity', 'schema', 'query']
+}
+
+COMPLEXITY_TERMS = {
+    'advanced': ['advanced', 'complex', 'enterprise', 'architecture', 'integration'],
+    'intermediate': ['configuration', 'customization', 'workflow', 'api'],
+    'beginner': ['introduction', 'basic', 'getting started', 'overview', 'simple']
+}
+
+# Patterns for different types of commands
+COMMAND_PATTERNS = [
+    re.compile(r'\b\w+\.\w+\([^)]*\)', re.IGNORECASE | re.MULTILINE),  # Method calls
+    re.compile(r'\$\w+\s+[^$\n]+', re.IGNORECASE | re.MULTILINE),      # Command line
+]
+
+# SQL statements always end at a ';'. The CREATE pattern was written
+# \w+[^;]+, which matches the same text as \w[^;]+ but backtracks through
+# every word character when no ';' follows
+SQL_PATTERNS = [
+    re.compile(r'CREATE\s+\w[^;]+;', re.IGNORECASE | re.MULTILINE),   # SQL CREATE
+    re.compile(r'SELECT\s+[^;]+;', re.IGNORECASE | re.MULTILINE),      # SQL SELECT
+    re.compile(r'UPDATE\s+[^;]+;', re.IGNORECASE | re.MULTILINE),      # SQL UPDATE
+    re.compile(r'INSERT\s+[^;]+;', re.IGNORECASE | re.MULTILINE),      # SQL INSERT
+]
+
+# Each alternative matches a whole word, and no word ends in two of the
+# suffixes, so one combined pattern finds exactly what three separate
+# \b\w+API\b, \b\w+Service\b and \b\w+Manager\b passes found
+API_NAME_PATTERN = re.compile(r'\b\w+(?:API|Service|Manager)\b', re.IGNORECASE)
+
+API_URL_PATTERNS = [
+    re.compile(r'/api/\w+/[^/\s]+', re.IGNORECASE),
+    re.compile(r'https?://[^/\s]+/api/[^\s]+', re.IGNORECASE),
+]
+
+# Simple extraction of code-like blocks
+CODE_PATTERNS = [
+    (re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL | re.IGNORECASE), 'code_block'),
+    (re.compile(r'`([^`\n]+)`', re.DOTALL | re.IGNORECASE), 'inline_code'),
+    (re.compile(r'function\s+\w+\s*\([^)]*\)\s*{[^}]+}', re.DOTALL | re.IGNORECASE), 'javascript_function'),
+    (re.compile(r'public\s+\w+\s+\w+\s*\([^)]*\)\s*{[^}]+}', re.DOTALL | re.IGNORECASE), 'csharp_method'),
+]
+
 @dataclass
 class VideoContent:
     """Data class for video content"""
@@ -86,14 +145,55 @@ class AIKnowledgeHubIntegrator:
         
         # Initialize Whisper model for video processing
         self.whisper_model = None
+        self._audio_cache = None
+        
+        # Timing and size of the last search index load
+        self.index_load_stats = None
+        
+        # Topic and complexity keywords are matched once per document
+        self.keyword_matcher = KeywordMatcher([TOPIC_KEYWORDS, COMPLEXITY_TERMS])
+        
+        # Pages of each PDF are extracted in parallel; image-only pages are OCRed
+        self.pdf_extractor = PDFTextExtractor()
+    
+    @property
+    def audio_cache(self) -> AudioCache:
+        """Audio extraction cache shared with the other transcribers, opened on first use"""
+        if self._audio_cache is None:
+            self._audio_cache = AudioCache()
+        return self._audio_cache
+    
+    def connect_database(self) -> sqlite3.Connection:
+        """Open the knowledge hub database in WAL mode"""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last transaction on power loss, never corruption
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
         
     def initialize_database(self):
         """Initialize SQLite database for searchable content"""
         logger.info("Initializing knowledge hub database...")
         
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect_database()
         cursor = conn.cursor()
         
+        # Databases from earlier versions appended duplicate rows to an unkeyed
+        # search_index and a separate FTS table; both hold derived data only, so
+        # they are dropped and rebuilt on the next load
+        search_columns = [row[1] for row in cursor.execute("PRAGMA table_info(search_index)")]
+        if search_columns and 'section_index' not in search_columns:
+            logger.info("Upgrading search index schema (index will be rebuilt)...")
+            cursor.execute("DROP TABLE IF EXISTS search_fts")
+            cursor.execute("DROP TABLE search_index")
+        fts_sql = cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'search_fts'"
+        ).fetchone()
+        if fts_sql and "content='search_fts_content'" not in fts_sql[0]:
+            cursor.execute("DROP TABLE search_fts")
+            for trigger in ('search_index_insert', 'search_index_delete', 'search_index_update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        
         # Create tables
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS videos (
@@ -133,11 +233,13 @@ class AIKnowledgeHubIntegrator:
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 content_type TEXT,
                 content_id TEXT,
+                section_index INTEGER DEFAULT 0,
                 section TEXT,
                 content TEXT,
                 keywords TEXT,
                 relevance_score REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (content_type, content_id, section_index)
             )
         ''')
         
@@ -155,16 +257,64 @@ class AIKnowledgeHubIntegrator:
             )
         ''')
         
-        # Create full-text search virtual tables
+        # One row per command and source, so reloading a source updates its commands
+        cursor.execute('''
+            DELETE FROM commands WHERE id NOT IN (
+                SELECT MIN(id) FROM commands GROUP BY command, source_type, source_id
+            )
+        ''')
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_commands_source
+            ON commands (command, source_type, source_id)
+        ''')
+        
+        # Create full-text search virtual table over search_index; the text is
+        # stored once, in search_index, and the triggers keep the index in sync.
+        # The MCP servers query the section heading as search_fts.title, so the
+        # FTS table reads search_index through a view that exposes it under that name
+        fts_exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'search_fts'"
+        ).fetchone()
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS search_fts_content AS
+            SELECT id, content_type, content_id, section AS title, content, keywords, relevance_score
+            FROM search_index
+        ''')
         cursor.execute('''
             CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
                 content_type,
                 content_id,
                 title,
                 content,
-                keywords
+                keywords,
+                relevance_score UNINDEXED,
+                content='search_fts_content',
+                content_rowid='id'
             )
         ''')
+        if not fts_exists:
+            cursor.execute("INSERT INTO search_fts (search_fts) VALUES ('rebuild')")
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS search_index_insert AFTER INSERT ON search_index BEGIN
+                INSERT INTO search_fts (rowid, content_type, content_id, title, content, keywords, relevance_score)
+                VALUES (new.id, new.content_type, new.content_id, new.section, new.content, new.keywords, new.relevance_score);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS search_index_delete AFTER DELETE ON search_index BEGIN
+                INSERT INTO search_fts (search_fts, rowid, content_type, content_id, title, content, keywords, relevance_score)
+                VALUES ('delete', old.id, old.content_type, old.content_id, old.section, old.content, old.keywords, old.relevance_score);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS search_index_update AFTER UPDATE ON search_index BEGIN
+                INSERT INTO search_fts (search_fts, rowid, content_type, content_id, title, content, keywords, relevance_score)
+                VALUES ('delete', old.id, old.content_type, old.content_id, old.section, old.content, old.keywords, old.relevance_score);
+                INSERT INTO search_fts (rowid, content_type, content_id, title, content, keywords, relevance_score)
+                VALUES (new.id, new.content_type, new.content_id, new.section, new.content, new.keywords, new.relevance_score);
+            END
+        ''')
         
         conn.commit()
         conn.close()
@@ -215,7 +365,7 @@ class AIKnowledgeHubIntegrator:
             # Transcribe using Whisper
             logger.info(f"Transcribing {video_file.name}...")
             self.load_whisper_model()
-            result = self.whisper_model.transcribe(str(video_file))
+            result = self.whisper_model.transcribe(self.audio_cache.load_audio(video_file))
             transcript = result["text"]
         
         # Extract video metadata
@@ -223,11 +373,7 @@ class AIKnowledgeHubIntegrator:
         duration = self.get_video_duration(video_file)
         
         # Analyze content
-        topics = self.extract_topics(transcript)
-        commands = self.extract_commands(transcript)
-        api_references = self.extract_api_references(transcript)
-        code_examples = self.extract_code_examples(transcript)
-        complexity_level = self.assess_complexity(transcript)
+        features = self.extract_content_features(transcript)
         summary = self.generate_summary(transcript)
         
         return VideoContent(
@@ -237,11 +383,11 @@ class AIKnowledgeHubIntegrator:
             duration=duration,
             transcript=transcript,
             summary=summary,
-            topics=topics,
-            complexity_level=complexity_level,
-            commands=commands,
-            api_references=api_references,
-            code_examples=code_examples
+            topics=features['topics'],
+            complexity_level=features['complexity_level'],
+            commands=features['commands'],
+            api_references=features['api_references'],
+            code_examples=features['code_examples']
         )
     
     def process_pdf_transcripts(self) -> List[PDFContent]:
@@ -253,15 +399,18 @@ class AIKnowledgeHubIntegrator:
         
         processed_pdfs = []
         
-        for pdf_file in pdf_files:
-            try:
-                logger.info(f"Processing PDF: {pdf_file.name}")
-                pdf_content = self.process_single_pdf(pdf_file)
-                if pdf_content:
-                    processed_pdfs.append(pdf_content)
-                    self.save_processed_pdf(pdf_content)
-            except Exception as e:
-                logger.error(f"Error processing PDF {pdf_file.name}: {e}")
+        try:
+            for pdf_file in pdf_files:
+                try:
+                    logger.info(f"Processing PDF: {pdf_file.name}")
+                    pdf_content = self.process_single_pdf(pdf_file)
+                    if pdf_content:
+                        processed_pdfs.append(pdf_content)
+                        self.save_processed_pdf(pdf_content)
+                except Exception as e:
+                    logger.error(f"Error processing PDF {pdf_file.name}: {e}")
+        finally:
+            self.pdf_extractor.close()
         
         logger.info(f"Successfully processed {len(processed_pdfs)} PDFs")
         return processed_pdfs
@@ -271,28 +420,20 @@ class AIKnowledgeHubIntegrator:
         pdf_id = self.generate_id(str(pdf_file))
         
         try:
-            with open(pdf_file, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                page_count = len(pdf_reader.pages)
-                
-                # Extract text from all pages
-                content = ""
-                sections = []
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    content += page_text + "\n"
-                    
-                    # Extract sections (simple heuristic based on headers)
-                    page_sections = self.extract_sections_from_page(page_text, page_num)
-                    sections.extend(page_sections)
-        
+            extraction = self.pdf_extractor.extract(pdf_file)
+            page_count = extraction.page_count
+            content = extraction.text
+            logger.info(f"Extracted {page_count} pages ({len(extraction.ocr_pages)} OCRed) "
+                        f"at {extraction.pages_per_second:.1f} pages/sec")
+            
+            # Extract sections (simple heuristic based on headers)
+            sections = []
+            for page_num, page_text in enumerate(extraction.pages):
+                sections.extend(self.extract_sections_from_page(page_text, page_num))
+            
             # Extract metadata and analyze content
             title = self.extract_title_from_filename(pdf_file.name)
-            topics = self.extract_topics(content)
-            commands = self.extract_commands(content)
-            api_references = self.extract_api_references(content)
-            code_examples = self.extract_code_examples(content)
+            features = self.extract_content_features(content)
             
             return PDFContent(
                 pdf_id=pdf_id,
@@ -301,79 +442,161 @@ class AIKnowledgeHubIntegrator:
                 page_count=page_count,
                 content=content,
                 sections=sections,
-                topics=topics,
-                commands=commands,
-                api_references=api_references,
-                code_examples=code_examples
+                topics=features['topics'],
+                commands=features['commands'],
+                api_references=features['api_references'],
+                code_examples=features['code_examples']
             )
             
         except Exception as e:
             logger.error(f"Error processing PDF {pdf_file.name}: {e}")
             return None
     
-    def create_searchable_index(self, videos: List[VideoContent], pdfs: List[PDFContent]):
-        """Create searchable documentation index"""
-        logger.info("Creating searchable documentation index...")
+    def create_searchable_index(self, videos: List[VideoContent], pdfs: List[PDFContent]) -> Dict[str, Any]:
+        """
+        Create searchable documentation index
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        Loads everything in one transaction. Rows are upserted by content id,
+        so rerunning on the same content leaves the database unchanged.
         
-        # Index video content
-        for video in videos:
-            # Store main video data
-            cursor.execute('''
-                INSERT OR REPLACE INTO videos 
-                (id, file_path, title, duration, transcript, summary, topics, 
-                 complexity_level, commands, api_references, code_examples)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        Returns:
+            Load statistics (rows, seconds, database size)
+        """
+        logger.info("Creating searchable documentation index...")
+        start = time.perf_counter()
+        
+        video_rows = [
+            (
                 video.video_id, video.file_path, video.title, video.duration,
                 video.transcript, video.summary, json.dumps(video.topics),
                 video.complexity_level, json.dumps(video.commands),
                 json.dumps(video.api_references), json.dumps(video.code_examples)
-            ))
-            
-            # Add to search index
-            self.add_to_search_index(cursor, 'video', video.video_id, video.title, video.transcript, video.topics)
-            
-            # Index commands
-            for command in video.commands:
-                self.add_command_to_index(cursor, command, 'video', video.video_id, video.title)
-        
-        # Index PDF content
-        for pdf in pdfs:
-            # Store main PDF data
-            cursor.execute('''
-                INSERT OR REPLACE INTO pdfs 
-                (id, file_path, title, page_count, content, sections, topics, 
-                 commands, api_references, code_examples)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            )
+            for video in videos
+        ]
+        pdf_rows = [
+            (
                 pdf.pdf_id, pdf.file_path, pdf.title, pdf.page_count,
                 pdf.content, json.dumps(pdf.sections), json.dumps(pdf.topics),
                 json.dumps(pdf.commands), json.dumps(pdf.api_references),
                 json.dumps(pdf.code_examples)
-            ))
-            
-            # Add to search index
-            self.add_to_search_index(cursor, 'pdf', pdf.pdf_id, pdf.title, pdf.content, pdf.topics)
-            
+            )
+            for pdf in pdfs
+        ]
+        
+        # Search sections: full text, split into SEARCH_SECTION_CHARS pieces
+        search_entries = {}
+        for video in videos:
+            search_entries[('video', video.video_id)] = self.build_search_rows(
+                'video', video.video_id, [(video.title, video.transcript)], video.topics)
+        for pdf in pdfs:
+            search_entries[('pdf', pdf.pdf_id)] = self.build_search_rows(
+                'pdf', pdf.pdf_id, [(pdf.title, pdf.content)], pdf.topics)
             # Index sections separately for better granular search
-            for section in pdf.sections:
-                self.add_to_search_index(cursor, 'pdf_section', pdf.pdf_id, 
-                                       section.get('title', ''), section.get('content', ''), [])
+            search_entries[('pdf_section', pdf.pdf_id)] = self.build_search_rows(
+                'pdf_section', pdf.pdf_id,
+                [(section.get('title', ''), section.get('content', '')) for section in pdf.sections], [])
+        
+        command_rows = {}
+        for source_type, source_id, commands in (
+            [('video', video.video_id, video.commands) for video in videos] +
+            [('pdf', pdf.pdf_id, pdf.commands) for pdf in pdfs]
+        ):
+            for command in commands:
+                command_rows[(command, source_type, source_id)] = self.build_command_row(
+                    command, source_type, source_id)
+        
+        conn = self.connect_database()
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO videos 
+                    (id, file_path, title, duration, transcript, summary, topics, 
+                     complexity_level, commands, api_references, code_examples)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', video_rows)
+                
+                conn.executemany('''
+                    INSERT OR REPLACE INTO pdfs 
+                    (id, file_path, title, page_count, content, sections, topics, 
+                     commands, api_references, code_examples)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', pdf_rows)
+                
+                # Unchanged sections are left alone, so their FTS entries are not rewritten
+                conn.executemany('''
+                    INSERT INTO search_index 
+                    (content_type, content_id, section_index, section, content, keywords, relevance_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (content_type, content_id, section_index) DO UPDATE SET
+                        section = excluded.section,
+                        content = excluded.content,
+                        keywords = excluded.keywords,
+                        relevance_score = excluded.relevance_score
+                    WHERE section IS NOT excluded.section
+                        OR content IS NOT excluded.content
+                        OR keywords IS NOT excluded.keywords
+                        OR relevance_score IS NOT excluded.relevance_score
+                ''', [row for rows in search_entries.values() for row in rows])
+                
+                # Drop sections left over from a longer previous version of the content
+                conn.executemany('''
+                    DELETE FROM search_index
+                    WHERE content_type = ? AND content_id = ? AND section_index >= ?
+                ''', [(content_type, content_id, len(rows))
+                      for (content_type, content_id), rows in search_entries.items()])
+                
+                conn.executemany('''
+                    INSERT INTO commands 
+                    (command, description, category, source_type, source_id, examples, parameters)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (command, source_type, source_id) DO UPDATE SET
+                        description = excluded.description,
+                        category = excluded.category,
+                        examples = excluded.examples,
+                        parameters = excluded.parameters
+                ''', list(command_rows.values()))
+                
+                # Drop commands no longer found in a reloaded source
+                loaded_sources = {(source_type, source_id) for _, source_type, source_id in command_rows}
+                loaded_sources.update(('video', video.video_id) for video in videos)
+                loaded_sources.update(('pdf', pdf.pdf_id) for pdf in pdfs)
+                stale_ids = [
+                    (command_id,)
+                    for command_id, command, source_type, source_id in conn.execute(
+                        "SELECT id, command, source_type, source_id FROM commands"
+                    )
+                    if (source_type, source_id) in loaded_sources
+                    and (command, source_type, source_id) not in command_rows
+                ]
+                conn.executemany("DELETE FROM commands WHERE id = ?", stale_ids)
+                
+                # Merge the FTS segments written by this load
+                conn.execute("INSERT INTO search_fts (search_fts) VALUES ('optimize')")
             
-            # Index commands
-            for command in pdf.commands:
-                self.add_command_to_index(cursor, command, 'pdf', pdf.pdf_id, pdf.title)
-        
-        conn.commit()
-        conn.close()
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+        
+        self.index_load_stats = {
+            'videos': len(video_rows),
+            'pdfs': len(pdf_rows),
+            'search_sections': sum(len(rows) for rows in search_entries.values()),
+            'commands': len(command_rows),
+            'load_seconds': round(time.perf_counter() - start, 3),
+            'database_bytes': self.db_path.stat().st_size
+        }
+        logger.info(
+            f"Loaded {self.index_load_stats['search_sections']} search sections and "
+            f"{self.index_load_stats['commands']} commands in {self.index_load_stats['load_seconds']}s; "
+            f"database size {self.index_load_stats['database_bytes'] / (1024 * 1024):.1f} MB"
+        )
         
         # Create search index files
         self.create_search_index_files(videos, pdfs)
         
         logger.info("Searchable index created successfully")
+        return self.index_load_stats
     
     def build_command_reference(self, videos: List[VideoContent], pdfs: List[PDFContent]):
         """Build comprehensive command reference from developer course"""
@@ -506,81 +729,52 @@ class AIKnowledgeHubIntegrator:
         # This is a placeholder - in real implementation, use ffprobe
         return 0.0
     
+    def extract_content_features(self, content: str) -> Dict[str, Any]:
+        """Extract topics, commands, API references, code examples and complexity"""
+        matches = self.keyword_matcher.match(content)
+        return {
+            'topics': matches.labels(TOPIC_KEYWORDS),
+            'commands': self.extract_commands(content),
+            'api_references': self.extract_api_references(content),
+            'code_examples': self.extract_code_examples(content),
+            'complexity_level': self.assess_complexity(content)
+        }
+    
     def extract_topics(self, content: str) -> List[str]:
         """Extract topics from content using keyword matching"""
-        topics = []
-        content_lower = content.lower()
-        
-        topic_keywords = {
-            'crm': ['customer relationship', 'sales pipeline', 'lead management', 'opportunity', 'contact'],
-            'bpm': ['business process', 'workflow', 'automation', 'process optimization'],
-            'integration': ['api', 'integration', 'connector', 'webhook', 'data sync'],
-            'development': ['development', 'coding', 'programming', 'javascript', 'c#'],
-            'configuration': ['configuration', 'setup', 'customization', 'settings'],
-            'ui_ux': ['user interface', 'user experience', 'design', 'layout', 'form'],
-            'database': ['database', 'sql', 'entity', 'schema', 'query']
-        }
-        
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                topics.append(topic)
-        
-        return topics
+        return self.keyword_matcher.match(content).labels(TOPIC_KEYWORDS)
     
     def extract_commands(self, content: str) -> List[str]:
         """Extract commands and code snippets from content"""
         commands = []
+        for pattern in COMMAND_PATTERNS:
+            commands.extend(pattern.findall(content))
         
-        # Patterns for different types of commands
-        patterns = [
-            r'\b\w+\.\w+\([^)]*\)',  # Method calls
-            r'\$\w+\s+[^$\n]+',      # Command line
-            r'CREATE\s+\w+[^;]+;',   # SQL CREATE
-            r'SELECT\s+[^;]+;',      # SQL SELECT
-            r'UPDATE\s+[^;]+;',      # SQL UPDATE
-            r'INSERT\s+[^;]+;',      # SQL INSERT
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE | re.MULTILINE)
-            commands.extend(matches)
+        # Nothing after the last ';' can complete a SQL statement
+        sql_end = content.rfind(';') + 1
+        if sql_end:
+            for pattern in SQL_PATTERNS:
+                commands.extend(pattern.findall(content, 0, sql_end))
         
-        # Clean and deduplicate
-        commands = list(set([cmd.strip() for cmd in commands if len(cmd.strip()) > 3]))
+        # Clean and deduplicate, keeping the order found
+        commands = list(dict.fromkeys(cmd.strip() for cmd in commands if len(cmd.strip()) > 3))
         
         return commands[:50]  # Limit to avoid too many
     
     def extract_api_references(self, content: str) -> List[str]:
         """Extract API references from content"""
-        api_patterns = [
-            r'\b\w+API\b',
-            r'\b\w+Service\b',
-            r'\b\w+Manager\b',
-            r'/api/\w+/[^/\s]+',
-            r'https?://[^/\s]+/api/[^\s]+',
-        ]
+        api_refs = API_NAME_PATTERN.findall(content)
+        for pattern in API_URL_PATTERNS:
+            api_refs.extend(pattern.findall(content))
         
-        api_refs = []
-        for pattern in api_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            api_refs.extend(matches)
-        
-        return list(set(api_refs))
+        return list(dict.fromkeys(api_refs))
     
     def extract_code_examples(self, content: str) -> List[Dict[str, str]]:
         """Extract code examples from content"""
         examples = []
         
-        # Simple extraction of code-like blocks
-        code_patterns = [
-            (r'```(\w+)?\n(.*?)```', 'code_block'),
-            (r'`([^`\n]+)`', 'inline_code'),
-            (r'function\s+\w+\s*\([^)]*\)\s*{[^}]+}', 'javascript_function'),
-            (r'public\s+\w+\s+\w+\s*\([^)]*\)\s*{[^}]+}', 'csharp_method'),
-        ]
-        
-        for pattern, code_type in code_patterns:
-            matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
+        for pattern, code_type in CODE_PATTERNS:
+            matches = pattern.findall(content)
             for match in matches:
                 if isinstance(match, tuple):
                     lang, code = match if len(match) == 2 else ('', match[0])
@@ -597,15 +791,11 @@ class AIKnowledgeHubIntegrator:
     
     def assess_complexity(self, content: str) -> str:
         """Assess content complexity level"""
-        content_lower = content.lower()
+        matches = self.keyword_matcher.match(content)
         
-        advanced_terms = ['advanced', 'complex', 'enterprise', 'architecture', 'integration']
-        intermediate_terms = ['configuration', 'customization', 'workflow', 'api']
-        beginner_terms = ['introduction', 'basic', 'getting started', 'overview', 'simple']
-        
-        advanced_count = sum(1 for term in advanced_terms if term in content_lower)
-        intermediate_count = sum(1 for term in intermediate_terms if term in content_lower)
-        beginner_count = sum(1 for term in beginner_terms if term in content_lower)
+        advanced_count = matches.count(COMPLEXITY_TERMS['advanced'])
+        intermediate_count = matches.count(COMPLEXITY_TERMS['intermediate'])
+        beginner_count = matches.count(COMPLEXITY_TERMS['beginner'])
         
         if advanced_count > intermediate_count and advanced_count > beginner_count:
             return 'advanced'
@@ -633,38 +823,38 @@ class AIKnowledgeHubIntegrator:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(asdict(pdf), f, indent=2, ensure_ascii=False)
     
-    def add_to_search_index(self, cursor, content_type: str, content_id: str, 
-                           title: str, content: str, keywords: List[str]):
-        """Add content to search index"""
+    def build_search_rows(self, content_type: str, content_id: str,
+                          sections: List[tuple], keywords: List[str]) -> List[tuple]:
+        """Build search_index rows for (title, text) sections, splitting long text"""
         keywords_str = ' '.join(keywords)
-        
-        cursor.execute('''
-            INSERT INTO search_index 
-            (content_type, content_id, section, content, keywords, relevance_score)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (content_type, content_id, title, content[:5000], keywords_str, 1.0))
-        
-        # Add to FTS
-        cursor.execute('''
-            INSERT INTO search_fts (content_type, content_id, title, content, keywords)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (content_type, content_id, title, content[:5000], keywords_str))
+        rows = []
+        for title, content in sections:
+            for part in self.split_search_text(content):
+                rows.append((content_type, content_id, len(rows), title, part, keywords_str, 1.0))
+        return rows
+    
+    def split_search_text(self, content: str) -> List[str]:
+        """Split text into pieces of at most SEARCH_SECTION_CHARS at whitespace"""
+        parts = []
+        while len(content) > SEARCH_SECTION_CHARS:
+            cut = content.rfind(' ', 0, SEARCH_SECTION_CHARS)
+            if cut <= 0:
+                cut = SEARCH_SECTION_CHARS
+            parts.append(content[:cut])
+            content = content[cut:].lstrip()
+        if content or not parts:
+            parts.append(content)
+        return parts
     
-    def add_command_to_index(self, cursor, command: str, source_type: str, 
-                           source_id: str, source_title: str):
-        """Add command to command index"""
+    def build_command_row(self, command: str, source_type: str, source_id: str) -> tuple:
+        """Build a commands row"""
         command_info = self.analyze_command(command, '')
-        
-        cursor.execute('''
-            INSERT INTO commands 
-            (command, description, category, source_type, source_id, examples, parameters)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        return (
             command, command_info.get('description', ''), 
             command_info.get('category', 'general'),
             source_type, source_id, json.dumps([command]), 
             json.dumps(command_info.get('parameters', []))
-        ))
+        )
     
     def analyze_command(self, command: str, context: str) -> Dict[str, Any]:
         """Analyze command and extract metadata"""
@@ -883,7 +1073,7 @@ class KnowledgeHubService:
         
         if content_type == "all":
             cursor.execute("""
-                SELECT content_type, content_id, section, content, keywords, relevance_score
+                SELECT content_type, content_id, title, content, keywords, relevance_score
                 FROM search_fts
                 WHERE search_fts MATCH ?
                 ORDER BY rank
@@ -891,7 +1081,7 @@ class KnowledgeHubService:
             """, (query, limit))
         else:
             cursor.execute("""
-                SELECT content_type, content_id, section, content, keywords, relevance_score
+                SELECT content_type, content_id, title, content, keywords, relevance_score
                 FROM search_fts
                 WHERE search_fts MATCH ? AND content_type = ?
                 ORDER BY rank
@@ -1062,6 +1252,7 @@ if __name__ == "__main__":
                 'total_commands_from_pdfs': sum(len(p.commands) for p in pdfs),
                 'average_sections_per_pdf': sum(len(p.sections) for p in pdfs) / len(pdfs) if pdfs else 0
             },
+            'search_index_load': self.index_load_stats,
             'search_capabilities': {
                 'full_text_search': True,
                 'topic_based_search': True,
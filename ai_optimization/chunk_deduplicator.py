@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Chunk Deduplicator for Creatio AI Knowledge Hub
+Suppresses boilerplate and duplicate chunks corpus-wide at chunk creation time.
+"""
+
+import re
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+@dataclass
+class DuplicateLink:
+    """Links a suppressed chunk to the chunk that was kept."""
+    chunk_id: str
+    document_id: str
+    duplicate_of: str
+    kind: str  # 'exact' or 'near'
+    token_count: int
+
+
+class ChunkDeduplicator:
+    """
+    Registry of chunk fingerprints shared across a whole corpus.
+
+    Each chunk's content is normalized (case, punctuation and whitespace) and
+    hashed; identical chunks are exact duplicates. A 64-bit SimHash over word
+    shingles catches near duplicates, e.g. the same navigation block with a
+    different date. SimHashes are bucketed by band so only chunks sharing a band
+    are compared.
+    """
+
+    def __init__(self, near_duplicate_distance: int = 3, shingle_size: int = 3,
+                 min_words: int = 20, keep_links: bool = True):
+        """
+        Initialize the deduplicator.
+
+        Args:
+            near_duplicate_distance: Max SimHash Hamming distance for a near
+                duplicate; 0 disables near-duplicate detection
+            shingle_size: Words per shingle fed to SimHash
+            min_words: Chunks shorter than this are only matched exactly
+            keep_links: Record a DuplicateLink for every suppressed chunk
+        """
+        self.near_duplicate_distance = near_duplicate_distance
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.keep_links = keep_links
+
+        # Bands must outnumber the allowed distance so a near duplicate shares
+        # at least one band exactly
+        self.bands = max(4, near_duplicate_distance + 1)
+        self.band_bits = 64 // self.bands
+
+        self.content_hashes: Dict[str, str] = {}
+        self.simhash_buckets: Dict[Tuple[int, int], List[Tuple[int, str]]] = {}
+        self.links: List[DuplicateLink] = []
+
+        self.stats = {
+            'chunks_seen': 0,
+            'chunks_kept': 0,
+            'exact_duplicates': 0,
+            'near_duplicates': 0,
+            'tokens_seen': 0,
+            'tokens_avoided': 0,
+            'characters_avoided': 0
+        }
+
+    def filter(self, chunks: Iterable) -> Iterator:
+        """Yield only chunks whose content has not been seen before."""
+        for chunk in chunks:
+            if self.check(chunk) is None:
+                yield chunk
+
+    def check(self, chunk) -> Optional[DuplicateLink]:
+        """
+        Register a chunk, or report what it duplicates.
+
+        Returns:
+            None if the chunk is new (and now registered), otherwise the link
+            to the chunk it duplicates
+        """
+        self.stats['chunks_seen'] += 1
+        self.stats['tokens_seen'] += chunk.token_count
+
+        words = self.normalize(chunk.content)
+        content_hash = hashlib.sha1(' '.join(words).encode('utf-8')).hexdigest()
+
+        kind = 'exact'
+        duplicate_of = self.content_hashes.get(content_hash)
+
+        simhash = None
+        if duplicate_of is None and self.near_duplicate_distance and len(words) >= self.min_words:
+            simhash = self.simhash(words)
+            duplicate_of = self.find_near_duplicate(simhash)
+            kind = 'near'
+
+        if duplicate_of is None:
+            self.content_hashes[content_hash] = chunk.chunk_id
+            if simhash is not None:
+                self.add_simhash(simhash, chunk.chunk_id)
+            self.stats['chunks_kept'] += 1
+            return None
+
+        link = DuplicateLink(
+            chunk_id=chunk.chunk_id,
+            document_id=chunk.document_id,
+            duplicate_of=duplicate_of,
+            kind=kind,
+            token_count=chunk.token_count
+        )
+        self.stats[f'{kind}_duplicates'] += 1
+        self.stats['tokens_avoided'] += chunk.token_count
+        self.stats['characters_avoided'] += len(chunk.content)
+        if self.keep_links:
+            self.links.append(link)
+        return link
+
+    def normalize(self, content: str) -> List[str]:
+        """Lower-case words of the content, punctuation and spacing dropped."""
+        return WORD_PATTERN.findall(content.lower())
+
+    def simhash(self, words: List[str]) -> int:
+        """64-bit SimHash over word shingles."""
+        size = min(self.shingle_size, len(words))
+        digests = b''.join(
+            hashlib.blake2b(' '.join(words[i:i + size]).encode('utf-8'), digest_size=8).digest()
+            for i in range(len(words) - size + 1)
+        )
+
+        # Each bit is set when it is set in more than half of the shingle hashes
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(-1, 64)
+        majority = bits.sum(axis=0) * 2 > len(bits)
+        return int.from_bytes(np.packbits(majority).tobytes(), 'big')
+
+    def find_near_duplicate(self, simhash: int) -> Optional[str]:
+        """Return the chunk id of a registered SimHash within the distance."""
+        for key in self._band_keys(simhash):
+            for other, chunk_id in self.simhash_buckets.get(key, ()):
+                if bin(simhash ^ other).count('1') <= self.near_duplicate_distance:
+                    return chunk_id
+        return None
+
+    def add_simhash(self, simhash: int, chunk_id: str) -> None:
+        for key in self._band_keys(simhash):
+            self.simhash_buckets.setdefault(key, []).append((simhash, chunk_id))
+
+    def _band_keys(self, simhash: int) -> List[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        return [(band, simhash >> (band * self.band_bits) & mask) for band in range(self.bands)]
+
+    def report(self) -> Dict[str, float]:
+        """
+        Summarize the work avoided downstream.
+
+        Every suppressed chunk is one embedding, one summary input and one
+        index entry that is not produced.
+        """
+        stats = dict(self.stats)
+        suppressed = stats['exact_duplicates'] + stats['near_duplicates']
+        stats['chunks_suppressed'] = suppressed
+        stats['embeddings_avoided'] = suppressed
+        stats['index_entries_avoided'] = suppressed
+        stats['suppressed_ratio'] = suppressed / stats['chunks_seen'] if stats['chunks_seen'] else 0.0
+        stats['token_ratio_avoided'] = (
+            stats['tokens_avoided'] / stats['tokens_seen'] if stats['tokens_seen'] else 0.0
+        )
+        return stats
+
+    def log_report(self) -> None:
+        stats = self.report()
+        logger.info(
+            f"Duplicate suppression: {stats['chunks_suppressed']}/{stats['chunks_seen']} chunks "
+            f"({stats['suppressed_ratio']:.1%}; {stats['exact_duplicates']} exact, "
+            f"{stats['near_duplicates']} near) - {stats['embeddings_avoided']} embeddings and "
+            f"{stats['tokens_avoided']} tokens ({stats['token_ratio_avoided']:.1%}) avoided"
+        )
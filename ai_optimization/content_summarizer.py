@@ -23,7 +23,7 @@ from nltk.corpus import stopwords
 from nltk.tag import pos_tag
 import networkx as nx
 
-from document_chunker import DocumentChunk
+from document_chunker import DocumentChunk, CompactChunk, ChunkInterner
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -936,13 +936,14 @@ def process_developer_course_summaries():
     
     # Load all chunks
     all_chunks = []
+    interner = ChunkInterner()
     for chunk_file in chunks_dir.glob("*_chunks.json"):
         with open(chunk_file, 'r', encoding='utf-8') as f:
             chunks_data = json.load(f)
             
         for chunk_data in chunks_data:
-            # Reconstruct DocumentChunk objects
-            chunk = DocumentChunk(
+            # Reconstruct chunks, sharing repeated metadata across the corpus
+            chunk = CompactChunk(
                 chunk_id=chunk_data['chunk_id'],
                 document_id=chunk_data['document_id'],
                 content=chunk_data['content'],
@@ -951,7 +952,8 @@ def process_developer_course_summaries():
                 metadata=chunk_data['metadata'],
                 word_count=chunk_data['word_count'],
                 token_count=chunk_data['token_count'],
-                context=chunk_data['context']
+                context=chunk_data['context'],
+                interner=interner
             )
             all_chunks.append(chunk)
     
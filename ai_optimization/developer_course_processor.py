@@ -5,19 +5,25 @@ Handles video processing, transcription, PDF extraction, and AI optimization.
 """
 
 import os
+import sys
 import json
 import shutil
+import heapq
 import hashlib
 import subprocess
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Tuple
 from datetime import datetime
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
 # Import our custom modules
-from document_chunker import SemanticDocumentChunker, DocumentChunk
-import PyPDF2
+from document_chunker import SemanticDocumentChunker, DocumentChunk, ChunkExportWriter, chunk_as_dict
+from chunk_deduplicator import ChunkDeduplicator
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts" / "utilities"))
+from audio_cache import AudioCache
+from pdf_extractor import PDFExtraction, PDFTextExtractor
 import whisper
 import cv2
 from PIL import Image
@@ -34,6 +40,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Bump when extraction output changes; ledger entries from other versions are redone
+PROCESSOR_VERSION = "2.1"
+
+# Grayscale thumbnail (width, height) used for scene-change scores and phashes
+KEYFRAME_THUMBNAIL_SIZE = (64, 36)
+
+# Default extraction pool size; each worker loads its own Whisper model
+DEFAULT_MAX_WORKERS = 4
+
 
 @dataclass
 class DeveloperCourseContent:
@@ -44,8 +59,10 @@ class DeveloperCourseContent:
     source_file: str
     processed_content: Dict[str, Any]
     metadata: Dict[str, Any]
-    chunks: List[DocumentChunk]
     processing_timestamp: str
+    chunks: List[DocumentChunk] = field(default_factory=list)
+    chunk_count: int = 0
+    topics: List[str] = field(default_factory=list)
 
 
 class DeveloperCourseProcessor:
@@ -53,34 +70,105 @@ class DeveloperCourseProcessor:
     Comprehensive processor for Developer Course materials.
     """
     
-    def __init__(self, source_path: str, output_path: str):
+    def __init__(self, source_path: str, output_path: str, retain_content: bool = False,
+                 workers: Optional[int] = None, keyframe_method: str = 'seek',
+                 keyframe_sample_seconds: float = 1.0, keyframe_dedupe: bool = True,
+                 keyframe_phash_distance: int = 16, scene_threshold: float = 0.1,
+                 ffmpeg_keyframes_only: bool = False):
         """
         Initialize the processor.
         
         Args:
             source_path: Path to source Developer Course materials
             output_path: Output path in the knowledge hub
+            retain_content: Keep chunks and extracted text on the returned
+                content objects. By default they are streamed to disk and
+                dropped, so memory stays flat regardless of course size.
+            workers: Worker processes for extraction (default: CPU count, at
+                most DEFAULT_MAX_WORKERS); 1 extracts in this process
+            keyframe_method: 'seek' for frames at even offsets (fastest on
+                typical GOPs), 'opencv' for a sequential scene-change pass, or
+                'ffmpeg' for the select filter
+            keyframe_sample_seconds: Seconds between frames scored by 'opencv'
+            keyframe_dedupe: Skip 'opencv' and 'ffmpeg' frames that look like
+                an already chosen one
+            keyframe_phash_distance: Perceptual hash bits (of 256) within which
+                frames count as the same
+            scene_threshold: ffmpeg scene score, 0-1; slides change by ~0.1-0.15
+            ffmpeg_keyframes_only: Let ffmpeg decode keyframes only; much
+                faster, but misses slide changes that the encoder did not make
+                keyframes (e.g. x264 ultrafast)
         """
         self.source_path = Path(source_path)
         self.output_path = Path(output_path)
+        self.retain_content = retain_content
+        self.workers = workers or min(DEFAULT_MAX_WORKERS, os.cpu_count() or 1)
         self.processed_content = []
         
+        # Master index and RAG export are filled as each item is chunked
+        self.master_index = None
+        self.rag_writer = None
+        
+        # Per-item completion ledger, appended as each item is extracted
+        self.ledger_path = self.output_path / "developer_course" / "processing_ledger.jsonl"
+        
+        # Key frame selection
+        self.keyframe_method = keyframe_method
+        self.keyframe_sample_seconds = keyframe_sample_seconds
+        self.keyframe_dedupe = keyframe_dedupe
+        self.keyframe_phash_distance = keyframe_phash_distance
+        self.scene_threshold = scene_threshold
+        self.ffmpeg_keyframes_only = ffmpeg_keyframes_only
+        
         # Initialize components
+        # Transcripts of one session exist as video, PDF and text; duplicate
+        # chunks are suppressed once across all of them
+        self.deduplicator = ChunkDeduplicator()
         self.chunker = SemanticDocumentChunker(
             max_chunk_size=1000,
-            overlap_size=200
+            overlap_size=200,
+            deduplicator=self.deduplicator
         )
         
         # Create output directories
         self.setup_output_directories()
         
-        # Initialize Whisper for transcription
-        try:
-            self.whisper_model = whisper.load_model("base")
-            logger.info("Whisper model loaded successfully")
-        except Exception as e:
-            logger.warning(f"Could not load Whisper model: {e}")
-            self.whisper_model = None
+        # Whisper is loaded on first use, once per worker process
+        self._whisper_model = None
+        self._whisper_loaded = False
+        self._audio_cache = None
+        self._pdf_extractor = None
+    
+    @property
+    def whisper_model(self):
+        """Whisper model for transcription, or None if it cannot be loaded."""
+        if not self._whisper_loaded:
+            self._whisper_loaded = True
+            try:
+                self._whisper_model = whisper.load_model("base")
+                logger.info("Whisper model loaded successfully")
+            except Exception as e:
+                logger.warning(f"Could not load Whisper model: {e}")
+        return self._whisper_model
+    
+    @property
+    def keyframe_options(self) -> Dict[str, Any]:
+        """Key frame settings, as constructor arguments for worker processes."""
+        return {
+            'keyframe_method': self.keyframe_method,
+            'keyframe_sample_seconds': self.keyframe_sample_seconds,
+            'keyframe_dedupe': self.keyframe_dedupe,
+            'keyframe_phash_distance': self.keyframe_phash_distance,
+            'scene_threshold': self.scene_threshold,
+            'ffmpeg_keyframes_only': self.ffmpeg_keyframes_only
+        }
+    
+    @property
+    def audio_cache(self) -> AudioCache:
+        """Audio extraction cache shared with the other transcribers."""
+        if self._audio_cache is None:
+            self._audio_cache = AudioCache()
+        return self._audio_cache
     
     def setup_output_directories(self):
         """Create necessary output directories."""
@@ -107,14 +195,18 @@ class DeveloperCourseProcessor:
             logger.error(f"Source path does not exist: {self.source_path}")
             return []
         
-        # Process video files
-        self.process_videos()
-        
-        # Process PDF transcripts
-        self.process_pdf_transcripts()
+        # Videos, PDF transcripts and existing transcription files if any
+        items = (
+            [('video', path) for path in self.find_videos()] +
+            [('pdf', path) for path in self.find_pdf_transcripts()] +
+            [('transcript', path) for path in self.find_existing_transcripts()]
+        )
         
-        # Process existing transcription files if any
-        self.process_existing_transcripts()
+        self.start_master_index()
+        try:
+            self.process_items(items)
+        finally:
+            self.rag_writer.close()
         
         # Generate comprehensive metadata
         self.generate_course_metadata()
@@ -125,8 +217,141 @@ class DeveloperCourseProcessor:
         logger.info(f"Processing completed. {len(self.processed_content)} items processed.")
         return self.processed_content
     
-    def process_videos(self):
-        """Process all video files in the Developer Course."""
+    def process_items(self, items: List[Tuple[str, Path]]):
+        """
+        Extract items in a process pool, then chunk and index them in order.
+        
+        Items whose ledger entry matches the current file hash and processor
+        version, and whose extracted text is still on disk, are not extracted
+        again. Failed items, and videos extracted without a transcript because
+        Whisper was unavailable, are retried. Chunking
+        runs here in item order so duplicate suppression and the master index
+        are the same however the workers finish.
+        
+        Args:
+            items: (content_type, path) pairs, content_type being 'video',
+                'pdf' or 'transcript'
+        """
+        ledger = self.load_ledger()
+        self.compact_ledger(ledger)
+        jobs = []
+        pool = None
+        reused = 0
+        
+        try:
+            for content_type, path in items:
+                key = self.ledger_key(content_type, path)
+                previous = ledger.get(key)
+                source = self.source_fingerprint(path, previous)
+                
+                if (previous and previous['status'] == 'done'
+                        and not previous.get('incomplete')
+                        and previous['file_hash'] == source['file_hash']
+                        and previous['processor_version'] == PROCESSOR_VERSION
+                        and (not previous.get('text_file') or Path(previous['text_file']).exists())):
+                    jobs.append(previous)
+                    reused += 1
+                    continue
+                
+                # Keep the content ID of a failed or outdated attempt
+                content_id = previous['content_id'] if previous else self.generate_content_id(path.name, content_type)
+                job = (content_type, str(path), content_id)
+                if self.workers > 1:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            initializer=_init_worker,
+                            initargs=(str(self.source_path), str(self.output_path),
+                                      self.keyframe_options,
+                                      max(1, (os.cpu_count() or 1) // self.workers))
+                        )
+                    job = pool.submit(_extract_in_worker, *job)
+                jobs.append((key, source, content_id, job))
+            
+            logger.info(f"{len(items) - reused} items to extract, {reused} reused from the ledger")
+            
+            for job in jobs:
+                entry = job if isinstance(job, dict) else self.finish_extraction(*job)
+                if entry['status'] == 'done':
+                    self.index_item(entry)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+    
+    def finish_extraction(self, key: str, source: Dict[str, Any], content_id: str, job) -> Dict[str, Any]:
+        """Wait for an extraction job and record its outcome in the ledger."""
+        entry = {
+            'key': key,
+            **source,
+            'processor_version': PROCESSOR_VERSION,
+            'content_id': content_id,
+            'completed_at': datetime.now().isoformat()
+        }
+        try:
+            result = job.result() if isinstance(job, Future) else self.extract_item(*job)
+            entry.update(status='done', **result)
+        except Exception as e:
+            logger.error(f"Error processing {key}: {e}")
+            entry.update(status='failed', error=str(e))
+        
+        self.append_ledger(entry)
+        return entry
+    
+    def extract_item(self, content_type: str, source_file: str, content_id: str) -> Dict[str, Any]:
+        """
+        Run the expensive extraction stage for one item.
+        
+        Writes the item's artifacts and its plain text to disk and returns the
+        ledger fields needed to chunk and index it later.
+        """
+        extractors = {
+            'video': self.extract_video,
+            'pdf': self.extract_pdf,
+            'transcript': self.extract_transcript
+        }
+        course_content, text, chunk_metadata = extractors[content_type](Path(source_file), content_id)
+        
+        text_file = None
+        if text:
+            text_file = self.output_path / "developer_course" / "transcripts" / f"{content_id}_text.txt"
+            with open(text_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+        
+        # The text lives in text_file; keep the ledger entry small
+        course_content.processed_content = self.without_text(course_content.processed_content)
+        return {
+            'content': asdict(course_content),
+            'text_file': str(text_file) if text_file else None,
+            'chunk_metadata': chunk_metadata,
+            # Retried on the next run, when Whisper may be available
+            'incomplete': content_type == 'video' and course_content.processed_content.get('transcript') is None
+        }
+    
+    def index_item(self, entry: Dict[str, Any]):
+        """Chunk an extracted item and add it to the chunk files and master index."""
+        course_content = DeveloperCourseContent(**entry['content'])
+        
+        text = ''
+        if entry.get('text_file'):
+            try:
+                with open(entry['text_file'], 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except OSError as e:
+                logger.warning(f"Indexing {entry['key']} without its text: {e}")
+        if self.retain_content:
+            course_content.processed_content['text_content'] = text
+        
+        chunks = ()
+        if text:
+            chunks = self.chunker.iter_text_chunks(
+                text, course_content.content_id, metadata=entry['chunk_metadata']
+            )
+        
+        self.save_components(course_content, chunks)
+        self.processed_content.append(course_content)
+    
+    def find_videos(self) -> List[Path]:
+        """Find all video files in the Developer Course."""
         video_extensions = ['.mp4', '.avi', '.mov', '.mkv']
         video_files = []
         
@@ -134,20 +359,20 @@ class DeveloperCourseProcessor:
             video_files.extend(list(self.source_path.glob(f"*{ext}")))
         
         logger.info(f"Found {len(video_files)} video files to process")
-        
-        for video_file in sorted(video_files):
-            try:
-                self.process_single_video(video_file)
-            except Exception as e:
-                logger.error(f"Error processing video {video_file}: {e}")
+        return sorted(video_files)
+    
+    def process_videos(self):
+        """Process all video files in the Developer Course."""
+        self.process_items([('video', path) for path in self.find_videos()])
     
     def process_single_video(self, video_path: Path):
         """Process a single video file."""
+        self.process_items([('video', video_path)])
+    
+    def extract_video(self, video_path: Path, content_id: str) -> Tuple[DeveloperCourseContent, str, Dict]:
+        """Copy, transcribe and extract key frames from a video file."""
         logger.info(f"Processing video: {video_path.name}")
         
-        # Generate content ID
-        content_id = self.generate_content_id(video_path.name, "video")
-        
         # Copy video to output directory
         output_video_path = self.output_path / "developer_course" / "videos" / video_path.name
         if not output_video_path.exists():
@@ -157,13 +382,19 @@ class DeveloperCourseProcessor:
         # Extract metadata
         video_metadata = self.extract_video_metadata(video_path)
         
-        # Generate transcript if Whisper is available
-        transcript_content = None
-        if self.whisper_model:
-            transcript_content = self.transcribe_video(video_path)
+        # Key frames are extracted while Whisper transcribes
+        with ThreadPoolExecutor(max_workers=1) as stages:
+            key_frames_future = stages.submit(self.extract_key_frames, video_path)
+            
+            # Generate transcript if Whisper is available
+            transcript_content = None
+            if self.whisper_model:
+                transcript_content = self.transcribe_video(video_path)
+            
+            key_frames = key_frames_future.result()
         
-        # Extract key frames
-        key_frames = self.extract_key_frames(video_path)
+        if self.whisper_model and transcript_content is None:
+            raise RuntimeError(f"Transcription failed for {video_path.name}")
         
         # Create processed content structure
         processed_content = {
@@ -173,18 +404,11 @@ class DeveloperCourseProcessor:
             'file_path': str(output_video_path)
         }
         
-        # Create chunks from transcript if available
-        chunks = []
+        # Save transcript if available
         if transcript_content:
-            chunks = self.chunker.chunk_text_document(
-                transcript_content.get('text', ''),
-                content_id,
-                metadata={
-                    'source_type': 'video_transcript',
-                    'video_file': video_path.name,
-                    'duration': video_metadata.get('duration', 0)
-                }
-            )
+            transcript_file = self.output_path / "developer_course" / "transcripts" / f"{content_id}_transcript.json"
+            with open(transcript_file, 'w', encoding='utf-8') as f:
+                json.dump(transcript_content, f, indent=2)
         
         # Create course content object
         course_content = DeveloperCourseContent(
@@ -194,24 +418,25 @@ class DeveloperCourseProcessor:
             source_file=str(video_path),
             processed_content=processed_content,
             metadata=video_metadata,
-            chunks=chunks,
             processing_timestamp=datetime.now().isoformat()
         )
         
-        self.processed_content.append(course_content)
-        
-        # Save individual components
-        self.save_video_components(course_content)
+        chunk_metadata = {
+            'source_type': 'video_transcript',
+            'video_file': video_path.name,
+            'duration': video_metadata.get('duration', 0)
+        }
         
         logger.info(f"Video processing completed: {video_path.name}")
+        return course_content, (transcript_content or {}).get('text', ''), chunk_metadata
     
     def transcribe_video(self, video_path: Path) -> Optional[Dict[str, Any]]:
         """Transcribe video using Whisper."""
         try:
             logger.info(f"Transcribing video: {video_path.name}")
             
-            # Transcribe using Whisper
-            result = self.whisper_model.transcribe(str(video_path))
+            # Transcribe using Whisper from the cached 16 kHz audio
+            result = self.whisper_model.transcribe(self.audio_cache.load_audio(video_path))
             
             # Process segments for better structure
             segments = []
@@ -270,82 +495,220 @@ class DeveloperCourseProcessor:
         return metadata
     
     def extract_key_frames(self, video_path: Path, num_frames: int = 10) -> List[str]:
-        """Extract key frames from video for visual context."""
+        """
+        Extract key frames from video for visual context.
+        
+        By default frames are read at even offsets. keyframe_method='opencv'
+        picks them by scene-change score in one sequential pass, and 'ffmpeg'
+        with ffmpeg's select filter; both land on slide changes, but decode
+        the whole video, which is slower unless keyframes are far apart.
+        """
         key_frames = []
         
         try:
-            cap = cv2.VideoCapture(str(video_path))
-            if not cap.isOpened():
-                return key_frames
+            frames_dir = self.output_path / "developer_course" / "videos" / f"{video_path.stem}_frames"
+            frames_dir.mkdir(exist_ok=True)
+            for stale_frame in frames_dir.glob("frame_*.jpg"):
+                stale_frame.unlink()
+            
+            if self.keyframe_method == 'ffmpeg':
+                key_frames = self.extract_key_frames_ffmpeg(video_path, frames_dir, num_frames)
+            elif self.keyframe_method == 'opencv':
+                key_frames = self.extract_key_frames_sequential(video_path, frames_dir, num_frames)
+            else:
+                key_frames = self.extract_key_frames_seek(video_path, frames_dir, num_frames)
             
+            logger.info(f"Extracted {len(key_frames)} key frames from {video_path.name}")
+            
+        except Exception as e:
+            logger.warning(f"Could not extract key frames from {video_path}: {e}")
+        
+        return key_frames
+    
+    def extract_key_frames_seek(self, video_path: Path, frames_dir: Path,
+                                num_frames: int) -> List[str]:
+        """
+        Read num_frames frames at even offsets, seeking to each.
+        
+        Each seek decodes only from the nearest keyframe, so this reads a
+        small part of the video at typical GOP lengths.
+        """
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            return []
+        
+        key_frames = []
+        try:
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             frame_interval = max(1, total_frames // num_frames)
             
-            frames_dir = self.output_path / "developer_course" / "videos" / f"{video_path.stem}_frames"
-            frames_dir.mkdir(exist_ok=True)
-            
             for i in range(0, total_frames, frame_interval):
                 cap.set(cv2.CAP_PROP_POS_FRAMES, i)
                 ret, frame = cap.read()
                 
                 if ret:
-                    frame_filename = f"frame_{i:06d}.jpg"
-                    frame_path = frames_dir / frame_filename
+                    frame_path = frames_dir / f"frame_{i:06d}.jpg"
                     cv2.imwrite(str(frame_path), frame)
                     key_frames.append(str(frame_path))
                     
                     if len(key_frames) >= num_frames:
                         break
-            
+        finally:
             cap.release()
-            logger.info(f"Extracted {len(key_frames)} key frames from {video_path.name}")
-            
-        except Exception as e:
-            logger.warning(f"Could not extract key frames from {video_path}: {e}")
+        return key_frames
+    
+    def extract_key_frames_sequential(self, video_path: Path, frames_dir: Path,
+                                      num_frames: int) -> List[str]:
+        """
+        Pick key frames in a single sequential decode pass.
+        
+        grab() advances without converting frames; one frame per
+        keyframe_sample_seconds is retrieved and scored by its mean absolute
+        difference from the previous sample on a small grayscale thumbnail.
+        Only the best-scoring candidates are kept (JPEG-encoded), so memory
+        does not grow with video length.
+        """
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            return []
+        
+        fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+        step = max(1, int(round(fps * self.keyframe_sample_seconds)))
         
+        # Extra candidates leave room for perceptual-hash deduplication
+        pool_size = num_frames * 3 if self.keyframe_dedupe else num_frames
+        candidates = []  # min-heap of (score, frame index, jpeg, phash)
+        previous = None
+        frame_index = 0
+        
+        try:
+            while cap.grab():
+                if frame_index % step == 0:
+                    ret, frame = cap.retrieve()
+                    if ret:
+                        thumbnail = cv2.resize(
+                            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), KEYFRAME_THUMBNAIL_SIZE,
+                            interpolation=cv2.INTER_AREA
+                        )
+                        # The opening frame always qualifies
+                        score = 255.0 if previous is None else float(cv2.absdiff(thumbnail, previous).mean())
+                        previous = thumbnail
+                        
+                        if len(candidates) < pool_size or score > candidates[0][0]:
+                            _, jpeg = cv2.imencode('.jpg', frame)
+                            candidate = (score, frame_index, jpeg.tobytes(), self.perceptual_hash(thumbnail))
+                            if len(candidates) < pool_size:
+                                heapq.heappush(candidates, candidate)
+                            else:
+                                heapq.heapreplace(candidates, candidate)
+                frame_index += 1
+        finally:
+            cap.release()
+        
+        key_frames = []
+        for score, index, jpeg, _ in self.select_key_frames(candidates, num_frames):
+            frame_path = frames_dir / f"frame_{index:06d}.jpg"
+            frame_path.write_bytes(jpeg)
+            key_frames.append(str(frame_path))
         return key_frames
     
-    def process_pdf_transcripts(self):
-        """Process PDF transcript files."""
+    def extract_key_frames_ffmpeg(self, video_path: Path, frames_dir: Path,
+                                  num_frames: int) -> List[str]:
+        """
+        Pick key frames with ffmpeg's scene-change select filter.
+        
+        Frames are named by presentation timestamp. With ffmpeg_keyframes_only
+        only keyframes are decoded, relying on the encoder to have placed them
+        at scene cuts.
+        """
+        cmd = ['ffmpeg', '-v', 'error']
+        if self.ffmpeg_keyframes_only:
+            cmd += ['-skip_frame', 'nokey']
+        cmd += [
+            '-i', str(video_path),
+            '-vf', f"select='eq(n,0)+gt(scene,{self.scene_threshold})'",
+            '-vsync', 'vfr', '-frame_pts', '1',
+            str(frames_dir / 'frame_%06d.jpg'), '-y'
+        ]
+        subprocess.run(cmd, capture_output=True, text=True, check=True)
+        
+        candidates = []
+        for frame_path in sorted(frames_dir.glob("frame_*.jpg")):
+            thumbnail = cv2.resize(cv2.imread(str(frame_path), cv2.IMREAD_GRAYSCALE),
+                                   KEYFRAME_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+            # ffmpeg emits frames in order; earlier cuts rank higher
+            candidates.append((-len(candidates), int(frame_path.stem.split('_')[1]),
+                               frame_path, self.perceptual_hash(thumbnail)))
+        
+        selected = {candidate[2] for candidate in self.select_key_frames(candidates, num_frames)}
+        for _, _, frame_path, _ in candidates:
+            if frame_path not in selected:
+                frame_path.unlink()
+        return [str(candidate[2]) for candidate in candidates if candidate[2] in selected]
+    
+    def select_key_frames(self, candidates: List[Tuple], num_frames: int) -> List[Tuple]:
+        """
+        Choose up to num_frames candidates by score, in video order.
+        
+        With keyframe_dedupe, a candidate whose perceptual hash is within
+        keyframe_phash_distance of an already chosen frame is skipped.
+        """
+        selected = []
+        for candidate in sorted(candidates, key=lambda c: (c[0], -c[1]), reverse=True):
+            if self.keyframe_dedupe and any(
+                bin(candidate[3] ^ chosen[3]).count('1') <= self.keyframe_phash_distance
+                for chosen in selected
+            ):
+                continue
+            selected.append(candidate)
+            if len(selected) >= num_frames:
+                break
+        return sorted(selected, key=lambda c: c[1])
+    
+    def perceptual_hash(self, gray: np.ndarray) -> int:
+        """
+        256-bit DCT perceptual hash of a grayscale image.
+        
+        16x16 low frequencies rather than the usual 8x8: text slides sharing
+        one layout differ by only a few bits in a 64-bit hash.
+        """
+        pixels = np.float32(cv2.resize(gray, (64, 64), interpolation=cv2.INTER_AREA))
+        low_frequencies = cv2.dct(pixels)[:16, :16]
+        bits = (low_frequencies > np.median(low_frequencies)).flatten()
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+    
+    def find_pdf_transcripts(self) -> List[Path]:
+        """Find PDF transcript files."""
         pdf_files = list(self.source_path.glob("transcripts/*.pdf"))
         logger.info(f"Found {len(pdf_files)} PDF transcript files to process")
-        
-        for pdf_file in sorted(pdf_files):
-            try:
-                self.process_single_pdf(pdf_file)
-            except Exception as e:
-                logger.error(f"Error processing PDF {pdf_file}: {e}")
+        return sorted(pdf_files)
+    
+    def process_pdf_transcripts(self):
+        """Process PDF transcript files."""
+        self.process_items([('pdf', path) for path in self.find_pdf_transcripts()])
     
     def process_single_pdf(self, pdf_path: Path):
         """Process a single PDF transcript file."""
+        self.process_items([('pdf', pdf_path)])
+    
+    def extract_pdf(self, pdf_path: Path, content_id: str) -> Tuple[DeveloperCourseContent, str, Dict]:
+        """Copy a PDF transcript and extract its text."""
         logger.info(f"Processing PDF: {pdf_path.name}")
         
-        # Generate content ID
-        content_id = self.generate_content_id(pdf_path.name, "pdf")
-        
         # Copy PDF to output directory
         output_pdf_path = self.output_path / "developer_course" / "pdfs" / pdf_path.name
         if not output_pdf_path.exists():
             shutil.copy2(pdf_path, output_pdf_path)
         
         # Extract text from PDF
-        pdf_text = self.extract_pdf_text(pdf_path)
-        
-        # Create chunks from PDF content
-        chunks = self.chunker.chunk_text_document(
-            pdf_text,
-            content_id,
-            metadata={
-                'source_type': 'pdf_transcript',
-                'pdf_file': pdf_path.name
-            }
-        )
+        extraction = self.extract_pdf_pages(pdf_path)
+        pdf_text = self.join_pdf_pages(extraction.pages)
         
         # Create processed content structure
         processed_content = {
             'text_content': pdf_text,
             'file_path': str(output_pdf_path),
-            'page_count': self.get_pdf_page_count(pdf_path)
+            'page_count': extraction.page_count
         }
         
         # Extract metadata
@@ -364,51 +727,51 @@ class DeveloperCourseProcessor:
             source_file=str(pdf_path),
             processed_content=processed_content,
             metadata=pdf_metadata,
-            chunks=chunks,
             processing_timestamp=datetime.now().isoformat()
         )
         
-        self.processed_content.append(course_content)
-        
-        # Save components
-        self.save_pdf_components(course_content)
+        chunk_metadata = {
+            'source_type': 'pdf_transcript',
+            'pdf_file': pdf_path.name
+        }
         
         logger.info(f"PDF processing completed: {pdf_path.name}")
+        return course_content, pdf_text, chunk_metadata
     
-    def extract_pdf_text(self, pdf_path: Path) -> str:
-        """Extract text content from PDF file."""
-        text_content = ""
-        
+    @property
+    def pdf_extractor(self) -> PDFTextExtractor:
+        """Page-parallel PDF text extractor, created on first use."""
+        if self._pdf_extractor is None:
+            # Inside an extraction worker (workers=1) pages are read serially
+            self._pdf_extractor = PDFTextExtractor(workers=self.workers)
+        return self._pdf_extractor
+    
+    def extract_pdf_pages(self, pdf_path: Path) -> PDFExtraction:
+        """Extract the text of each page, OCRing image-only pages."""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text.strip():
-                            text_content += f"\n\n--- Page {page_num + 1} ---\n\n"
-                            text_content += page_text
-                    except Exception as e:
-                        logger.warning(f"Could not extract text from page {page_num + 1} of {pdf_path}: {e}")
-                        
+            extraction = self.pdf_extractor.extract(pdf_path)
         except Exception as e:
             logger.error(f"Could not extract text from PDF {pdf_path}: {e}")
+            return PDFExtraction([])
         
-        return text_content.strip()
+        logger.info(f"Extracted {extraction.page_count} pages ({len(extraction.ocr_pages)} OCRed) "
+                    f"at {extraction.pages_per_second:.1f} pages/sec")
+        return extraction
     
-    def get_pdf_page_count(self, pdf_path: Path) -> int:
-        """Get the number of pages in a PDF file."""
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                return len(pdf_reader.pages)
-        except Exception as e:
-            logger.warning(f"Could not get page count for {pdf_path}: {e}")
-            return 0
+    def extract_pdf_text(self, pdf_path: Path) -> str:
+        """Extract text content from PDF file."""
+        return self.join_pdf_pages(self.extract_pdf_pages(pdf_path).pages)
     
-    def process_existing_transcripts(self):
-        """Process any existing transcript files."""
+    def join_pdf_pages(self, pages: List[str]) -> str:
+        """Join page texts under page markers, skipping blank pages."""
+        return "".join(
+            f"\n\n--- Page {page_num + 1} ---\n\n{page_text}"
+            for page_num, page_text in enumerate(pages)
+            if page_text.strip()
+        ).strip()
+    
+    def find_existing_transcripts(self) -> List[Path]:
+        """Find any existing transcript files."""
         transcript_extensions = ['.txt', '.json', '.srt', '.vtt']
         transcript_files = []
         
@@ -417,40 +780,27 @@ class DeveloperCourseProcessor:
             transcript_files.extend(list(self.source_path.glob(f"transcripts/*{ext}")))
         
         logger.info(f"Found {len(transcript_files)} existing transcript files")
-        
-        for transcript_file in transcript_files:
-            try:
-                self.process_transcript_file(transcript_file)
-            except Exception as e:
-                logger.error(f"Error processing transcript {transcript_file}: {e}")
+        return transcript_files
+    
+    def process_existing_transcripts(self):
+        """Process any existing transcript files."""
+        self.process_items([('transcript', path) for path in self.find_existing_transcripts()])
     
     def process_transcript_file(self, transcript_path: Path):
         """Process an existing transcript file."""
+        self.process_items([('transcript', transcript_path)])
+    
+    def extract_transcript(self, transcript_path: Path, content_id: str) -> Tuple[DeveloperCourseContent, str, Dict]:
+        """Read an existing transcript file."""
         logger.info(f"Processing transcript: {transcript_path.name}")
         
-        content_id = self.generate_content_id(transcript_path.name, "transcript")
-        
         # Read transcript content
-        try:
-            with open(transcript_path, 'r', encoding='utf-8') as f:
-                if transcript_path.suffix == '.json':
-                    transcript_data = json.load(f)
-                    transcript_text = transcript_data.get('text', str(transcript_data))
-                else:
-                    transcript_text = f.read()
-        except Exception as e:
-            logger.error(f"Could not read transcript file {transcript_path}: {e}")
-            return
-        
-        # Create chunks
-        chunks = self.chunker.chunk_text_document(
-            transcript_text,
-            content_id,
-            metadata={
-                'source_type': 'existing_transcript',
-                'transcript_file': transcript_path.name
-            }
-        )
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            if transcript_path.suffix == '.json':
+                transcript_data = json.load(f)
+                transcript_text = transcript_data.get('text', str(transcript_data))
+            else:
+                transcript_text = f.read()
         
         # Save processed transcript
         output_path = self.output_path / "developer_course" / "transcripts" / transcript_path.name
@@ -464,64 +814,146 @@ class DeveloperCourseProcessor:
             source_file=str(transcript_path),
             processed_content={'text_content': transcript_text, 'file_path': str(output_path)},
             metadata={'filename': transcript_path.name, 'file_size': transcript_path.stat().st_size},
-            chunks=chunks,
             processing_timestamp=datetime.now().isoformat()
         )
         
-        self.processed_content.append(course_content)
-        self.save_transcript_components(course_content)
+        chunk_metadata = {
+            'source_type': 'existing_transcript',
+            'transcript_file': transcript_path.name
+        }
+        return course_content, transcript_text, chunk_metadata
     
-    def save_video_components(self, course_content: DeveloperCourseContent):
-        """Save video processing components."""
+    def save_components(self, course_content: DeveloperCourseContent,
+                        chunks: Iterable[DocumentChunk] = ()):
+        """Save the chunks and metadata of a processed item."""
         content_id = course_content.content_id
         
-        # Save transcript if available
-        if course_content.processed_content.get('transcript'):
-            transcript_file = self.output_path / "developer_course" / "transcripts" / f"{content_id}_transcript.json"
-            with open(transcript_file, 'w', encoding='utf-8') as f:
-                json.dump(course_content.processed_content['transcript'], f, indent=2)
-        
         # Save chunks
-        self.save_chunks(course_content.chunks, content_id)
+        self.save_chunks(chunks, course_content)
         
         # Save metadata
         self.save_metadata(course_content, content_id)
     
-    def save_pdf_components(self, course_content: DeveloperCourseContent):
-        """Save PDF processing components."""
-        content_id = course_content.content_id
-        
-        # Save extracted text
-        text_file = self.output_path / "developer_course" / "transcripts" / f"{content_id}_text.txt"
-        with open(text_file, 'w', encoding='utf-8') as f:
-            f.write(course_content.processed_content['text_content'])
-        
-        # Save chunks
-        self.save_chunks(course_content.chunks, content_id)
+    def save_chunks(self, chunks: Iterable[DocumentChunk], course_content: DeveloperCourseContent):
+        """
+        Stream document chunks to disk as they are produced.
         
-        # Save metadata
-        self.save_metadata(course_content, content_id)
-    
-    def save_transcript_components(self, course_content: DeveloperCourseContent):
-        """Save transcript processing components."""
+        Each chunk is written to the content's chunks file, the RAG export and
+        the master index, then dropped unless retain_content is set.
+        """
         content_id = course_content.content_id
+        chunks_file = self.output_path / "developer_course" / "chunks" / f"{content_id}_chunks.json"
         
-        # Save chunks
-        self.save_chunks(course_content.chunks, content_id)
-        
-        # Save metadata
-        self.save_metadata(course_content, content_id)
+        count = 0
+        topics = set(self.extract_keywords_from_text(course_content.title))
+        f = None
+        try:
+            for chunk in chunks:
+                if f is None:
+                    f = open(chunks_file, 'w', encoding='utf-8')
+                    f.write('[')
+                else:
+                    f.write(',')
+                f.write('\n' + json.dumps(chunk_as_dict(chunk), indent=2, ensure_ascii=False))
+                
+                if count < 3:  # Topics come from the first few chunks
+                    topics.update(self.extract_keywords_from_text(chunk.content[:500]))
+                self.index_chunk(chunk, content_id)
+                if self.retain_content:
+                    course_content.chunks.append(chunk)
+                count += 1
+        finally:
+            if f is not None:
+                f.write('\n]')
+                f.close()
+        
+        if count == 0 and chunks_file.exists():
+            chunks_file.unlink()  # Left over from an earlier run
+        
+        course_content.chunk_count = count
+        course_content.topics = list(topics)
     
-    def save_chunks(self, chunks: List[DocumentChunk], content_id: str):
-        """Save document chunks."""
-        if not chunks:
+    def without_text(self, processed_content: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of processed content without the extracted text, which is saved separately."""
+        processed_content = {k: v for k, v in processed_content.items() if k != 'text_content'}
+        transcript = processed_content.get('transcript')
+        if transcript:
+            processed_content['transcript'] = {
+                k: v for k, v in transcript.items() if k not in ('text', 'segments')
+            }
+        return processed_content
+    
+    def load_ledger(self) -> Dict[str, Dict[str, Any]]:
+        """Read the completion ledger; the last entry per item wins."""
+        ledger = {}
+        if not self.ledger_path.exists():
+            return ledger
+        
+        with open(self.ledger_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Line cut short by a crash
+                ledger[entry['key']] = entry
+        return ledger
+    
+    def compact_ledger(self, ledger: Dict[str, Dict[str, Any]]):
+        """Rewrite the ledger with only the last entry per item, if any are superseded."""
+        if not self.ledger_path.exists():
+            return
+        with open(self.ledger_path, 'r', encoding='utf-8') as f:
+            lines = sum(1 for _ in f)
+        if lines <= len(ledger):
             return
         
-        chunks_file = self.output_path / "developer_course" / "chunks" / f"{content_id}_chunks.json"
-        chunks_data = [asdict(chunk) for chunk in chunks]
+        temp_path = self.ledger_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in ledger.values():
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.ledger_path)
+        logger.info(f"Compacted processing ledger from {lines} to {len(ledger)} entries")
+    
+    def append_ledger(self, entry: Dict[str, Any]):
+        """Durably record an item's outcome before moving on."""
+        with open(self.ledger_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def ledger_key(self, content_type: str, path: Path) -> str:
+        """Ledger slot of an item: its content type and source path."""
+        try:
+            path = path.relative_to(self.source_path)
+        except ValueError:
+            pass
+        return f"{content_type}:{path.as_posix()}"
+    
+    def source_fingerprint(self, path: Path, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Size, mtime and SHA-256 of a source file.
         
-        with open(chunks_file, 'w', encoding='utf-8') as f:
-            json.dump(chunks_data, f, indent=2, ensure_ascii=False)
+        The hash of the previous ledger entry is reused when size and mtime are
+        unchanged, so large videos are not re-read on every run.
+        """
+        stat = path.stat()
+        if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+            file_hash = previous['file_hash']
+        else:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            file_hash = digest.hexdigest()
+        
+        return {
+            'source_file': str(path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'file_hash': file_hash
+        }
     
     def save_metadata(self, course_content: DeveloperCourseContent, content_id: str):
         """Save content metadata."""
@@ -550,13 +982,13 @@ class DeveloperCourseProcessor:
         for content in self.processed_content:
             content_type = content.content_type
             content_types[content_type] = content_types.get(content_type, 0) + 1
-            total_chunks += len(content.chunks)
+            total_chunks += content.chunk_count
             
             course_metadata['content_summary'].append({
                 'content_id': content.content_id,
                 'title': content.title,
                 'type': content.content_type,
-                'chunk_count': len(content.chunks),
+                'chunk_count': content.chunk_count,
                 'source_file': content.source_file
             })
         
@@ -597,6 +1029,10 @@ class DeveloperCourseProcessor:
     
     def extract_topics_from_content(self, content: DeveloperCourseContent) -> List[str]:
         """Extract likely topics from content."""
+        if content.topics:
+            # Collected while the chunks were streamed
+            return content.topics
+        
         topics = []
         
         # Extract from title
@@ -631,20 +1067,51 @@ class DeveloperCourseProcessor:
         
         return found_keywords
     
-    def create_master_index(self):
-        """Create a master index for all processed content."""
-        logger.info("Creating master index")
-        
-        master_index = {
+    def start_master_index(self):
+        """Open the master index and RAG export that chunks stream into."""
+        self.master_index = {
             'index_version': '1.0',
             'created_date': datetime.now().isoformat(),
-            'total_content_items': len(self.processed_content),
+            'total_content_items': 0,
             'content_index': {},
             'chunk_index': {},
             'search_index': {}
         }
         
-        all_chunks = []
+        rag_export_path = self.output_path / "developer_course" / "rag_export.json"
+        self.rag_writer = ChunkExportWriter(rag_export_path).open()
+    
+    def index_chunk(self, chunk: DocumentChunk, content_id: str):
+        """Add a single chunk to the master index and RAG export."""
+        if self.master_index is None:
+            return
+        
+        self.master_index['chunk_index'][chunk.chunk_id] = {
+            'content_id': content_id,
+            'chunk_type': chunk.chunk_type,
+            'chunk_index': chunk.chunk_index,
+            'word_count': chunk.word_count,
+            'token_count': chunk.token_count
+        }
+        
+        # Create search index (simplified)
+        search_index = self.master_index['search_index']
+        for word in chunk.content.lower().split():
+            if len(word) > 3:  # Only index meaningful words
+                search_index.setdefault(word, []).append(chunk.chunk_id)
+        
+        self.rag_writer.write(chunk)
+    
+    def create_master_index(self):
+        """Create a master index for all processed content."""
+        logger.info("Creating master index")
+        
+        if self.master_index is None:
+            self.start_master_index()
+            self.rag_writer.close()
+        
+        master_index = self.master_index
+        master_index['total_content_items'] = len(self.processed_content)
         
         for content in self.processed_content:
             # Add to content index
@@ -652,41 +1119,25 @@ class DeveloperCourseProcessor:
                 'title': content.title,
                 'type': content.content_type,
                 'source_file': content.source_file,
-                'chunk_count': len(content.chunks),
+                'chunk_count': content.chunk_count,
                 'metadata_file': f"metadata/{content.content_id}_metadata.json",
                 'chunks_file': f"chunks/{content.content_id}_chunks.json"
             }
-            
-            # Add chunks to master chunk index
-            for chunk in content.chunks:
-                master_index['chunk_index'][chunk.chunk_id] = {
-                    'content_id': content.content_id,
-                    'chunk_type': chunk.chunk_type,
-                    'chunk_index': chunk.chunk_index,
-                    'word_count': chunk.word_count,
-                    'token_count': chunk.token_count
-                }
-                
-                all_chunks.append(chunk)
         
-        # Create search index (simplified)
-        for chunk in all_chunks:
-            words = chunk.content.lower().split()
-            for word in words:
-                if len(word) > 3:  # Only index meaningful words
-                    if word not in master_index['search_index']:
-                        master_index['search_index'][word] = []
-                    master_index['search_index'][word].append(chunk.chunk_id)
+        # Link suppressed duplicate chunks to the chunk that was kept
+        master_index['duplicate_chunks'] = {
+            link.chunk_id: link.duplicate_of for link in self.deduplicator.links
+        }
+        master_index['deduplication'] = self.deduplicator.report()
+        self.deduplicator.log_report()
         
         # Save master index
         index_file = self.output_path / "developer_course" / "master_index.json"
         with open(index_file, 'w', encoding='utf-8') as f:
             json.dump(master_index, f, indent=2, ensure_ascii=False)
         
-        # Create RAG-compatible export
-        self.create_rag_export(all_chunks)
-        
-        logger.info(f"Master index created with {len(all_chunks)} chunks")
+        logger.info(f"RAG export created: {self.rag_writer.output_path}")
+        logger.info(f"Master index created with {len(master_index['chunk_index'])} chunks")
     
     def create_rag_export(self, chunks: List[DocumentChunk]):
         """Create RAG-compatible export of all content."""
@@ -714,6 +1165,24 @@ class DeveloperCourseProcessor:
         return title
 
 
+# Extraction worker state: one processor per pool process
+_worker_processor = None
+
+
+def _init_worker(source_path: str, output_path: str, keyframe_options: Dict[str, Any],
+                 torch_threads: int):
+    """Build the worker's processor, with torch pinned to its share of the cores"""
+    global _worker_processor
+    import torch
+    torch.set_num_threads(torch_threads)
+    _worker_processor = DeveloperCourseProcessor(source_path, output_path, workers=1,
+                                                 **keyframe_options)
+
+
+def _extract_in_worker(content_type: str, source_file: str, content_id: str) -> Dict[str, Any]:
+    return _worker_processor.extract_item(content_type, source_file, content_id)
+
+
 def main():
     """Main execution function."""
     source_path = "/mnt/c/Users/amago/Desktop/InterWeave Documents/Creatio/Developer Course"
@@ -729,7 +1198,7 @@ def main():
         count = sum(1 for content in processed_content if content.content_type == content_type)
         print(f"{content_type.capitalize()} files: {count}")
     
-    total_chunks = sum(len(content.chunks) for content in processed_content)
+    total_chunks = sum(content.chunk_count for content in processed_content)
     print(f"Total chunks created: {total_chunks}")
     
     print(f"\nAll materials have been processed and integrated into the AI knowledge hub!")
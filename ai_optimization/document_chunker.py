@@ -1,12 +1,42 @@
 import re
+import sys
 import json
 import hashlib
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Iterable
 from pathlib import Path
-from dataclasses import dataclass
-from bs4 import BeautifulSoup
+from dataclasses import dataclass, asdict
+from bs4 import BeautifulSoup, NavigableString, Tag
 import tiktoken
 
+try:
+    import lxml  # noqa: F401
+    DEFAULT_HTML_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_HTML_PARSER = 'html.parser'
+
+
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# Elements whose whole text forms one block; the walk does not descend into them
+BLOCK_TAGS = {'p', 'pre', 'code', 'table', 'ul', 'ol'}
+
+# Inline elements whose text joins the surrounding run of loose text
+INLINE_TAGS = {
+    'a', 'abbr', 'b', 'br', 'cite', 'em', 'i', 'img', 'kbd', 'label', 'mark',
+    'q', 's', 'samp', 'small', 'span', 'strong', 'sub', 'sup', 'time', 'u', 'var'
+}
+
+# Elements that never contribute visible text
+SKIPPED_TAGS = {'head', 'script', 'style', 'noscript', 'template'}
+
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Chunk metadata keys that vary per chunk; everything else is document-level
+CHUNK_METADATA_KEYS = {'chunk_statistics'}
+
+# Stands in for a context position equal to the chunk's own index
+_CHUNK_POSITION = object()
+
 
 @dataclass
 class DocumentChunk:
@@ -22,13 +52,190 @@ class DocumentChunk:
     context: Dict[str, Any]  # Surrounding context information
 
 
+
+class ChunkInterner:
+    """
+    Canonical copies of the strings, lists and metadata dicts that chunks repeat.
+    
+    One interner is shared by every chunk of a corpus so that equal values are
+    stored once and referenced from each chunk.
+    """
+    
+    def __init__(self):
+        self._values = {}
+        self._metadata = {}
+    
+    def value(self, value: Any) -> Any:
+        """Return the shared copy of a string or (as a tuple) a list of scalars."""
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, list):
+            value = tuple(self.value(item) for item in value)
+            try:
+                return self._values.setdefault(value, value)
+            except TypeError:  # Unhashable items, keep a private copy
+                return value
+        return value
+    
+    def metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the shared dict equal to a document-level metadata dict."""
+        key = json.dumps(metadata, sort_keys=True, default=str)
+        return self._metadata.setdefault(key, metadata)
+
+
+class ReadOnlyMetadata(dict):
+    """
+    Merged metadata of a CompactChunk.
+    
+    Edits would be lost, since the mapping is rebuilt on each access, so
+    they raise instead. It is otherwise a plain dict (JSON-serializable and
+    equal to dicts with the same items).
+    """
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("CompactChunk metadata is read-only; convert the chunk with "
+                        "to_document_chunk() to edit it")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+
+class CompactChunk:
+    """
+    Slotted, read-only chunk for holding large corpora in memory.
+    
+    Exposes the same attributes as DocumentChunk. Document-level metadata is
+    shared by reference between the chunks of a document, only per-chunk keys
+    (CHUNK_METADATA_KEYS) are stored on the chunk, and context values are
+    interned. ``metadata`` and ``context`` are rebuilt on access, so
+    ``to_dict()`` is identical to ``asdict()`` of the equivalent DocumentChunk.
+    ``metadata`` is a ReadOnlyMetadata, so an edit raises rather than being
+    silently dropped. Chunks are hashable, unlike DocumentChunk.
+    """
+    
+    __slots__ = ('chunk_id', 'document_id', 'content', 'chunk_type', 'chunk_index',
+                 'word_count', 'token_count', 'document_metadata', 'chunk_metadata',
+                 '_context_keys', '_context_values')
+    
+    def __init__(self, chunk_id: str, document_id: str, content: str, chunk_type: str,
+                 chunk_index: int, metadata: Dict[str, Any], word_count: int,
+                 token_count: int, context: Dict[str, Any],
+                 interner: Optional[ChunkInterner] = None,
+                 document_metadata: Optional[Dict[str, Any]] = None):
+        """
+        Create a compact chunk.
+        
+        Args:
+            interner: Interner shared across the corpus (a private one if omitted)
+            document_metadata: Document-level metadata dict to share by reference;
+                derived from ``metadata`` through the interner if omitted
+        """
+        interner = interner or ChunkInterner()
+        
+        self.chunk_id = chunk_id
+        self.document_id = interner.value(document_id)
+        self.content = content
+        self.chunk_type = interner.value(chunk_type)
+        self.chunk_index = chunk_index
+        self.word_count = word_count
+        self.token_count = token_count
+        
+        if document_metadata is None or not document_metadata.keys() <= metadata.keys():
+            document_metadata = interner.metadata(
+                {k: v for k, v in metadata.items() if k not in CHUNK_METADATA_KEYS}
+            )
+        extra = {
+            k: v for k, v in metadata.items()
+            if k not in document_metadata
+            or (document_metadata[k] is not v and document_metadata[k] != v)
+        }
+        self.document_metadata = document_metadata
+        self.chunk_metadata = interner.metadata(extra) if extra else None
+        
+        # The position equals the chunk index, so store a marker and let
+        # chunks with otherwise equal context share one values tuple
+        self._context_keys = interner.value(list(context))
+        self._context_values = interner.value([
+            _CHUNK_POSITION if key == 'position_in_document' and value == chunk_index else value
+            for key, value in context.items()
+        ])
+    
+    @property
+    def metadata(self) -> ReadOnlyMetadata:
+        return ReadOnlyMetadata(self._merged_metadata())
+    
+    def _merged_metadata(self) -> Dict[str, Any]:
+        if not self.chunk_metadata:
+            return dict(self.document_metadata)
+        return {**self.document_metadata, **self.chunk_metadata}
+    
+    @property
+    def context(self) -> Dict[str, Any]:
+        context = {}
+        for key, value in zip(self._context_keys, self._context_values):
+            if value is _CHUNK_POSITION:
+                value = self.chunk_index
+            elif isinstance(value, tuple):
+                value = list(value)
+            context[key] = value
+        return context
+    
+    @classmethod
+    def from_chunk(cls, chunk: DocumentChunk,
+                   interner: Optional[ChunkInterner] = None) -> "CompactChunk":
+        """Convert a DocumentChunk (or anything with its attributes)."""
+        return cls(chunk.chunk_id, chunk.document_id, chunk.content, chunk.chunk_type,
+                   chunk.chunk_index, chunk.metadata, chunk.word_count,
+                   chunk.token_count, chunk.context, interner=interner)
+    
+    def to_document_chunk(self) -> DocumentChunk:
+        """Expand back into a plain DocumentChunk."""
+        return DocumentChunk(**self.to_dict())
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the chunk in the DocumentChunk field layout."""
+        return {
+            'chunk_id': self.chunk_id,
+            'document_id': self.document_id,
+            'content': self.content,
+            'chunk_type': self.chunk_type,
+            'chunk_index': self.chunk_index,
+            'metadata': self._merged_metadata(),
+            'word_count': self.word_count,
+            'token_count': self.token_count,
+            'context': self.context
+        }
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (CompactChunk, DocumentChunk)):
+            return self.to_dict() == chunk_as_dict(other)
+        return NotImplemented
+    
+    def __hash__(self) -> int:
+        # Equal chunks share these fields
+        return hash((self.chunk_id, self.document_id, self.chunk_index))
+    
+    def __repr__(self) -> str:
+        return f"CompactChunk(chunk_id={self.chunk_id!r}, document_id={self.document_id!r}, chunk_index={self.chunk_index})"
+
+
+def chunk_as_dict(chunk) -> Dict[str, Any]:
+    """Serialize a DocumentChunk or CompactChunk to the chunks-file layout."""
+    if isinstance(chunk, CompactChunk):
+        return chunk.to_dict()
+    return asdict(chunk)
+
+
 class SemanticDocumentChunker:
     """
     Intelligent document chunker that creates semantic chunks optimized for AI agents.
     """
     
     def __init__(self, max_chunk_size: int = 1000, overlap_size: int = 200, 
-                 encoding_name: str = "cl100k_base"):
+                 encoding_name: str = "cl100k_base",
+                 html_parser: str = DEFAULT_HTML_PARSER,
+                 encode_threads: int = 8, compact_chunks: bool = False,
+                 deduplicator=None):
         """
         Initialize the document chunker.
         
@@ -36,10 +243,25 @@ class SemanticDocumentChunker:
             max_chunk_size: Maximum tokens per chunk
             overlap_size: Overlap between chunks in tokens
             encoding_name: Tokenizer encoding to use
+            html_parser: BeautifulSoup parser; lxml is used when installed
+            encode_threads: Threads used by tiktoken for batch encoding
+            compact_chunks: Produce CompactChunk objects sharing document metadata
+            deduplicator: Optional ChunkDeduplicator shared across the corpus;
+                chunks it has already seen are not emitted
         """
         self.max_chunk_size = max_chunk_size
         self.overlap_size = overlap_size
         self.encoding = tiktoken.get_encoding(encoding_name)
+        self.html_parser = html_parser
+        self.encode_threads = encode_threads
+        self.compact_chunks = compact_chunks
+        self.interner = ChunkInterner() if compact_chunks else None
+        self.deduplicator = deduplicator
+        
+        # Token counts per text unit; each unit is encoded once
+        self._token_counts = {}
+        self.max_cached_token_counts = 200_000
+        self._joiner_tokens = self._count_tokens('\n\n')
         
         # Chunk type priorities for semantic preservation
         self.chunk_priorities = {
@@ -63,95 +285,154 @@ class SemanticDocumentChunker:
         Returns:
             List of DocumentChunk objects
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Extract document structure
-        structure = self._extract_document_structure(soup)
+        return list(self.iter_html_chunks(html_content, document_id, metadata))
+    
+    def iter_html_chunks(self, html_content: str, document_id: str,
+                         metadata: Optional[Dict] = None) -> Iterator[DocumentChunk]:
+        """
+        Yield the chunks of an HTML document section by section.
         
-        # Create semantic chunks
-        chunks = []
+        Only the current section's chunks are held at a time, so a consumer such
+        as ChunkExportWriter can write them out as they are produced.
+        """
+        soup = BeautifulSoup(html_content, self.html_parser)
         chunk_index = 0
         
-        for section in structure['sections']:
+        for section in self._iter_sections(soup):
+            # Tokenize every block of the section in one batch
+            texts = []
+            if section['heading'] and section['heading']['text']:
+                texts.append(section['heading']['text'])
+                texts.append(f"# {section['heading']['text']}")
+            texts.extend(text for _, text in section['content_elements'])
+            self._prime_token_counts(texts)
+            
             section_chunks = self._chunk_section(
                 section, document_id, chunk_index, metadata or {}
             )
-            chunks.extend(section_chunks)
             chunk_index += len(section_chunks)
-        
-        return chunks
+            if self.deduplicator:
+                section_chunks = self.deduplicator.filter(section_chunks)
+            yield from section_chunks
     
     def chunk_text_document(self, text_content: str, document_id: str,
                            metadata: Optional[Dict] = None) -> List[DocumentChunk]:
         """
         Chunk plain text document with intelligent boundary detection.
         """
-        # Split by paragraphs and headings
-        sections = self._split_text_by_structure(text_content)
-        
-        chunks = []
+        return list(self.iter_text_chunks(text_content, document_id, metadata))
+    
+    def iter_text_chunks(self, text_content: str, document_id: str,
+                         metadata: Optional[Dict] = None) -> Iterator[DocumentChunk]:
+        """
+        Yield the chunks of a plain text document section by section.
+        """
         chunk_index = 0
         
-        for section in sections:
+        # Split by paragraphs and headings
+        for section in self._iter_text_sections(text_content):
+            # Tokenize every paragraph of the section in one batch
+            texts = list(section['content'])
+            if section['heading']:
+                texts.append(section['heading'])
+                texts.append(f"# {section['heading']}")
+            self._prime_token_counts(texts)
+            
             section_chunks = self._chunk_text_section(
                 section, document_id, chunk_index, metadata or {}
             )
-            chunks.extend(section_chunks)
             chunk_index += len(section_chunks)
-        
-        return chunks
+            if self.deduplicator:
+                section_chunks = self.deduplicator.filter(section_chunks)
+            yield from section_chunks
     
     def _extract_document_structure(self, soup: BeautifulSoup) -> Dict[str, Any]:
         """Extract hierarchical structure from HTML document."""
-        structure = {
+        return {
             'title': self._extract_title(soup),
-            'sections': []
+            'sections': list(self._iter_sections(soup))
         }
-        
-        # Find all structural elements
-        structural_elements = soup.find_all([
-            'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
-            'p', 'div', 'section', 'article',
-            'pre', 'code', 'table', 'ul', 'ol'
-        ])
-        
+    
+    def _iter_sections(self, soup: BeautifulSoup) -> Iterator[Dict[str, Any]]:
+        """Group the document's text blocks into sections led by headings."""
         current_section = None
-        current_heading = None
         
-        for element in structural_elements:
-            if element.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
+        for element, text in self._iter_text_blocks(soup.body or soup):
+            if element.name in HEADING_TAGS:
                 # Start new section
                 if current_section:
-                    structure['sections'].append(current_section)
-                
-                current_heading = {
-                    'level': int(element.name[1]),
-                    'text': element.get_text().strip(),
-                    'element': element
-                }
+                    yield current_section
                 
                 current_section = {
-                    'heading': current_heading,
+                    'heading': {
+                        'level': int(element.name[1]),
+                        'text': text,
+                        'element': element
+                    },
                     'content_elements': []
                 }
             
-            elif current_section:
-                # Add to current section
-                current_section['content_elements'].append(element)
-            else:
-                # Create section without heading
+            elif text:
                 if not current_section:
+                    # Create section without heading
                     current_section = {
                         'heading': None,
                         'content_elements': []
                     }
-                current_section['content_elements'].append(element)
+                current_section['content_elements'].append((element, text))
         
         # Add final section
         if current_section:
-            structure['sections'].append(current_section)
+            yield current_section
+    
+    def _iter_text_blocks(self, root: Tag):
+        """
+        Walk the DOM once in document order and yield (element, text) blocks.
         
-        return structure
+        Headings and block elements (paragraphs, code, tables, lists) are yielded
+        whole. Loose text and inline elements sitting directly in a container
+        such as a div are joined into one block attributed to that container.
+        Every text node is therefore read exactly once, however deeply the
+        containers are nested.
+        """
+        stack = [iter(root.children)]
+        run_parent = root
+        run_parts = []
+        
+        while stack:
+            node = next(stack[-1], None)
+            
+            is_tag = isinstance(node, Tag)
+            if is_tag and node.name in SKIPPED_TAGS:
+                continue
+            inline = is_tag and self._is_inline(node)
+            
+            if node is None or (is_tag and not inline):
+                # A block boundary ends the current run of loose text
+                if run_parts:
+                    yield run_parent, ''.join(run_parts).strip()
+                    run_parts = []
+            
+            if node is None:
+                stack.pop()
+            elif is_tag:
+                if inline:
+                    run_parent = node.parent
+                    run_parts.append(node.get_text())
+                elif node.name in HEADING_TAGS or node.name in BLOCK_TAGS:
+                    yield node, node.get_text().strip()
+                else:
+                    stack.append(iter(node.children))
+            elif type(node) is NavigableString:
+                run_parent = node.parent
+                run_parts.append(str(node))
+    
+    def _is_inline(self, element: Tag) -> bool:
+        """Inline elements wrapping block content (e.g. card links) are walked as containers."""
+        if element.name not in INLINE_TAGS:
+            return False
+        return all(not isinstance(child, Tag) or child.name in INLINE_TAGS
+                   for child in element.children)
     
     def _chunk_section(self, section: Dict, document_id: str, 
                       start_index: int, metadata: Dict) -> List[DocumentChunk]:
@@ -164,8 +445,8 @@ class SemanticDocumentChunker:
             heading_text = section['heading']['text']
         
         content_elements = []
-        for element in section['content_elements']:
-            element_info = self._analyze_element(element)
+        for element, text in section['content_elements']:
+            element_info = self._analyze_element(element, text)
             content_elements.append(element_info)
         
         # Group elements into chunks based on token limits
@@ -173,7 +454,7 @@ class SemanticDocumentChunker:
         current_tokens = 0
         
         # Add heading to context if present
-        heading_tokens = len(self.encoding.encode(heading_text)) if heading_text else 0
+        heading_tokens = self._count_tokens(heading_text) if heading_text else 0
         
         for element_info in content_elements:
             element_tokens = element_info['token_count']
@@ -208,15 +489,16 @@ class SemanticDocumentChunker:
         
         return chunks
     
-    def _analyze_element(self, element) -> Dict[str, Any]:
-        """Analyze an HTML element for chunking purposes."""
-        text = element.get_text().strip()
+    def _analyze_element(self, element, text: Optional[str] = None) -> Dict[str, Any]:
+        """Analyze an HTML element (or a run of text inside it) for chunking purposes."""
+        if text is None:
+            text = element.get_text().strip()
         
         element_info = {
             'tag': element.name,
             'text': text,
             'word_count': len(text.split()),
-            'token_count': len(self.encoding.encode(text)),
+            'token_count': self._count_tokens(text),
             'type': self._classify_element_type(element),
             'attributes': dict(element.attrs) if element.attrs else {},
             'element': element
@@ -309,7 +591,7 @@ class SemanticDocumentChunker:
         
         # Calculate statistics
         word_count = len(content.split())
-        token_count = len(self.encoding.encode(content))
+        token_count = self._sum_token_counts(content_parts)
         
         # Determine primary chunk type
         element_types = [el['type'] for el in elements]
@@ -338,7 +620,7 @@ class SemanticDocumentChunker:
             }
         }
         
-        return DocumentChunk(
+        return self._make_chunk(
             chunk_id=chunk_id,
             document_id=document_id,
             content=content,
@@ -347,7 +629,8 @@ class SemanticDocumentChunker:
             metadata=chunk_metadata,
             word_count=word_count,
             token_count=token_count,
-            context=context
+            context=context,
+            document_metadata=metadata
         )
     
     def _calculate_complexity_score(self, elements: List[Dict]) -> float:
@@ -405,14 +688,13 @@ class SemanticDocumentChunker:
     
     def _split_text_by_structure(self, text: str) -> List[Dict]:
         """Split plain text into structural sections."""
-        sections = []
-        
-        # Split by double newlines (paragraph boundaries)
-        paragraphs = re.split(r'\n\s*\n', text)
-        
+        return list(self._iter_text_sections(text))
+    
+    def _iter_text_sections(self, text: str) -> Iterator[Dict]:
+        """Yield structural sections of plain text without splitting it all up front."""
         current_section = {'heading': None, 'content': []}
         
-        for paragraph in paragraphs:
+        for paragraph in self._iter_paragraphs(text):
             paragraph = paragraph.strip()
             if not paragraph:
                 continue
@@ -421,7 +703,7 @@ class SemanticDocumentChunker:
             if self._is_text_heading(paragraph):
                 # Start new section
                 if current_section['content']:
-                    sections.append(current_section)
+                    yield current_section
                 
                 current_section = {
                     'heading': paragraph,
@@ -432,9 +714,15 @@ class SemanticDocumentChunker:
         
         # Add final section
         if current_section['content']:
-            sections.append(current_section)
-        
-        return sections
+            yield current_section
+    
+    def _iter_paragraphs(self, text: str) -> Iterator[str]:
+        """Split by double newlines (paragraph boundaries), lazily."""
+        start = 0
+        for match in PARAGRAPH_BREAK.finditer(text):
+            yield text[start:match.start()]
+            start = match.end()
+        yield text[start:]
     
     def _is_text_heading(self, text: str) -> bool:
         """Determine if text line is likely a heading."""
@@ -467,10 +755,10 @@ class SemanticDocumentChunker:
         current_chunk_content = []
         current_tokens = 0
         
-        heading_tokens = len(self.encoding.encode(heading)) if heading else 0
+        heading_tokens = self._count_tokens(heading) if heading else 0
         
         for paragraph in content_paragraphs:
-            paragraph_tokens = len(self.encoding.encode(paragraph))
+            paragraph_tokens = self._count_tokens(paragraph)
             
             if (current_tokens + paragraph_tokens + heading_tokens > self.max_chunk_size 
                 and current_chunk_content):
@@ -485,7 +773,7 @@ class SemanticDocumentChunker:
                 # Start new chunk with overlap
                 overlap_content = self._get_text_overlap(current_chunk_content, self.overlap_size)
                 current_chunk_content = overlap_content
-                current_tokens = sum(len(self.encoding.encode(p)) for p in current_chunk_content)
+                current_tokens = sum(self._count_tokens(p) for p in current_chunk_content)
             
             current_chunk_content.append(paragraph)
             current_tokens += paragraph_tokens
@@ -511,7 +799,7 @@ class SemanticDocumentChunker:
         content = '\n\n'.join(content_parts)
         
         word_count = len(content.split())
-        token_count = len(self.encoding.encode(content))
+        token_count = self._sum_token_counts(content_parts)
         
         chunk_id = hashlib.md5(f"{document_id}_{chunk_index}_{content[:100]}".encode()).hexdigest()
         
@@ -521,7 +809,7 @@ class SemanticDocumentChunker:
             'position_in_document': chunk_index
         }
         
-        return DocumentChunk(
+        return self._make_chunk(
             chunk_id=chunk_id,
             document_id=document_id,
             content=content,
@@ -530,16 +818,24 @@ class SemanticDocumentChunker:
             metadata=metadata,
             word_count=word_count,
             token_count=token_count,
-            context=context
+            context=context,
+            document_metadata=metadata
         )
     
+    def _make_chunk(self, document_metadata: Dict, **fields) -> DocumentChunk:
+        """Build a DocumentChunk, or a CompactChunk when compact_chunks is set."""
+        if self.compact_chunks:
+            return CompactChunk(**fields, interner=self.interner,
+                                document_metadata=document_metadata)
+        return DocumentChunk(**fields)
+    
     def _get_text_overlap(self, paragraphs: List[str], overlap_tokens: int) -> List[str]:
         """Get paragraphs for text overlap."""
         overlap_paragraphs = []
         current_tokens = 0
         
         for paragraph in reversed(paragraphs):
-            paragraph_tokens = len(self.encoding.encode(paragraph))
+            paragraph_tokens = self._count_tokens(paragraph)
             if current_tokens + paragraph_tokens <= overlap_tokens:
                 overlap_paragraphs.insert(0, paragraph)
                 current_tokens += paragraph_tokens
@@ -548,26 +844,117 @@ class SemanticDocumentChunker:
         
         return overlap_paragraphs
     
-    def export_chunks_for_rag(self, chunks: List[DocumentChunk], 
+    def _count_tokens(self, text: str) -> int:
+        """Return the token count of a text unit, encoding it at most once."""
+        count = self._token_counts.get(text)
+        if count is None:
+            count = len(self.encoding.encode_ordinary(text))
+            self._cache_token_count(text, count)
+        return count
+    
+    def _prime_token_counts(self, texts: List[str]) -> None:
+        """Encode all uncached texts in one multi-threaded tiktoken batch."""
+        missing = [text for text in dict.fromkeys(texts) if text not in self._token_counts]
+        if not missing:
+            return
+        
+        if len(missing) > 1:
+            encoded = self.encoding.encode_ordinary_batch(missing, num_threads=self.encode_threads)
+        else:
+            encoded = [self.encoding.encode_ordinary(missing[0])]
+        
+        for text, tokens in zip(missing, encoded):
+            self._cache_token_count(text, len(tokens))
+    
+    def _cache_token_count(self, text: str, count: int) -> None:
+        if len(self._token_counts) >= self.max_cached_token_counts:
+            self._token_counts.clear()
+        self._token_counts[text] = count
+    
+    def _sum_token_counts(self, parts: List[str]) -> int:
+        """
+        Token count of parts joined with blank lines, derived from the cached
+        per-part counts plus the joiners between them. Where a part ends in
+        punctuation the tokenizer may merge it with the joiner, so the sum can
+        over-count by one token per joiner, which keeps chunk sizes conservative.
+        """
+        if not parts:
+            return 0
+        return sum(self._count_tokens(part) for part in parts) + self._joiner_tokens * (len(parts) - 1)
+    
+    def export_chunks_for_rag(self, chunks: Iterable[DocumentChunk], 
                              output_path: Path) -> None:
         """Export chunks in RAG-compatible format."""
-        rag_data = []
-        
+        with ChunkExportWriter(output_path) as writer:
+            writer.write_all(chunks)
+
+
+def chunk_to_rag_entry(chunk: DocumentChunk) -> Dict[str, Any]:
+    """Convert a chunk to the RAG export schema."""
+    return {
+        'id': chunk.chunk_id,
+        'document_id': chunk.document_id,
+        'content': chunk.content,
+        'metadata': {
+            **chunk.metadata,
+            'chunk_type': chunk.chunk_type,
+            'chunk_index': chunk.chunk_index,
+            'word_count': chunk.word_count,
+            'token_count': chunk.token_count,
+            'context': chunk.context
+        }
+    }
+
+
+class ChunkExportWriter:
+    """
+    Streams chunks to a RAG export file as they are produced.
+    
+    A ``.jsonl`` path gets one entry per line; any other path gets a JSON array
+    written entry by entry, so neither format needs all chunks in memory.
+    """
+    
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.jsonl = self.output_path.suffix == '.jsonl'
+        self.count = 0
+        self._file = None
+    
+    def __enter__(self) -> "ChunkExportWriter":
+        return self.open()
+    
+    def open(self) -> "ChunkExportWriter":
+        """Create the export file; chunks can be written until close()."""
+        self._file = open(self.output_path, 'w', encoding='utf-8')
+        if not self.jsonl:
+            self._file.write('[')
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    def write(self, chunk: DocumentChunk) -> None:
+        """Append one chunk to the export."""
+        entry = chunk_to_rag_entry(chunk)
+        if self.jsonl:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        else:
+            if self.count:
+                self._file.write(',')
+            self._file.write('\n' + json.dumps(entry, indent=2, ensure_ascii=False))
+        self.count += 1
+    
+    def write_all(self, chunks: Iterable[DocumentChunk]) -> int:
+        """Append every chunk from an iterable and return how many were written."""
         for chunk in chunks:
-            rag_entry = {
-                'id': chunk.chunk_id,
-                'document_id': chunk.document_id,
-                'content': chunk.content,
-                'metadata': {
-                    **chunk.metadata,
-                    'chunk_type': chunk.chunk_type,
-                    'chunk_index': chunk.chunk_index,
-                    'word_count': chunk.word_count,
-                    'token_count': chunk.token_count,
-                    'context': chunk.context
-                }
-            }
-            rag_data.append(rag_entry)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(rag_data, f, indent=2, ensure_ascii=False)
+            self.write(chunk)
+        return self.count
+    
+    def close(self) -> None:
+        """Finish the export file."""
+        if self._file is None:
+            return
+        if not self.jsonl:
+            self._file.write('\n]\n' if self.count else ']\n')
+        self._file.close()
+        self._file = None
@@ -8,25 +8,67 @@ import json
 import numpy as np
 import faiss
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import logging
 import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.cluster import KMeans
+from sklearn.cluster import MiniBatchKMeans
 from sklearn.decomposition import PCA
 import torch
 
-from document_chunker import DocumentChunk
+from document_chunker import DocumentChunk, CompactChunk, ChunkInterner
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def iter_json_array(path: Path, read_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield the elements of a JSON array file one at a time.
+    
+    Only the element being decoded is held in memory, so large metadata files
+    can be counted or copied without loading them whole.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, eof, started = '', False, False
+        while True:
+            buffer = buffer.lstrip()
+            if not started:
+                if buffer:
+                    if buffer[0] != '[':
+                        raise ValueError(f"{path} does not hold a JSON array")
+                    buffer, started = buffer[1:], True
+                    continue
+            elif buffer[:1] == ']':
+                return
+            elif buffer[:1] == ',':
+                buffer = buffer[1:]
+                continue
+            elif buffer:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    end = None
+                # An element ending exactly at the buffer end may be cut short
+                if end is not None and (end < len(buffer) or eof):
+                    yield item
+                    buffer = buffer[end:]
+                    continue
+            if eof:
+                raise ValueError(f"{path} ends inside a JSON array")
+            chunk = f.read(read_size)
+            eof = not chunk
+            buffer += chunk
+
+
 @dataclass
 class EmbeddingMetadata:
     """Metadata for embeddings."""
@@ -39,6 +81,90 @@ class EmbeddingMetadata:
     topic_keywords: Optional[List[str]] = None
 
 
+@dataclass
+class MetadataColumns:
+    """
+    Columnar, read-only view of an embeddings metadata file.
+    
+    Rows are resolved by position so a search only touches the k hits it
+    returns. Keywords are stored flat with per-row offsets.
+    """
+    version: Tuple[int, int]
+    embedding_ids: np.ndarray
+    chunk_ids: np.ndarray
+    model_names: List[str]
+    model_codes: np.ndarray
+    embedding_dimensions: np.ndarray
+    created_timestamps: np.ndarray
+    clusters: np.ndarray  # -1 where no cluster was assigned
+    keyword_offsets: np.ndarray
+    keywords: np.ndarray
+    
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], 
+                     version: Tuple[int, int]) -> "MetadataColumns":
+        """Build the columns from the list stored in a metadata JSON file."""
+        model_names = []
+        model_lookup = {}
+        model_codes = np.empty(len(records), dtype=np.int16)
+        keyword_offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        keywords = []
+        
+        for i, record in enumerate(records):
+            model_name = record.get('model_name', '')
+            if model_name not in model_lookup:
+                model_lookup[model_name] = len(model_names)
+                model_names.append(model_name)
+            model_codes[i] = model_lookup[model_name]
+            
+            keywords.extend(record.get('topic_keywords') or [])
+            keyword_offsets[i + 1] = len(keywords)
+        
+        clusters = [record.get('similarity_cluster') for record in records]
+        
+        return cls(
+            version=version,
+            embedding_ids=np.array([r.get('embedding_id', '') for r in records], dtype=str),
+            chunk_ids=np.array([r['chunk_id'] for r in records], dtype=str),
+            model_names=model_names,
+            model_codes=model_codes,
+            embedding_dimensions=np.array(
+                [r.get('embedding_dimension', 0) for r in records], dtype=np.int32
+            ),
+            created_timestamps=np.array(
+                [r.get('created_timestamp', '') for r in records], dtype=str
+            ),
+            clusters=np.array([-1 if c is None else c for c in clusters], dtype=np.int32),
+            keyword_offsets=keyword_offsets,
+            keywords=np.array(keywords, dtype=str)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+    
+    def cluster(self, row: int) -> Optional[int]:
+        """Cluster of a row, or None if it was never clustered."""
+        cluster = int(self.clusters[row])
+        return None if cluster < 0 else cluster
+    
+    def topic_keywords(self, row: int) -> List[str]:
+        """Topic keywords of a row."""
+        start, end = self.keyword_offsets[row], self.keyword_offsets[row + 1]
+        return self.keywords[start:end].tolist()
+    
+    def record(self, row: int) -> Dict[str, Any]:
+        """Rebuild the original metadata dict for a row."""
+        return {
+            'embedding_id': str(self.embedding_ids[row]),
+            'chunk_id': str(self.chunk_ids[row]),
+            'model_name': self.model_names[self.model_codes[row]],
+            'embedding_dimension': int(self.embedding_dimensions[row]),
+            'created_timestamp': str(self.created_timestamps[row]),
+            'similarity_cluster': self.cluster(row),
+            'topic_keywords': self.topic_keywords(row)
+        }
+
+
 class AdvancedEmbeddingGenerator:
     """
     Advanced embedding generation system with multiple strategies and optimizations.
@@ -47,7 +173,9 @@ class AdvancedEmbeddingGenerator:
     def __init__(self, 
                  model_name: str = "all-MiniLM-L6-v2",
                  output_path: str = "./embeddings",
-                 batch_size: int = 32):
+                 batch_size: int = 32,
+                 clustering_backend: str = "faiss",
+                 index_type: str = "flat"):
         """
         Initialize the embedding generator.
         
@@ -55,10 +183,15 @@ class AdvancedEmbeddingGenerator:
             model_name: Sentence transformer model to use
             output_path: Path to store embeddings and indices
             batch_size: Batch size for processing
+            clustering_backend: 'faiss' (faiss.Kmeans) or 'minibatch' (MiniBatchKMeans)
+            index_type: 'flat' for exact search or 'ivf' to use the cluster
+                centroids as the coarse quantizer of an IVF index
         """
         self.model_name = model_name
         self.output_path = Path(output_path)
         self.batch_size = batch_size
+        self.clustering_backend = clustering_backend
+        self.index_type = index_type
         
         # Create output directories
         self.output_path.mkdir(parents=True, exist_ok=True)
@@ -132,7 +265,9 @@ class AdvancedEmbeddingGenerator:
         embeddings_array = np.array(all_embeddings, dtype=np.float32)
         
         # Perform clustering for topic discovery
-        cluster_labels = self.perform_semantic_clustering(embeddings_array, chunks)
+        cluster_labels = self.perform_semantic_clustering(
+            embeddings_array, chunks, content_type=content_type
+        )
         
         # Update metadata with cluster information
         for i, metadata in enumerate(chunk_metadata):
@@ -140,7 +275,10 @@ class AdvancedEmbeddingGenerator:
             metadata.topic_keywords = self.extract_topic_keywords_from_chunk(chunks[i])
         
         # Create and save FAISS index
-        index_path = self.create_faiss_index(embeddings_array, content_type)
+        if self.index_type == "ivf":
+            index_path = self.create_ivf_index(embeddings_array, content_type)
+        else:
+            index_path = self.create_faiss_index(embeddings_array, content_type)
         
         # Save embeddings and metadata
         embeddings_file = self.output_path / "vectors" / f"{content_type}_embeddings.npy"
@@ -162,12 +300,12 @@ class AdvancedEmbeddingGenerator:
             "index_path": index_path,
             "statistics": stats,
             "clusters": {
-                "total_clusters": len(set(cluster_labels)),
+                "total_clusters": int(np.count_nonzero(np.bincount(cluster_labels))),
                 "cluster_distribution": self.analyze_cluster_distribution(cluster_labels, chunks)
             }
         }
         
-        logger.info(f"Generated {len(all_embeddings)} embeddings with {len(set(cluster_labels))} clusters")
+        logger.info(f"Generated {len(all_embeddings)} embeddings with {result['clusters']['total_clusters']} clusters")
         return result
     
     def preprocess_text_for_embedding(self, chunk: DocumentChunk) -> str:
@@ -203,33 +341,136 @@ class AdvancedEmbeddingGenerator:
     def perform_semantic_clustering(self, 
                                    embeddings: np.ndarray, 
                                    chunks: List[DocumentChunk],
-                                   max_clusters: int = None) -> np.ndarray:
+                                   max_clusters: int = None,
+                                   content_type: str = "mixed") -> np.ndarray:
         """
         Perform semantic clustering on embeddings to discover topics.
+        
+        Clustering is warm-started from the centroids saved by the previous run
+        for the same content type, so re-clustering a grown corpus converges in
+        a few iterations. If the number of clusters changed, the saved centroids
+        are trimmed or topped up to fit (see warm_start_centroids). Centroids
+        and labels are stored as .npy files; the JSON file only carries the
+        summary.
         """
         if max_clusters is None:
             # Dynamic cluster number based on content size
             max_clusters = min(50, max(5, len(chunks) // 20))
+        max_clusters = min(max_clusters, len(embeddings))
+        
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        dimension = embeddings.shape[1]
         
-        # Use K-means clustering
-        kmeans = KMeans(n_clusters=max_clusters, random_state=42, n_init=10)
-        cluster_labels = kmeans.fit_predict(embeddings)
+        init_centroids = self.warm_start_centroids(
+            self.load_cluster_centroids(content_type), embeddings, max_clusters, content_type
+        )
+        
+        if self.clustering_backend == "minibatch":
+            kmeans = MiniBatchKMeans(
+                n_clusters=max_clusters,
+                init=init_centroids if init_centroids is not None else "k-means++",
+                n_init=1 if init_centroids is not None else 3,
+                batch_size=max(1024, max_clusters * 20),
+                random_state=42
+            )
+            cluster_labels = kmeans.fit_predict(embeddings)
+            centroids = kmeans.cluster_centers_.astype(np.float32)
+            inertia = float(kmeans.inertia_)
+        else:
+            kmeans = faiss.Kmeans(
+                dimension, max_clusters,
+                niter=10 if init_centroids is not None else 25,
+                seed=42,
+                spherical=True
+            )
+            kmeans.train(embeddings, init_centroids=init_centroids)
+            distances, assignments = kmeans.index.search(embeddings, 1)
+            cluster_labels = assignments.ravel().astype(np.int64)
+            centroids = kmeans.centroids
+            inertia = float(distances.sum())
         
         # Save cluster information
+        clusters_dir = self.output_path / "clusters"
+        centroids_file = clusters_dir / f"{content_type}_centroids.npy"
+        labels_file = clusters_dir / f"{content_type}_labels.npy"
+        np.save(centroids_file, centroids)
+        np.save(labels_file, cluster_labels)
+        
         cluster_info = {
-            'cluster_centers': kmeans.cluster_centers_.tolist(),
-            'cluster_labels': cluster_labels.tolist(),
+            'content_type': content_type,
+            'backend': self.clustering_backend,
+            'warm_start': init_centroids is not None,
             'n_clusters': max_clusters,
-            'inertia': float(kmeans.inertia_)
+            'inertia': inertia,
+            'cluster_sizes': np.bincount(cluster_labels, minlength=max_clusters).tolist(),
+            'centroids_file': centroids_file.name,
+            'labels_file': labels_file.name
         }
         
-        cluster_file = self.output_path / "clusters" / "semantic_clusters.json"
+        cluster_file = clusters_dir / f"{content_type}_clusters.json"
         with open(cluster_file, 'w', encoding='utf-8') as f:
             json.dump(cluster_info, f, indent=2)
         
         logger.info(f"Created {max_clusters} semantic clusters")
         return cluster_labels
     
+    def warm_start_centroids(self, centroids: Optional[np.ndarray], embeddings: np.ndarray,
+                             n_clusters: int, content_type: str) -> Optional[np.ndarray]:
+        """
+        Fit saved centroids to a new number of clusters.
+        
+        The corpus growing past a 20-chunk boundary changes the cluster count.
+        Fewer clusters keep the previously largest ones; more clusters add
+        embeddings drawn at random as the extra centroids. Centroids of another
+        dimension cannot be reused.
+        
+        Returns:
+            (n_clusters, dim) initial centroids, or None to cluster from scratch
+        """
+        if centroids is None:
+            return None
+        if centroids.ndim != 2 or centroids.shape[1] != embeddings.shape[1]:
+            logger.info(f"Saved centroids have shape {centroids.shape}, not dimension "
+                        f"{embeddings.shape[1]}; clustering from scratch")
+            return None
+        
+        previous = len(centroids)
+        if previous > n_clusters:
+            sizes = self.previous_cluster_sizes(content_type, previous)
+            keep = np.sort(np.argsort(-sizes, kind='stable')[:n_clusters])
+            centroids = centroids[keep]
+            logger.info(f"Warm start: kept the {n_clusters} largest of {previous} previous clusters")
+        elif previous < n_clusters:
+            rng = np.random.default_rng(42)
+            extra = embeddings[rng.choice(len(embeddings), n_clusters - previous, replace=False)]
+            centroids = np.vstack([centroids, extra])
+            logger.info(f"Warm start: added {n_clusters - previous} centroids to {previous} previous clusters")
+        return np.ascontiguousarray(centroids, dtype=np.float32)
+    
+    def previous_cluster_sizes(self, content_type: str, n_clusters: int) -> np.ndarray:
+        """Cluster sizes recorded by the previous run, or zeros if unavailable."""
+        cluster_file = self.output_path / "clusters" / f"{content_type}_clusters.json"
+        try:
+            with open(cluster_file, 'r', encoding='utf-8') as f:
+                sizes = np.asarray(json.load(f).get('cluster_sizes', []))
+            if len(sizes) == n_clusters:
+                return sizes
+        except (OSError, ValueError) as e:
+            logger.debug(f"No previous cluster sizes in {cluster_file}: {e}")
+        return np.zeros(n_clusters)
+    
+    def load_cluster_centroids(self, content_type: str) -> Optional[np.ndarray]:
+        """Load centroids saved by a previous clustering run, if any."""
+        centroids_file = self.output_path / "clusters" / f"{content_type}_centroids.npy"
+        if not centroids_file.exists():
+            return None
+        
+        try:
+            return np.ascontiguousarray(np.load(centroids_file), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Could not load cluster centroids {centroids_file}: {e}")
+            return None
+    
     def extract_topic_keywords_from_chunk(self, chunk: DocumentChunk) -> List[str]:
         """
         Extract topic keywords from chunk content using simple heuristics.
@@ -282,6 +523,45 @@ class AdvancedEmbeddingGenerator:
         logger.info(f"Created FAISS index with {index.ntotal} vectors: {index_path}")
         return str(index_path)
     
+    def create_ivf_index(self, 
+                         embeddings: np.ndarray, 
+                         content_type: str,
+                         centroids: Optional[np.ndarray] = None,
+                         nprobe: int = 8) -> str:
+        """
+        Create an IVF index that uses the semantic cluster centroids as its
+        coarse quantizer, so no separate quantizer training pass is needed.
+        """
+        if centroids is None:
+            centroids = self.load_cluster_centroids(content_type)
+        if centroids is None:
+            logger.warning(f"No cluster centroids for {content_type}, falling back to a flat index")
+            return self.create_faiss_index(embeddings, content_type)
+        
+        centroids = np.array(centroids, dtype=np.float32)
+        faiss.normalize_L2(centroids)
+        
+        quantizer = faiss.IndexFlatIP(self.embedding_dim)
+        quantizer.add(centroids)
+        
+        index = faiss.IndexIVFFlat(
+            quantizer, self.embedding_dim, len(centroids), faiss.METRIC_INNER_PRODUCT
+        )
+        # The quantizer already holds the trained centroids
+        index.is_trained = True
+        index.nprobe = min(nprobe, len(centroids))
+        
+        faiss.normalize_L2(embeddings)
+        index.add(embeddings)
+        
+        index_path = self.output_path / "indices" / f"{content_type}_index.faiss"
+        faiss.write_index(index, str(index_path))
+        
+        self.indices[content_type] = index
+        
+        logger.info(f"Created IVF index with {index.ntotal} vectors in {index.nlist} lists: {index_path}")
+        return str(index_path)
+    
     def calculate_embedding_statistics(self, 
                                      embeddings: np.ndarray, 
                                      metadata: List[EmbeddingMetadata]) -> Dict[str, Any]:
@@ -329,14 +609,23 @@ class AdvancedEmbeddingGenerator:
         """
         Analyze the distribution of chunks across clusters.
         """
-        unique_labels, counts = np.unique(cluster_labels, return_counts=True)
+        cluster_labels = np.asarray(cluster_labels, dtype=np.int64)
+        if cluster_labels.size == 0:
+            return {}
+        
+        # Group chunk positions by cluster in one stable sort instead of
+        # rescanning every chunk for each cluster
+        counts = np.bincount(cluster_labels)
+        order = np.argsort(cluster_labels, kind='stable')
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
         
         distribution = {}
-        for label, count in zip(unique_labels, counts):
+        for label in np.flatnonzero(counts):
+            count = counts[label]
             # Get sample chunk titles from this cluster
-            cluster_chunks = [chunks[i] for i in range(len(chunks)) if cluster_labels[i] == label]
-            sample_titles = [chunk.context.get('heading', 'No title')[:50] 
-                           for chunk in cluster_chunks[:3]]
+            members = order[starts[label]:starts[label] + 3]
+            sample_titles = [chunks[i].context.get('heading', 'No title')[:50] 
+                           for i in members]
             
             distribution[f"cluster_{label}"] = {
                 'chunk_count': int(count),
@@ -353,94 +642,289 @@ class AdvancedEmbeddingGenerator:
                        similarity_threshold: float = 0.5) -> List[Dict[str, Any]]:
         """
         Perform semantic search using the generated embeddings.
+        
+        "unified" is served by searching the per-type shards it was built from.
+        """
+        if content_type == "unified":
+            shards = self.unified_shards()
+            if shards is not None:
+                return self.sharded_search(query, shards, top_k, similarity_threshold)
+        
+        if self.get_index(content_type) is None:
+            logger.error(f"No index found for content type: {content_type}")
+            return []
+        
+        query_embedding = self.encode_query(query)
+        return self.search_shard(query_embedding, content_type, top_k, similarity_threshold)
+    
+    def sharded_search(self,
+                       query: str,
+                       content_types: Optional[List[str]] = None,
+                       top_k: int = 10,
+                       similarity_threshold: float = 0.5,
+                       shard_weights: Optional[Dict[str, float]] = None,
+                       shard_filters: Optional[Dict[str, Callable[[Dict[str, Any]], bool]]] = None,
+                       max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
+        Search several per-content-type indices concurrently and merge the hits.
+        
+        Args:
+            query: Search query text
+            content_types: Shards to search; defaults to every per-type index on disk
+            top_k: Number of merged results to return
+            similarity_threshold: Minimum raw similarity for a hit to be kept
+            shard_weights: Optional multiplier applied to each shard's scores
+            shard_filters: Optional predicate per shard, called with each result dict
+            max_workers: Thread pool size; FAISS releases the GIL while searching
+            
+        Returns:
+            Merged results ordered by weighted score, each tagged with its shard
+        """
+        if content_types is None:
+            content_types = self.list_shards()
+        shard_weights = shard_weights or {}
+        shard_filters = shard_filters or {}
+        
+        content_types = [ct for ct in content_types if self.get_index(ct) is not None]
+        if not content_types:
+            logger.error("No shard indices found for sharded search")
+            return []
+        
+        query_embedding = self.encode_query(query)
+        
+        def search_one(content_type: str) -> List[Dict[str, Any]]:
+            shard_filter = shard_filters.get(content_type)
+            # Over-fetch when filtering so the shard can still fill top_k
+            shard_k = top_k * 4 if shard_filter else top_k
+            weight = shard_weights.get(content_type, 1.0)
+            
+            hits = []
+            for result in self.search_shard(query_embedding, content_type, 
+                                            shard_k, similarity_threshold):
+                if shard_filter and not shard_filter(result):
+                    continue
+                result['shard'] = content_type
+                result['weighted_score'] = result['similarity_score'] * weight
+                hits.append(result)
+            return hits
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(content_types)) as executor:
+            shard_results = list(executor.map(search_one, content_types))
+        
+        return heapq.nlargest(
+            top_k,
+            (hit for hits in shard_results for hit in hits),
+            key=lambda hit: hit['weighted_score']
+        )
+    
+    def list_shards(self) -> List[str]:
+        """List the per-content-type indices available on disk."""
+        suffix = "_index.faiss"
+        return sorted(
+            path.name[:-len(suffix)]
+            for path in (self.output_path / "indices").glob(f"*{suffix}")
+            if path.name != f"unified{suffix}"
+        )
+    
+    def get_index(self, content_type: str) -> Optional[Any]:
+        """Return the FAISS index for a content type, loading it from disk if needed."""
         if content_type not in self.indices:
-            # Try to load existing index
             index_path = self.output_path / "indices" / f"{content_type}_index.faiss"
-            if index_path.exists():
-                self.indices[content_type] = faiss.read_index(str(index_path))
-            else:
-                logger.error(f"No index found for content type: {content_type}")
-                return []
-        
-        # Generate query embedding
+            if not index_path.exists():
+                return None
+            self.indices[content_type] = faiss.read_index(str(index_path))
+        return self.indices[content_type]
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """Encode a query into a normalized float32 row vector."""
         query_embedding = self.embedding_model.encode([query], normalize_embeddings=True)
-        query_embedding = query_embedding.astype(np.float32)
-        
-        # Search
-        scores, indices = self.indices[content_type].search(query_embedding, top_k)
+        return query_embedding.astype(np.float32)
+    
+    def search_shard(self, 
+                     query_embedding: np.ndarray, 
+                     content_type: str,
+                     top_k: int,
+                     similarity_threshold: float) -> List[Dict[str, Any]]:
+        """Search a single content type's index with an encoded query."""
+        scores, indices = self.get_index(content_type).search(query_embedding, top_k)
         
-        # Load metadata
-        metadata_file = self.output_path / "metadata" / f"{content_type}_metadata.json"
-        if metadata_file.exists():
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                metadata_list = json.load(f)
-        else:
-            metadata_list = []
+        # Resolve hits against the cached metadata columns
+        metadata = self.load_search_metadata(content_type)
+        metadata_count = len(metadata) if metadata is not None else 0
         
         # Prepare results
         results = []
         for score, idx in zip(scores[0], indices[0]):
-            if score >= similarity_threshold and idx < len(metadata_list):
+            if score >= similarity_threshold and 0 <= idx < metadata_count:
                 result = {
-                    'chunk_id': metadata_list[idx]['chunk_id'],
+                    'chunk_id': str(metadata.chunk_ids[idx]),
                     'similarity_score': float(score),
-                    'cluster': metadata_list[idx].get('similarity_cluster'),
-                    'topic_keywords': metadata_list[idx].get('topic_keywords', []),
-                    'metadata': metadata_list[idx]
+                    'cluster': metadata.cluster(idx),
+                    'topic_keywords': metadata.topic_keywords(idx),
+                    'metadata': metadata.record(idx)
                 }
                 results.append(result)
         
         return results
     
+    def load_search_metadata(self, content_type: str) -> Optional[MetadataColumns]:
+        """
+        Load the metadata for a content type into columnar form.
+        
+        The parsed columns are cached and only rebuilt when the file's
+        (mtime, size) version changes, so repeated searches skip the JSON parse.
+        Both the JSON list and the JSONL layout written by create_unified_index
+        are supported.
+        """
+        metadata_file = self.metadata_file_for(content_type)
+        try:
+            stat = metadata_file.stat()
+        except FileNotFoundError:
+            self.metadata_cache.pop(content_type, None)
+            return None
+        
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self.metadata_cache.get(content_type)
+        if cached is not None and cached.version == version:
+            return cached
+        
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            if metadata_file.suffix == '.jsonl':
+                records = [json.loads(line) for line in f if line.strip()]
+            else:
+                records = json.load(f)
+        
+        columns = MetadataColumns.from_records(records, version)
+        self.metadata_cache[content_type] = columns
+        logger.info(f"Loaded {len(columns)} metadata rows for {content_type}")
+        return columns
+    
+    def metadata_file_for(self, content_type: str) -> Path:
+        """Return the metadata file for a content type, preferring JSONL."""
+        jsonl_file = self.output_path / "metadata" / f"{content_type}_metadata.jsonl"
+        if jsonl_file.exists():
+            return jsonl_file
+        return self.output_path / "metadata" / f"{content_type}_metadata.json"
+    
     def generate_embedding_id(self, chunk_id: str) -> str:
         """Generate unique embedding ID."""
         content = f"{chunk_id}_{self.model_name}_{datetime.now().isoformat()}"
         return hashlib.md5(content.encode()).hexdigest()[:12]
     
-    def create_unified_index(self, content_types: List[str]) -> str:
+    def create_unified_index(self, 
+                             content_types: List[str],
+                             block_size: int = 8192) -> str:
         """
-        Create a unified index combining multiple content types.
-        """
-        all_embeddings = []
-        all_metadata = []
+        Combine several content types into one "unified" searchable set.
+        
+        No merged faiss index is built: searching "unified" fans out over the
+        per-type indices (see sharded_search), which are listed with the row
+        range each one occupies in ``unified_shards.json``. The vectors are
+        copied in blocks of ``block_size`` rows into the memory-mapped
+        ``unified_embeddings.npy``, and the metadata is streamed record by
+        record into ``unified_metadata.jsonl``, so memory use is bounded by the
+        block size rather than by the corpus.
         
+        A content type without a per-type index, or whose metadata row count
+        differs from its vector count, is skipped, since its ``shard_row``
+        values would not line up with the vectors.
+        
+        Returns:
+            Path of unified_shards.json, or "" if there was nothing to combine
+        """
+        sources = []
         for content_type in content_types:
             embeddings_file = self.output_path / "vectors" / f"{content_type}_embeddings.npy"
             metadata_file = self.output_path / "metadata" / f"{content_type}_metadata.json"
+            index_path = self.output_path / "indices" / f"{content_type}_index.faiss"
             
             if embeddings_file.exists() and metadata_file.exists():
-                embeddings = np.load(embeddings_file)
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                
-                all_embeddings.append(embeddings)
-                all_metadata.extend(metadata)
+                if not index_path.exists():
+                    logger.warning(f"Skipping {content_type}: no index at {index_path}")
+                    continue
+                embeddings = np.load(embeddings_file, mmap_mode='r')
+                if embeddings.ndim != 2 or embeddings.shape[1] != self.embedding_dim:
+                    logger.warning(f"Skipping {content_type}: embedding shape {embeddings.shape} "
+                                   f"does not match dimension {self.embedding_dim}")
+                    continue
+                metadata_rows = sum(1 for _ in iter_json_array(metadata_file))
+                if metadata_rows != len(embeddings):
+                    logger.warning(f"Skipping {content_type}: {metadata_rows} metadata rows "
+                                   f"for {len(embeddings)} embeddings")
+                    continue
+                sources.append((content_type, embeddings, metadata_file, index_path))
         
-        if not all_embeddings:
+        if not sources:
             logger.error("No embeddings found to create unified index")
             return ""
         
-        # Combine all embeddings
-        unified_embeddings = np.vstack(all_embeddings)
+        total_rows = sum(len(embeddings) for _, embeddings, _, _ in sources)
         
-        # Create unified index
-        unified_index_path = self.create_faiss_index(unified_embeddings, "unified")
+        unified_vectors = np.lib.format.open_memmap(
+            self.output_path / "vectors" / "unified_embeddings.npy",
+            mode='w+', dtype=np.float32, shape=(total_rows, self.embedding_dim)
+        )
+        unified_metadata_file = self.output_path / "metadata" / "unified_metadata.jsonl"
+        shards = []
+        offset = 0
         
-        # Save unified metadata
-        unified_metadata_file = self.output_path / "metadata" / "unified_metadata.json"
-        with open(unified_metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(all_metadata, f, indent=2, ensure_ascii=False)
+        with open(unified_metadata_file, 'w', encoding='utf-8') as meta_out:
+            for content_type, embeddings, metadata_file, index_path in sources:
+                # Copy one block at a time out of the memory-mapped source
+                for start in range(0, len(embeddings), block_size):
+                    block = np.array(embeddings[start:start + block_size], dtype=np.float32)
+                    faiss.normalize_L2(block)
+                    unified_vectors[offset + start:offset + start + len(block)] = block
+                
+                rows = 0
+                for rows, record in enumerate(iter_json_array(metadata_file), 1):
+                    meta_out.write(json.dumps(
+                        {**record, 'content_type': content_type, 'shard_row': rows - 1},
+                        ensure_ascii=False
+                    ) + '\n')
+                if rows != len(embeddings):
+                    raise ValueError(f"{metadata_file} changed while building the unified index")
+                
+                shards.append({
+                    'content_type': content_type,
+                    'start': offset,
+                    'end': offset + len(embeddings),
+                    'index_path': str(index_path)
+                })
+                offset += len(embeddings)
         
-        logger.info(f"Created unified index with {len(unified_embeddings)} embeddings")
-        return unified_index_path
+        unified_vectors.flush()
+        del unified_vectors
+        
+        # Remove files of the earlier monolithic layout so readers pick up the
+        # JSONL metadata and the fan-out
+        for stale_file in (self.output_path / "metadata" / "unified_metadata.json",
+                           self.output_path / "indices" / "unified_index.faiss"):
+            if stale_file.exists():
+                stale_file.unlink()
+        self.indices.pop("unified", None)
+        
+        shards_file = self.output_path / "indices" / "unified_shards.json"
+        with open(shards_file, 'w', encoding='utf-8') as f:
+            json.dump({'total_vectors': total_rows, 'shards': shards}, f, indent=2)
+        
+        logger.info(f"Created unified index over {len(shards)} shards with {total_rows} embeddings")
+        return str(shards_file)
+    
+    def unified_shards(self) -> Optional[List[str]]:
+        """Content types the unified index fans out over, or None if it was never created."""
+        shards_file = self.output_path / "indices" / "unified_shards.json"
+        if not shards_file.exists():
+            return None
+        with open(shards_file, 'r', encoding='utf-8') as f:
+            return [shard['content_type'] for shard in json.load(f)['shards']]
     
     def export_for_rag(self, content_type: str = "unified") -> str:
         """
         Export embeddings in RAG-compatible format.
         """
         embeddings_file = self.output_path / "vectors" / f"{content_type}_embeddings.npy"
-        metadata_file = self.output_path / "metadata" / f"{content_type}_metadata.json"
+        metadata_file = self.metadata_file_for(content_type)
         
         if not embeddings_file.exists() or not metadata_file.exists():
             logger.error(f"Required files not found for content type: {content_type}")
@@ -449,7 +933,10 @@ class AdvancedEmbeddingGenerator:
         # Load data
         embeddings = np.load(embeddings_file)
         with open(metadata_file, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
+            if metadata_file.suffix == '.jsonl':
+                metadata = [json.loads(line) for line in f if line.strip()]
+            else:
+                metadata = json.load(f)
         
         # Create RAG export format
         rag_export = {
@@ -493,13 +980,14 @@ def process_developer_course_embeddings():
     
     # Load all chunks
     all_chunks = []
+    interner = ChunkInterner()
     for chunk_file in chunks_dir.glob("*_chunks.json"):
         with open(chunk_file, 'r', encoding='utf-8') as f:
             chunks_data = json.load(f)
             
         for chunk_data in chunks_data:
-            # Reconstruct DocumentChunk objects
-            chunk = DocumentChunk(
+            # Reconstruct chunks, sharing repeated metadata across the corpus
+            chunk = CompactChunk(
                 chunk_id=chunk_data['chunk_id'],
                 document_id=chunk_data['document_id'],
                 content=chunk_data['content'],
@@ -508,7 +996,8 @@ def process_developer_course_embeddings():
                 metadata=chunk_data['metadata'],
                 word_count=chunk_data['word_count'],
                 token_count=chunk_data['token_count'],
-                context=chunk_data['context']
+                context=chunk_data['context'],
+                interner=interner
             )
             all_chunks.append(chunk)
     
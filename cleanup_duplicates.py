@@ -5,14 +5,29 @@ Removes duplicate files and redundant directories after reorganization
 """
 
 import os
+import sys
+import errno
 import shutil
 import json
 from pathlib import Path
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).resolve().parent / "scripts" / "utilities"))
+from duplicate_finder import LINK_MODES, link_duplicate
+from file_walker import FileWalker
+
 class DuplicateCleanup:
-    def __init__(self, base_dir):
+    def __init__(self, base_dir, link_mode=None):
+        """
+        Args:
+            base_dir: Project root
+            link_mode: 'hardlink' or 'reflink' to replace duplicates with
+                links to the kept file instead of deleting them
+        """
+        if link_mode is not None and link_mode not in LINK_MODES:
+            raise ValueError(f"link_mode must be one of {LINK_MODES}")
         self.base_dir = Path(base_dir)
+        self.link_mode = link_mode
         self.duplicate_report = self.base_dir / "duplicate_files_report.json"
         self.cleanup_log = self.base_dir / "cleanup.log"
         
@@ -88,42 +103,39 @@ class DuplicateCleanup:
             if not files_to_keep and files_to_remove:
                 files_to_keep.append(files_to_remove.pop(0))
             
-            # Remove duplicates
+            # Remove duplicates (or link them to the kept file)
             for file_path in files_to_remove:
                 try:
-                    file_path.unlink()
-                    self.log(f"Removed duplicate: {file_path}")
-                    removed_count += 1
+                    if self.link_mode:
+                        if link_duplicate(files_to_keep[0], file_path, self.link_mode):
+                            self.log(f"Linked duplicate ({self.link_mode}): {file_path} -> {files_to_keep[0]}")
+                            removed_count += 1
+                    else:
+                        file_path.unlink()
+                        self.log(f"Removed duplicate: {file_path}")
+                        removed_count += 1
                 except Exception as e:
                     self.log(f"Error removing {file_path}: {e}")
         
-        self.log(f"Removed {removed_count} duplicate files")
+        if self.link_mode:
+            self.log(f"Linked {removed_count} duplicate files")
+        else:
+            self.log(f"Removed {removed_count} duplicate files")
     
     def remove_empty_directories(self):
         """Remove empty directories recursively"""
-        def is_empty_dir(path):
-            try:
-                return path.is_dir() and not any(path.iterdir())
-            except:
-                return False
+        # One walk; deepest directories first, so parents emptied by
+        # removing their children go too. venv, node_modules and .git are
+        # never entered.
+        directories = [root for root, dirs, files in FileWalker().walk(self.base_dir)][1:]
         
-        # Traverse directories multiple times to catch nested empty dirs
-        for _ in range(5):  # Max 5 iterations
-            empty_dirs = []
-            for root, dirs, files in os.walk(self.base_dir):
-                root_path = Path(root)
-                if is_empty_dir(root_path) and root_path != self.base_dir:
-                    empty_dirs.append(root_path)
-            
-            for empty_dir in empty_dirs:
-                try:
-                    empty_dir.rmdir()
-                    self.log(f"Removed empty directory: {empty_dir}")
-                except Exception as e:
-                    self.log(f"Could not remove {empty_dir}: {e}")
-            
-            if not empty_dirs:
-                break
+        for directory in reversed(directories):
+            try:
+                os.rmdir(directory)
+                self.log(f"Removed empty directory: {directory}")
+            except OSError as e:
+                if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                    self.log(f"Could not remove {directory}: {e}")
     
     def clean_venv_duplicates(self):
         """Clean up virtual environment duplicates"""
@@ -199,20 +211,17 @@ class DuplicateCleanup:
             'final_structure': {}
         }
         
-        for root, dirs, files in os.walk(self.base_dir):
+        # Skip venv directory for report, without walking it
+        for root, dirs, files in FileWalker(skip_directories={'venv'}).walk(self.base_dir):
             rel_path = os.path.relpath(root, self.base_dir)
             if rel_path == '.':
                 rel_path = 'root'
             
-            # Skip venv directory for report
-            if 'venv' in rel_path:
-                continue
-                
             report['final_structure'][rel_path] = {
-                'directories': [d for d in dirs if d != 'venv'],
-                'files': files,
+                'directories': [entry.name for entry in dirs],
+                'files': [entry.name for entry in files],
                 'file_count': len(files),
-                'directory_count': len([d for d in dirs if d != 'venv'])
+                'directory_count': len(dirs)
             }
         
         report_file = self.base_dir / 'final_structure_report.json'
@@ -267,6 +276,13 @@ class DuplicateCleanup:
         print("="*60)
 
 if __name__ == "__main__":
-    base_directory = "/home/andrewwork/creatio-ai-knowledge-hub"
-    cleanup = DuplicateCleanup(base_directory)
+    import argparse
+    parser = argparse.ArgumentParser(description='Remove duplicate files and redundant directories')
+    parser.add_argument('base_dir', nargs='?', default="/home/andrewwork/creatio-ai-knowledge-hub",
+                        help='Project root')
+    parser.add_argument('--link', choices=LINK_MODES,
+                        help='Replace duplicates with hard links or reflinks instead of deleting them')
+    args = parser.parse_args()
+    
+    cleanup = DuplicateCleanup(args.base_dir, link_mode=args.link)
     cleanup.cleanup()
@@ -5,12 +5,16 @@ Reorganizes the Creatio Academy project structure and removes duplicates
 """
 
 import os
+import sys
 import shutil
 import json
-import hashlib
 from pathlib import Path
 from datetime import datetime
 
+sys.path.append(str(Path(__file__).resolve().parent / "scripts" / "utilities"))
+from duplicate_finder import DuplicateFinder
+from file_walker import FileWalker
+
 class ProjectReorganizer:
     def __init__(self, base_dir):
         self.base_dir = Path(base_dir)
@@ -18,6 +22,9 @@ class ProjectReorganizer:
         self.log_file = self.base_dir / "reorganization.log"
         self.duplicate_report = self.base_dir / "duplicate_files_report.json"
         
+        # Never descends into venv, node_modules, .git or caches
+        self.walker = FileWalker()
+        
     def log(self, message):
         """Log messages to file and console"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -27,40 +34,23 @@ class ProjectReorganizer:
         with open(self.log_file, 'a') as f:
             f.write(log_message + '\n')
     
-    def get_file_hash(self, file_path):
-        """Calculate MD5 hash of a file"""
-        hash_md5 = hashlib.md5()
-        try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
-        except Exception as e:
-            self.log(f"Error hashing {file_path}: {e}")
-            return None
-    
     def find_duplicates(self, directories):
-        """Find duplicate files across directories"""
-        file_hashes = {}
-        duplicates = {}
+        """Find duplicate files across directories
         
-        for directory in directories:
-            if not os.path.exists(directory):
-                continue
-                
-            for root, dirs, files in os.walk(directory):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if os.path.isfile(file_path):
-                        file_hash = self.get_file_hash(file_path)
-                        if file_hash:
-                            if file_hash in file_hashes:
-                                if file_hash not in duplicates:
-                                    duplicates[file_hash] = [file_hashes[file_hash]]
-                                duplicates[file_hash].append(file_path)
-                            else:
-                                file_hashes[file_hash] = file_path
+        Only files sharing a size are read, and only those whose first and
+        last 64 KB also match are hashed in full (MD5, as before).
+        """
+        finder = DuplicateFinder()
+        duplicates = finder.find(
+            entry
+            for directory in directories if os.path.exists(directory)
+            for entry in self.walker.files(directory)
+        )
         
+        stats = finder.stats
+        self.log(f"Checked {stats.files} files: {stats.same_size} share a size, "
+                 f"{stats.full_hashed} hashed in full, {stats.bytes_read / 1e6:.1f} MB read "
+                 f"in {stats.seconds:.1f}s")
         return duplicates
     
     def create_new_structure(self):
@@ -107,6 +97,7 @@ class ProjectReorganizer:
         """Move and organize video files"""
         video_extensions = ['.mp4', '.mkv', '.webm', '.avi']
         video_target = self.base_dir / 'videos'
+        walker = FileWalker(extensions=video_extensions)
         
         # Sources to check for videos
         video_sources = [
@@ -119,23 +110,22 @@ class ProjectReorganizer:
             if not source.exists():
                 continue
                 
-            for root, dirs, files in os.walk(source):
-                for file in files:
-                    if any(file.lower().endswith(ext) for ext in video_extensions):
-                        source_file = Path(root) / file
-                        
-                        # Determine target based on file name
-                        if 'live' in file.lower() or 'stream' in file.lower():
-                            target_dir = video_target / 'live_sessions'
-                        else:
-                            target_dir = video_target / 'tutorials'
-                        
-                        target_file = target_dir / file
-                        
-                        # Move file if it doesn't exist in target
-                        if not target_file.exists():
-                            shutil.move(str(source_file), str(target_file))
-                            self.log(f"Moved video: {source_file} -> {target_file}")
+            for entry in walker.files(source):
+                file = entry.name
+                source_file = Path(entry.path)
+                
+                # Determine target based on file name
+                if 'live' in file.lower() or 'stream' in file.lower():
+                    target_dir = video_target / 'live_sessions'
+                else:
+                    target_dir = video_target / 'tutorials'
+                
+                target_file = target_dir / file
+                
+                # Move file if it doesn't exist in target
+                if not target_file.exists():
+                    shutil.move(str(source_file), str(target_file))
+                    self.log(f"Moved video: {source_file} -> {target_file}")
     
     def consolidate_transcripts(self):
         """Consolidate all transcript and summary files"""
@@ -294,14 +284,14 @@ class ProjectReorganizer:
                 'structure': {}
             }
             
-            for root, dirs, files in os.walk(dir_path):
+            for root, dirs, files in self.walker.walk(dir_path):
                 rel_path = os.path.relpath(root, dir_path)
                 if rel_path == '.':
                     rel_path = 'root'
                 
                 index_data['structure'][rel_path] = {
-                    'subdirectories': dirs,
-                    'files': files,
+                    'subdirectories': [entry.name for entry in dirs],
+                    'files': [entry.name for entry in files],
                     'file_count': len(files)
                 }
             
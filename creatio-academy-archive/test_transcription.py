@@ -48,7 +48,7 @@ def test_transcription(max_videos=3):
             continue
         
         # Extract audio
-        audio_path = extract_audio(video_path, 'audio_extracted')
+        audio_path = extract_audio(video_path)
         if not audio_path:
             logger.error(f"Failed to extract audio for: {title}")
             continue
@@ -13,8 +13,12 @@ from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 import tempfile
 import re
+import sys
 from typing import Dict, List, Optional
 
+sys.path.append(str(Path(__file__).resolve().parent.parent / "scripts" / "utilities"))
+from audio_cache import AudioCache
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -23,7 +27,6 @@ def setup_directories():
     """Create necessary directories for transcription"""
     directories = [
         'videos/downloaded',
-        'audio_extracted',
         'transcripts/text',
         'transcripts/json'
     ]
@@ -107,36 +110,11 @@ def download_video(url: str, output_dir: str, video_name: str) -> Optional[str]:
         logger.error(f"Error downloading {url}: {e}")
         return None
 
-def extract_audio(video_path: str, audio_output_dir: str) -> Optional[str]:
-    """Extract audio from video using ffmpeg"""
+def extract_audio(video_path: str, audio_cache: Optional[AudioCache] = None) -> Optional[str]:
+    """Extract 16 kHz mono audio from video through the shared audio cache"""
     try:
-        video_file = Path(video_path)
-        audio_file = Path(audio_output_dir) / f"{video_file.stem}.wav"
-        
-        # Check if audio already exists
-        if audio_file.exists():
-            logger.info(f"Audio already exists: {audio_file}")
-            return str(audio_file)
-        
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            '-vn',  # No video
-            '-acodec', 'pcm_s16le',  # PCM 16-bit little-endian
-            '-ar', '16000',  # 16kHz sample rate (optimal for Whisper)
-            '-ac', '1',  # Mono
-            str(audio_file)
-        ]
-        
-        logger.info(f"Extracting audio from: {video_file.name}")
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        
-        if audio_file.exists():
-            logger.info(f"Audio extracted successfully: {audio_file}")
-            return str(audio_file)
-        else:
-            logger.error(f"Audio file not created: {audio_file}")
-            return None
+        audio_cache = audio_cache or AudioCache()
+        return str(audio_cache.audio_path(video_path))
             
     except subprocess.CalledProcessError as e:
         logger.error(f"ffmpeg failed for {video_path}: {e.stderr}")
@@ -310,6 +288,7 @@ def main():
     # Process each video entry
     processed_count = 0
     transcript_results = {}
+    audio_cache = AudioCache()
     
     for file_key, video_data in video_index.items():
         metadata = video_data.get('metadata', {})
@@ -334,7 +313,7 @@ def main():
             continue
         
         # Extract audio
-        audio_path = extract_audio(video_path, 'audio_extracted')
+        audio_path = extract_audio(video_path, audio_cache)
         if not audio_path:
             logger.error(f"Failed to extract audio for: {title}")
             continue
@@ -20,6 +20,13 @@ from pathlib import Path
 from collections import defaultdict, Counter
 from typing import Dict, List, Set, Any, Optional, Tuple
 import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(str(Path(__file__).resolve().parent / "scripts" / "utilities"))
+from file_walker import FileWalker
+from sharded_search_index import write_sharded_index
+from keyword_matcher import KeywordMatcher
 
 # Try to import optional dependencies
 try:
@@ -30,13 +37,11 @@ except ImportError:
     logging.warning("textract not available - text extraction from binary files will be limited")
 
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    HAS_SKLEARN = True
+    from minhash_lsh import MinHashLSH
+    HAS_MINHASH = True
 except ImportError:
-    HAS_SKLEARN = False
-    logging.warning("scikit-learn not available - advanced similarity analysis will be disabled")
+    HAS_MINHASH = False
+    logging.warning("numpy not available - related file detection will be disabled")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -45,16 +50,27 @@ logger = logging.getLogger(__name__)
 class MetadataGenerator:
     """Comprehensive metadata generator for knowledge hub files."""
     
-    def __init__(self, root_dir: str, output_dir: str = "./metadata_output"):
+    # Bump when generated metadata changes; state from other versions is regenerated
+    STATE_VERSION = 1
+    
+    def __init__(self, root_dir: str, output_dir: str = "./metadata_output",
+                 workers: Optional[int] = None):
         """Initialize the metadata generator.
         
         Args:
             root_dir: Root directory to scan for files
             output_dir: Directory to store generated metadata
+            workers: Processes for metadata extraction (default: CPU count);
+                1 extracts in this process
         """
         self.root_dir = Path(root_dir).resolve()
         self.output_dir = Path(output_dir).resolve()
         self.output_dir.mkdir(exist_ok=True)
+        self.workers = workers or os.cpu_count() or 1
+        
+        # Per-file metadata of the last run, keyed by path, size and mtime
+        self.state_path = self.output_dir / 'generator_state.json'
+        self.file_state = {}
         
         # Initialize storage
         self.file_metadata = {}
@@ -62,6 +78,15 @@ class MetadataGenerator:
         self.search_index = {}
         self.concept_graph = defaultdict(set)
         self.similarity_matrix = {}
+        self.related_index = None
+        
+        # Files whose content previews reach this Jaccard similarity are related.
+        # 128 LSH bands of 2 rows put the band S-curve at (1/128)^(1/2) = 0.09,
+        # just under the threshold: 95% of pairs at J 0.1-0.15 share a bucket
+        self.related_threshold = 0.1
+        self.related_num_perm = 256
+        self.related_rows_per_band = 2
+        self.max_related_files = 10
         
         # File type categories
         self.file_categories = {
@@ -93,6 +118,7 @@ class MetadataGenerator:
             'mobile', 'portal', 'user', 'role', 'permission', 'security', 'authentication',
             'database', 'query', 'filter', 'search', 'notification', 'email', 'template'
         }
+        self.term_matcher = KeywordMatcher([self.creatio_terms])
 
     def get_file_category(self, file_path: Path) -> str:
         """Determine the category of a file based on its extension."""
@@ -103,10 +129,13 @@ class MetadataGenerator:
         return 'other'
 
     def calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate SHA-256 hash of a file."""
+        """Calculate SHA-256 hash of a file, reading it in blocks."""
         try:
+            digest = hashlib.sha256()
             with open(file_path, 'rb') as f:
-                return hashlib.sha256(f.read()).hexdigest()
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+            return digest.hexdigest()
         except Exception as e:
             logger.warning(f"Could not calculate hash for {file_path}: {e}")
             return ""
@@ -171,12 +200,10 @@ class MetadataGenerator:
         topics = set()
         
         # Look for multi-word Creatio terms
-        text_lower = text.lower()
-        for term in self.creatio_terms:
-            if term in text_lower:
-                topics.add(term)
-                if len(term.split()) > 1:
-                    concepts.add(term)
+        for term in self.term_matcher.match(text).found:
+            topics.add(term)
+            if len(term.split()) > 1:
+                concepts.add(term)
         
         # Extract meaningful words (not stop words, length > 2)
         meaningful_words = [w for w in words if w not in self.stop_words and len(w) > 2]
@@ -204,36 +231,32 @@ class MetadataGenerator:
         
         return list(concepts)[:20], list(topics)[:30]  # Limit for performance
 
+    def preview_tokens(self, content: str) -> Set[str]:
+        """Word set of a content preview, as used for relatedness."""
+        return set(re.findall(r'\w+', content.lower()))
+
+    def build_related_index(self):
+        """Tokenize every file's content preview once into a MinHash LSH index."""
+        self.related_index = MinHashLSH(num_perm=self.related_num_perm,
+                                        rows_per_band=self.related_rows_per_band)
+        for file_path, metadata in self.file_metadata.items():
+            self.related_index.add(file_path, self.preview_tokens(metadata.get('content_preview', '')))
+
     def find_related_files(self, file_path: Path, content: str) -> List[str]:
         """Find files related to the current file based on content similarity."""
-        related = []
-        
-        if not HAS_SKLEARN or not content:
-            return related
+        if not HAS_MINHASH or not content:
+            return []
         
-        # Simple keyword-based similarity for now
-        current_words = set(re.findall(r'\w+', content.lower()))
-        
-        for other_path, other_metadata in self.file_metadata.items():
-            if other_path == str(file_path):
-                continue
-                
-            other_content = other_metadata.get('content_preview', '')
-            if not other_content:
-                continue
-                
-            other_words = set(re.findall(r'\w+', other_content.lower()))
-            
-            # Calculate Jaccard similarity
-            intersection = current_words.intersection(other_words)
-            union = current_words.union(other_words)
-            
-            if union:
-                similarity = len(intersection) / len(union)
-                if similarity > 0.1:  # Threshold for relatedness
-                    related.append(other_path)
+        if self.related_index is None:
+            self.build_related_index()
         
-        return related[:10]  # Limit number of related files
+        # Candidates come from shared LSH buckets and are kept if their
+        # estimated Jaccard similarity reaches the threshold
+        key = str(file_path)
+        tokens = None if key in self.related_index.key_rows else self.preview_tokens(content)
+        related = self.related_index.query(key, self.related_threshold,
+                                           limit=self.max_related_files, tokens=tokens)
+        return [other_path for other_path, _ in related]
 
     def generate_file_metadata(self, file_path: Path) -> Dict[str, Any]:
         """Generate comprehensive metadata for a single file."""
@@ -380,15 +403,23 @@ class MetadataGenerator:
         
         return dict(search_index)
 
-    def find_cross_references(self):
-        """Find cross-references between documents based on content similarity."""
+    def find_cross_references(self, update_related: bool = True):
+        """Find cross-references between documents based on content similarity.
+        
+        Args:
+            update_related: Recompute related files; without it only the
+                concept graph is built
+        """
         logger.info("Finding cross-references between documents...")
         
+        if HAS_MINHASH and update_related:
+            self.build_related_index()
+        
         # Update related files for each file
         for file_path, metadata in self.file_metadata.items():
-            content = metadata.get('content_preview', '')
-            related = self.find_related_files(Path(file_path), content)
-            metadata['related_files'] = related
+            if update_related:
+                content = metadata.get('content_preview', '')
+                metadata['related_files'] = self.find_related_files(Path(file_path), content)
             
             # Update concept graph
             concepts = metadata.get('concepts', [])
@@ -442,50 +473,91 @@ class MetadataGenerator:
         
         return stats
 
-    def scan_files(self, exclude_patterns: List[str] = None) -> List[Path]:
-        """Scan the root directory for files to process."""
+    def scan_entries(self, exclude_patterns: List[str] = None) -> List[os.DirEntry]:
+        """Scan the root directory for files to process, in path order.
+        
+        Dependency and tooling directories (venv, node_modules, .git, ...)
+        and the output directory are pruned without being entered.
+        
+        Args:
+            exclude_patterns: File and directory name patterns to leave out
+        """
         if exclude_patterns is None:
-            exclude_patterns = [
-                '*/venv/*', '*/__pycache__/*', '*/node_modules/*', '*/.git/*',
-                '*/.*', '*.pyc', '*.pyo', '*.pyd', '*.so', '*.dll', '*.exe'
-            ]
-        
-        files = []
-        for file_path in self.root_dir.rglob('*'):
-            if file_path.is_file():
-                # Check exclude patterns
-                relative_path = file_path.relative_to(self.root_dir)
-                exclude = False
-                
-                for pattern in exclude_patterns:
-                    if file_path.match(pattern) or str(relative_path).startswith('.'):
-                        exclude = True
-                        break
-                
-                if not exclude:
-                    files.append(file_path)
+            exclude_patterns = ['.*', '*.pyc', '*.pyo', '*.pyd', '*.so', '*.dll', '*.exe']
         
-        return sorted(files)
+        # Our own output changes on every run
+        walker = FileWalker(exclude_patterns=exclude_patterns, skip_paths=[self.output_dir],
+                            workers=self.workers)
+        return sorted(walker.files(self.root_dir), key=lambda entry: Path(entry.path))
 
-    def generate_all_metadata(self) -> Dict[str, Any]:
-        """Generate metadata for all files in the knowledge hub."""
+    def scan_files(self, exclude_patterns: List[str] = None) -> List[Path]:
+        """Scan the root directory for files to process."""
+        return [Path(entry.path) for entry in self.scan_entries(exclude_patterns)]
+
+    def generate_all_metadata(self, force: bool = False) -> Dict[str, Any]:
+        """Generate metadata for all files in the knowledge hub.
+        
+        Files whose size and mtime match the saved state of the last run
+        reuse their metadata; new and changed files are extracted across a
+        process pool.
+        
+        Args:
+            force: Regenerate metadata for every file
+        """
         logger.info(f"Starting metadata generation for {self.root_dir}")
         
         # Scan for files
-        files = self.scan_files()
+        entries = self.scan_entries()
+        files = [Path(entry.path) for entry in entries]
         logger.info(f"Found {len(files)} files to process")
         
-        # Generate metadata for each file
-        for i, file_path in enumerate(files, 1):
+        state = {} if force else self.load_state()
+        previous_state = state.get('files', {})
+        self.file_state = {}
+        metadata_by_path = {}
+        pending = []
+        for file_path, dir_entry in zip(files, entries):
+            key = str(file_path)
+            try:
+                stat = dir_entry.stat()
+            except OSError:
+                pending.append((file_path, None))
+                continue
+            entry = previous_state.get(key)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                metadata_by_path[key] = entry['metadata']
+                self.file_state[key] = entry
+            else:
+                pending.append((file_path, stat))
+        
+        unchanged = len(files) - len(pending)
+        logger.info(f"{len(pending)} new or changed files, {unchanged} unchanged since the last run")
+        
+        # Generate metadata for new and changed files
+        pending_paths = [file_path for file_path, _ in pending]
+        for i, ((file_path, stat), metadata) in enumerate(
+                zip(pending, self.generate_metadata_for(pending_paths)), 1):
             if i % 100 == 0:
-                logger.info(f"Processed {i}/{len(files)} files...")
+                logger.info(f"Processed {i}/{len(pending)} files...")
             
-            metadata = self.generate_file_metadata(file_path)
-            self.file_metadata[str(file_path)] = metadata
+            key = str(file_path)
+            metadata_by_path[key] = metadata
+            if stat is not None and 'error' not in metadata:
+                self.file_state[key] = {
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'metadata': metadata
+                }
+        
+        self.file_metadata = {str(file_path): metadata_by_path[str(file_path)] for file_path in files}
         
         logger.info("Finding cross-references...")
-        # Find cross-references (second pass)
-        self.find_cross_references()
+        # Find cross-references (second pass); related files saved last run
+        # still hold if no file was added, changed or removed and they were
+        # found with the same settings
+        unchanged_set = (not pending and len(self.file_state) == len(previous_state)
+                         and state.get('related_settings') == self.related_settings())
+        self.find_cross_references(update_related=not unchanged_set)
         
         logger.info("Building search index...")
         # Build search index
@@ -504,6 +576,8 @@ class MetadataGenerator:
             'generation_info': {
                 'root_directory': str(self.root_dir),
                 'total_files_processed': len(files),
+                'files_generated': len(pending),
+                'files_unchanged': unchanged,
                 'generation_time': datetime.now(timezone.utc).isoformat(),
                 'generator_version': '1.0'
             }
@@ -511,6 +585,59 @@ class MetadataGenerator:
         
         return output
 
+    def generate_metadata_for(self, files: List[Path]):
+        """
+        Generate metadata for files, yielding it in file order.
+        
+        Several files go to each pool task, since most take milliseconds.
+        """
+        if self.workers == 1 or len(files) < 2:
+            for file_path in files:
+                yield self.generate_file_metadata(file_path)
+            return
+        
+        chunksize = max(1, min(64, len(files) // (self.workers * 4)))
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(str(self.root_dir), str(self.output_dir))) as pool:
+            yield from pool.map(_metadata_in_worker, [str(file_path) for file_path in files],
+                                chunksize=chunksize)
+
+    def related_settings(self) -> Dict[str, Any]:
+        """Settings the related_files lists depend on, saved with the state."""
+        return {
+            'threshold': self.related_threshold,
+            'num_perm': self.related_num_perm,
+            'rows_per_band': self.related_rows_per_band,
+            'max_related_files': self.max_related_files
+        }
+
+    def load_state(self) -> Dict[str, Any]:
+        """Load the state of the last run.
+        
+        Returns:
+            Per-file state keyed by absolute path under 'files' and the
+            related-file settings under 'related_settings'; {} if there is none
+        """
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable state file {self.state_path}: {e}")
+            return {}
+        if state.get('version') != self.STATE_VERSION:
+            return {}
+        return state
+
+    def save_state(self):
+        """Write the per-file state atomically."""
+        temp_path = self.state_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.STATE_VERSION, 'related_settings': self.related_settings(),
+                       'files': self.file_state}, f, ensure_ascii=False)
+        os.replace(temp_path, self.state_path)
+
     def save_metadata(self, metadata: Dict[str, Any]):
         """Save generated metadata to files."""
         logger.info(f"Saving metadata to {self.output_dir}")
@@ -523,8 +650,13 @@ class MetadataGenerator:
         with open(self.output_dir / 'file_metadata.json', 'w', encoding='utf-8') as f:
             json.dump(metadata['metadata'], f, indent=2, ensure_ascii=False)
         
-        with open(self.output_dir / 'search_index.json', 'w', encoding='utf-8') as f:
-            json.dump(metadata['search_index'], f, indent=2, ensure_ascii=False)
+        # Sharded, so lookups read only the postings and text they need
+        write_sharded_index(metadata['search_index'], self.output_dir / 'search_index')
+        
+        # Remove the monolithic index of earlier versions so it is not mistaken for current
+        legacy_index_file = self.output_dir / 'search_index.json'
+        if legacy_index_file.exists():
+            legacy_index_file.unlink()
         
         with open(self.output_dir / 'statistics.json', 'w', encoding='utf-8') as f:
             json.dump(metadata['statistics'], f, indent=2, ensure_ascii=False)
@@ -535,6 +667,9 @@ class MetadataGenerator:
         # Create a human-readable summary
         self.create_summary_report(metadata)
         
+        # Saved last, so the state never runs ahead of the outputs
+        self.save_state()
+        
         logger.info("Metadata generation completed successfully!")
 
     def create_summary_report(self, metadata: Dict[str, Any]):
@@ -576,19 +711,20 @@ Root Directory: {metadata['generation_info']['root_directory']}
 ## Metadata Files Generated
 - `complete_metadata.json` - Complete metadata for all files
 - `file_metadata.json` - Individual file metadata
-- `search_index.json` - Full-text search index
+- `search_index/` - Full-text search index: a `CURRENT` pointer to the latest version's `manifest.json`, facet postings and text shards
 - `statistics.json` - Statistical analysis
 - `concept_graph.json` - Concept relationship graph
 - `summary_report.md` - This summary report
+- `generator_state.json` - Per-file state that lets unchanged files be skipped on the next run
 
 ## Usage Examples
 
 ### Search for files by topic:
 ```python
-import json
-with open('search_index.json') as f:
-    index = json.load(f)
-    creatio_files = index['topics'].get('creatio', [])
+from sharded_search_index import ShardedIndexReader
+index = ShardedIndexReader('search_index')
+creatio_files = index.files('topics', 'creatio')
+guides = index.search('business process', categories='documents')
 ```
 
 ### Find related files:
@@ -598,15 +734,15 @@ with open('file_metadata.json') as f:
     for file_path, data in metadata.items():
         related = data.get('related_files', [])
         if related:
-            print(f"{file_path} is related to: {related}")
+            print(f"{{file_path}} is related to: {{related}}")
 ```
 
 ### Get statistics:
 ```python
 with open('statistics.json') as f:
     stats = json.load(f)
-    print(f"Total files: {stats['total_files']}")
-    print(f"Most common topic: {list(stats['topics'].items())[0]}")
+    print(f"Total files: {{stats['total_files']}}")
+    print(f"Most common topic: {{list(stats['topics'].items())[0]}}")
 ```
 """
         
@@ -614,11 +750,25 @@ with open('statistics.json') as f:
             f.write(report)
 
 
+_worker_generator = None
+
+
+def _init_worker(root_dir: str, output_dir: str):
+    global _worker_generator
+    _worker_generator = MetadataGenerator(root_dir, output_dir, workers=1)
+
+
+def _metadata_in_worker(file_path: str) -> Dict[str, Any]:
+    return _worker_generator.generate_file_metadata(Path(file_path))
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description='Generate comprehensive metadata for Creatio AI Knowledge Hub')
     parser.add_argument('--root-dir', '-r', default='.', help='Root directory to scan (default: current directory)')
     parser.add_argument('--output-dir', '-o', default='./metadata_output', help='Output directory for metadata files')
+    parser.add_argument('--workers', '-w', type=int, help='Worker processes for metadata extraction (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Regenerate metadata for unchanged files too')
     parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
     
     args = parser.parse_args()
@@ -627,17 +777,18 @@ def main():
         logging.getLogger().setLevel(logging.DEBUG)
     
     # Initialize generator
-    generator = MetadataGenerator(args.root_dir, args.output_dir)
+    generator = MetadataGenerator(args.root_dir, args.output_dir, workers=args.workers)
     
     try:
         # Generate metadata
-        metadata = generator.generate_all_metadata()
+        metadata = generator.generate_all_metadata(force=args.force)
         
         # Save results
         generator.save_metadata(metadata)
         
         print(f"\n✅ Metadata generation completed successfully!")
-        print(f"📊 Processed {metadata['generation_info']['total_files_processed']} files")
+        print(f"📊 Processed {metadata['generation_info']['total_files_processed']} files "
+              f"({metadata['generation_info']['files_unchanged']} unchanged)")
         print(f"📁 Results saved to: {generator.output_dir}")
         print(f"📋 Check summary_report.md for detailed overview")
         
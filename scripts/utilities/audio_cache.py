@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Shared Audio Extraction Cache
+Decodes each video's audio track once to 16 kHz mono and reuses it for every transcriber
+"""
+
+import os
+import json
+import wave
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper resamples everything to 16 kHz mono, so that is what gets cached
+SAMPLE_RATE = 16000
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "creatio-ai-knowledge-hub" / "audio"
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+
+class AudioCache:
+    """
+    Content-addressed cache of audio tracks extracted from videos.
+
+    Entries are keyed by the SHA-256 of the video file, so the same lecture
+    stored in several directories is decoded once, and re-transcribing a video
+    never decodes it again. Audio is stored as 16-bit PCM WAV (read back without
+    ffmpeg) or FLAC (about half the size). The least recently used entries are
+    evicted once the cache grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir: Optional[Union[str, Path]] = None,
+                 max_bytes: Optional[int] = None, audio_format: str = "wav"):
+        """
+        Open (or create) an audio cache
+
+        Args:
+            cache_dir: Cache directory; defaults to $AUDIO_CACHE_DIR or
+                ~/.cache/creatio-ai-knowledge-hub/audio
+            max_bytes: Size limit; defaults to $AUDIO_CACHE_MAX_BYTES or 10 GiB
+            audio_format: 'wav' (16-bit PCM) or 'flac'
+        """
+        if audio_format not in ("wav", "flac"):
+            raise ValueError(f"Unsupported audio format: {audio_format}")
+
+        self.cache_dir = Path(cache_dir or os.environ.get("AUDIO_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes or int(os.environ.get("AUDIO_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.audio_format = audio_format
+
+        # Video hashes by (path, size, mtime) so unchanged videos are not re-read
+        self.hash_index_path = self.cache_dir / "hash_index.json"
+        self.hash_index = self._load_hash_index()
+
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def audio_path(self, video_path: Union[str, Path]) -> Path:
+        """
+        Return the cached audio file for a video, extracting it on a miss
+
+        Raises:
+            subprocess.CalledProcessError: If ffmpeg cannot decode the video
+        """
+        video_path = Path(video_path)
+        audio_file = self.cache_dir / f"{self.content_hash(video_path)}.{self.audio_format}"
+
+        if audio_file.exists():
+            self.stats["hits"] += 1
+            os.utime(audio_file)  # Mark as recently used
+            logger.info(f"Audio cache hit for {video_path.name}")
+            return audio_file
+
+        self.stats["misses"] += 1
+        logger.info(f"Extracting audio from {video_path.name}")
+
+        # Write to a temporary name so concurrent workers never see a partial file
+        partial = audio_file.with_name(f"{audio_file.stem}.{os.getpid()}.partial.{self.audio_format}")
+        cmd = [
+            "ffmpeg", "-v", "error", "-y",
+            "-i", str(video_path),
+            "-vn",  # No video
+            "-ac", "1",  # Mono
+            "-ar", str(SAMPLE_RATE),  # 16kHz sample rate (optimal for Whisper)
+            "-c:a", "pcm_s16le" if self.audio_format == "wav" else "flac",
+            str(partial)
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            os.replace(partial, audio_file)
+        finally:
+            if partial.exists():
+                partial.unlink()
+
+        self.evict(keep=audio_file)
+        return audio_file
+
+    def load_audio(self, video_path: Union[str, Path]) -> np.ndarray:
+        """
+        Return a video's audio as float32 samples in [-1, 1] at 16 kHz
+
+        The array can be passed straight to whisper's transcribe(), which then
+        skips its own ffmpeg decode.
+        """
+        audio_file = self.audio_path(video_path)
+
+        if self.audio_format == "wav":
+            with wave.open(str(audio_file), "rb") as wav:
+                frames = wav.readframes(wav.getnframes())
+        else:
+            cmd = ["ffmpeg", "-v", "error", "-i", str(audio_file), "-f", "s16le", "-"]
+            frames = subprocess.run(cmd, capture_output=True, check=True).stdout
+
+        return np.frombuffer(frames, np.int16).astype(np.float32) / 32768.0
+
+    def content_hash(self, video_path: Path) -> str:
+        """SHA-256 of a video file, memoized by path, size and mtime"""
+        stat = video_path.stat()
+        key = str(video_path.resolve())
+        cached = self.hash_index.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256()
+        with open(video_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+
+        self.hash_index[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest.hexdigest()
+        }
+        self._save_hash_index()
+        return digest.hexdigest()
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """Delete least recently used audio until the cache fits; returns bytes freed"""
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.suffix in (".wav", ".flac") and ".partial." not in path.name:
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total - freed <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            path.unlink(missing_ok=True)
+            freed += size
+            self.stats["evicted"] += 1
+            logger.info(f"Evicted cached audio {path.name}")
+        return freed
+
+    def _load_hash_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.hash_index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_hash_index(self):
+        # Replace atomically; concurrent writers can only lose memoized hashes
+        partial = self.hash_index_path.with_name(f"hash_index.{os.getpid()}.partial")
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump(self.hash_index, f)
+        os.replace(partial, self.hash_index_path)
@@ -44,12 +44,16 @@ Examples:
   
   # Process specific directory with custom output
   python batch_transcribe.py ./videos --output ./processed_transcripts
+  
+  # Transcribe several directories with 4 parallel Whisper workers
+  python batch_transcribe.py ./downloads ./videos --workers 4
         """
     )
     
     parser.add_argument(
-        "input_directory", 
-        help="Directory containing video files to process"
+        "input_directories", 
+        nargs="+",
+        help="Directories containing video files to process"
     )
     
     parser.add_argument(
@@ -71,6 +75,17 @@ Examples:
         help="Maximum number of files to process (useful for testing)"
     )
     
+    parser.add_argument(
+        "--workers", 
+        type=int,
+        help="Parallel Whisper workers, one model each (default: processing.max_concurrent in config.yaml)"
+    )
+    
+    parser.add_argument(
+        "--config", 
+        help="Path to config.yaml (default: repository config.yaml)"
+    )
+    
     parser.add_argument(
         "--enhance", 
         action="store_true",
@@ -101,22 +116,24 @@ Examples:
     setup_logging(args.verbose)
     logger = logging.getLogger(__name__)
     
-    # Validate input directory
-    input_path = Path(args.input_directory)
-    if not input_path.exists():
-        logger.error(f"Input directory does not exist: {input_path}")
-        sys.exit(1)
-    
-    if not input_path.is_dir():
-        logger.error(f"Input path is not a directory: {input_path}")
-        sys.exit(1)
+    # Validate input directories
+    input_paths = [Path(directory) for directory in args.input_directories]
+    for input_path in input_paths:
+        if not input_path.exists():
+            logger.error(f"Input directory does not exist: {input_path}")
+            sys.exit(1)
+        
+        if not input_path.is_dir():
+            logger.error(f"Input path is not a directory: {input_path}")
+            sys.exit(1)
     
     # Create output directory
     output_path = Path(args.output)
     output_path.mkdir(exist_ok=True)
     
     logger.info(f"Starting batch transcription processing")
-    logger.info(f"Input directory: {input_path.absolute()}")
+    for input_path in input_paths:
+        logger.info(f"Input directory: {input_path.absolute()}")
     logger.info(f"Output directory: {output_path.absolute()}")
     logger.info(f"Whisper model: {args.model}")
     logger.info(f"Max files: {args.max_files or 'unlimited'}")
@@ -126,14 +143,21 @@ Examples:
         # Initialize processor
         processor = TranscriptionProcessor(
             whisper_model=args.model, 
-            output_dir=str(output_path)
+            output_dir=str(output_path),
+            config_path=args.config
         )
         
-        # Find video files
-        video_files = processor.find_video_files(str(input_path))
+        # Find video files; overlapping directories list a video only once
+        video_files = []
+        seen = set()
+        for input_path in input_paths:
+            for video_file in processor.find_video_files(str(input_path)):
+                if video_file.resolve() not in seen:
+                    seen.add(video_file.resolve())
+                    video_files.append(video_file)
         
         if not video_files:
-            logger.warning("No video files found in the specified directory")
+            logger.warning("No video files found in the specified directories")
             return
         
         if args.max_files:
@@ -141,6 +165,8 @@ Examples:
             logger.info(f"Limited to first {args.max_files} files")
         
         # Show what will be processed
+        workers = args.workers or processor.processing_config["max_concurrent"]
+        logger.info(f"Workers: {workers}")
         logger.info(f"Found {len(video_files)} video files to process:")
         for i, video_file in enumerate(video_files, 1):
             size_mb = video_file.stat().st_size / (1024 * 1024)
@@ -160,7 +186,11 @@ Examples:
                     metadata_file.unlink()
         
         # Process videos
-        processor.process_directory(str(input_path), max_files=args.max_files)
+        throughput = processor.process_files(
+            video_files,
+            max_concurrent=workers,
+            skip_existing=False if args.force else None
+        )
         
         # Generate enhanced summaries if requested
         if args.enhance:
@@ -187,6 +217,9 @@ Examples:
         if args.enhance:
             logger.info(f"  - Enhanced summaries: {output_counts['enhanced']}")
         
+        logger.info(f"Throughput: {throughput['files_per_hour']} files/hour, "
+                    f"{throughput['audio_hours']} hours of audio at "
+                    f"{throughput['realtime_factor']}x realtime with {throughput['workers']} workers")
         logger.info(f"All files saved to: {output_path.absolute()}")
         logger.info("Processing completed successfully!")
         
@@ -14,7 +14,9 @@ import sys
 import subprocess
 import logging
 import tempfile
-import shutil
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from typing import Dict, List, Optional, Union, Tuple
 from datetime import datetime
@@ -60,6 +62,8 @@ except ImportError:
     WHISPER_AVAILABLE = False
     logging.warning("Whisper not available. Video transcription will be disabled.")
 
+from pdf_extractor import PDFTextExtractor
+
 
 class DocumentProcessor:
     """
@@ -77,10 +81,27 @@ class DocumentProcessor:
         'other': ['html', 'htm', 'xml', 'json']
     }
     
-    def __init__(self, output_dir: str = "processed_documents", temp_dir: Optional[str] = None):
-        """Initialize the document processor."""
+    # Directories never searched for input files
+    SKIP_DIRECTORIES = {'__pycache__', 'node_modules', 'venv'}
+    
+    # Bump when conversion output changes; manifest entries from other versions are redone
+    MANIFEST_VERSION = 1
+    
+    def __init__(self, output_dir: str = "processed_documents", temp_dir: Optional[str] = None,
+                 workers: Optional[int] = None):
+        """
+        Initialize the document processor.
+        
+        Args:
+            output_dir: Directory markdown files are written to
+            temp_dir: Directory for intermediate files
+            workers: Worker processes for directory conversion (default: CPU count);
+                1 converts in this process
+        """
         self.output_dir = Path(output_dir)
         self.temp_dir = Path(temp_dir) if temp_dir else Path(tempfile.gettempdir()) / "doc_processor"
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = self.output_dir / "processing_manifest.json"
         
         # Create directories
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -89,14 +110,12 @@ class DocumentProcessor:
         # Setup logging
         self.setup_logging()
         
-        # Initialize whisper model if available
-        self.whisper_model = None
-        if WHISPER_AVAILABLE:
-            try:
-                self.whisper_model = whisper.load_model("base")
-                self.logger.info("Whisper model loaded successfully")
-            except Exception as e:
-                self.logger.warning(f"Could not load Whisper model: {e}")
+        # Whisper is loaded on first use, once per worker process
+        self._whisper_model = None
+        self._whisper_loaded = False
+        
+        # Page-parallel PDF extraction, started on first use
+        self._pdf_extractor = None
         
         # Processing statistics
         self.stats = {
@@ -104,6 +123,8 @@ class DocumentProcessor:
             'success': 0,
             'failed': 0,
             'by_type': {},
+            'seconds_by_type': {},
+            'bytes_by_type': {},
             'start_time': datetime.now()
         }
         
@@ -120,6 +141,27 @@ class DocumentProcessor:
         )
         self.logger = logging.getLogger(__name__)
         
+    @property
+    def whisper_model(self):
+        """Whisper model for video transcription, or None if it cannot be loaded."""
+        if not self._whisper_loaded:
+            self._whisper_loaded = True
+            if WHISPER_AVAILABLE:
+                try:
+                    self._whisper_model = whisper.load_model("base")
+                    self.logger.info("Whisper model loaded successfully")
+                except Exception as e:
+                    self.logger.warning(f"Could not load Whisper model: {e}")
+        return self._whisper_model
+    
+    @property
+    def pdf_extractor(self) -> PDFTextExtractor:
+        """Extractor that reads PDF text layers and OCRs image-only pages in parallel."""
+        if self._pdf_extractor is None:
+            # Inside a conversion worker (workers=1) pages are read serially
+            self._pdf_extractor = PDFTextExtractor(workers=self.workers, ocr=TESSERACT_AVAILABLE)
+        return self._pdf_extractor
+    
     def get_file_type(self, file_path: Union[str, Path]) -> str:
         """Determine the file type based on extension."""
         file_path = Path(file_path)
@@ -145,19 +187,31 @@ class DocumentProcessor:
         if not file_path.exists():
             return {'success': False, 'error': 'File not found'}
         
-        self.stats['processed'] += 1
         file_type = self.get_file_type(file_path)
+        self.logger.info(f"Processing {file_type} file: {file_path}")
         
-        # Update type statistics
-        self.stats['by_type'][file_type] = self.stats['by_type'].get(file_type, 0) + 1
+        # Generate output filename
+        if not output_name:
+            output_name = f"{file_path.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        self.logger.info(f"Processing {file_type} file: {file_path}")
+        result = self.convert_file(file_path, file_type, output_name)
+        self.record_result(file_path, file_type, result)
+        return result
+    
+    def convert_file(self, file_path: Path, file_type: str, output_name: str) -> Dict:
+        """
+        Convert one file to markdown without touching the statistics.
         
-        try:
-            # Generate output filename
-            if not output_name:
-                output_name = f"{file_path.stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        Args:
+            file_path: File to convert
+            file_type: Type from get_file_type
+            output_name: Output filename without extension
             
+        Returns:
+            Dictionary with processing results, including the conversion time
+        """
+        start = time.perf_counter()
+        try:
             markdown_file = self.output_dir / f"{output_name}.md"
             
             # Process based on file type
@@ -178,26 +232,37 @@ class DocumentProcessor:
             else:
                 result = {'success': False, 'error': f'Unsupported file type: {file_type}'}
             
-            if result.get('success'):
-                self.stats['success'] += 1
-                self.logger.info(f"Successfully processed: {file_path}")
-            else:
-                self.stats['failed'] += 1
-                self.logger.error(f"Failed to process {file_path}: {result.get('error', 'Unknown error')}")
-            
-            return result
-            
         except Exception as e:
+            result = {'success': False, 'error': f"Unexpected error processing {file_path}: {str(e)}"}
+        
+        result['seconds'] = time.perf_counter() - start
+        return result
+    
+    def record_result(self, file_path: Path, file_type: str, result: Dict):
+        """Add a conversion result to the statistics and log it."""
+        self.stats['processed'] += 1
+        self.stats['by_type'][file_type] = self.stats['by_type'].get(file_type, 0) + 1
+        self.stats['seconds_by_type'][file_type] = (
+            self.stats['seconds_by_type'].get(file_type, 0.0) + result.get('seconds', 0.0))
+        try:
+            size = file_path.stat().st_size
+        except OSError:
+            size = 0
+        self.stats['bytes_by_type'][file_type] = self.stats['bytes_by_type'].get(file_type, 0) + size
+        
+        if result.get('success'):
+            self.stats['success'] += 1
+            self.logger.info(f"Successfully processed: {file_path}")
+        else:
             self.stats['failed'] += 1
-            error_msg = f"Unexpected error processing {file_path}: {str(e)}"
-            self.logger.error(error_msg)
-            return {'success': False, 'error': error_msg}
+            self.logger.error(f"Failed to process {file_path}: {result.get('error', 'Unknown error')}")
     
     def process_pdf(self, file_path: Path, output_file: Path) -> Dict:
         """Process PDF files using pdftotext or OCR."""
         try:
             text_content = ""
             metadata = {}
+            method = None
             
             # First try pdftotext
             try:
@@ -208,25 +273,24 @@ class DocumentProcessor:
             except (subprocess.CalledProcessError, FileNotFoundError):
                 self.logger.warning(f"pdftotext failed for {file_path}, trying PyPDF2")
                 
-                # Try PyPDF2
+                # Try PyPDF2; pages without a text layer are OCRed as well
                 if PYPDF2_AVAILABLE:
                     try:
-                        with open(file_path, 'rb') as file:
-                            pdf_reader = PyPDF2.PdfReader(file)
-                            text_content = ""
-                            for page in pdf_reader.pages:
-                                text_content += page.extract_text() + "\n"
-                            method = "PyPDF2"
-                            metadata['pages'] = len(pdf_reader.pages)
+                        extraction = self.pdf_extractor.extract(file_path)
+                        text_content = extraction.text
+                        method = extraction.method
+                        metadata['pages'] = extraction.page_count
+                        if extraction.ocr_pages:
+                            metadata['ocr_pages'] = len(extraction.ocr_pages)
                     except Exception as e:
                         self.logger.warning(f"PyPDF2 failed: {e}")
                         text_content = ""
-                
-                # If text extraction failed, try OCR
-                if not text_content.strip() and TESSERACT_AVAILABLE:
-                    self.logger.info(f"Attempting OCR for {file_path}")
-                    text_content = self.ocr_pdf(file_path)
-                    method = "OCR"
+            
+            # A scanned PDF has no text layer for pdftotext to read
+            if not text_content.strip() and method == "pdftotext" and TESSERACT_AVAILABLE:
+                self.logger.info(f"Attempting OCR for {file_path}")
+                text_content = self.ocr_pdf(file_path)
+                method = "OCR"
             
             if not text_content.strip():
                 return {'success': False, 'error': 'No text could be extracted from PDF'}
@@ -251,45 +315,21 @@ class DocumentProcessor:
             return {'success': False, 'error': str(e)}
     
     def ocr_pdf(self, file_path: Path) -> str:
-        """Perform OCR on PDF pages."""
+        """Perform OCR on the PDF pages that have no usable text layer."""
+        if not PYPDF2_AVAILABLE:
+            self.logger.warning("PyPDF2 is needed to find the pages of a PDF to OCR")
+            return ""
+        
         try:
-            # Convert PDF to images and OCR each page
-            temp_dir = self.temp_dir / f"pdf_ocr_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            temp_dir.mkdir(exist_ok=True)
-            
-            # Convert PDF to images using pdftoppm
-            try:
-                subprocess.run(['pdftoppm', '-png', str(file_path), str(temp_dir / 'page')], 
-                              check=True, capture_output=True)
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                # Fallback: try with poppler-utils
-                try:
-                    subprocess.run(['pdftoppm', '-png', str(file_path), str(temp_dir / 'page')], 
-                                  check=True)
-                except:
-                    return ""
-            
-            # OCR each image
-            text_content = ""
-            image_files = sorted(temp_dir.glob('page-*.png'))
-            
-            for image_file in image_files:
-                try:
-                    image = Image.open(image_file)
-                    page_text = pytesseract.image_to_string(image, lang='eng')
-                    text_content += f"\n--- Page {image_file.stem.split('-')[1]} ---\n"
-                    text_content += page_text + "\n"
-                except Exception as e:
-                    self.logger.warning(f"OCR failed for {image_file}: {e}")
-            
-            # Cleanup temp files
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            
-            return text_content
-            
+            extraction = self.pdf_extractor.extract(file_path)
         except Exception as e:
             self.logger.error(f"OCR processing failed: {e}")
             return ""
+        
+        return "".join(
+            f"\n--- Page {page_num + 1} ---\n{extraction.pages[page_num]}\n"
+            for page_num in extraction.ocr_pages
+        )
     
     def process_docx(self, file_path: Path, output_file: Path) -> Dict:
         """Process DOCX files using python-docx."""
@@ -636,13 +676,20 @@ class DocumentProcessor:
         else:
             return f"{minutes:02d}:{seconds:02d}"
     
-    def process_directory(self, directory_path: Union[str, Path], recursive: bool = True) -> Dict:
+    def process_directory(self, directory_path: Union[str, Path], recursive: bool = True,
+                          force: bool = False) -> Dict:
         """
         Process all supported files in a directory.
         
+        Files are found in one walk and converted in a process pool. Files
+        whose size, mtime (or, failing that, content hash) match the manifest
+        entry of an earlier run, and whose markdown output still exists, are
+        not converted again.
+        
         Args:
             directory_path: Path to directory to process
             recursive: Whether to process subdirectories
+            force: Convert every file, even unchanged ones
             
         Returns:
             Dictionary with processing summary
@@ -654,31 +701,223 @@ class DocumentProcessor:
         self.logger.info(f"Processing directory: {directory_path}")
         
         # Find all supported files
-        all_files = []
-        for file_type, extensions in self.SUPPORTED_EXTENSIONS.items():
-            for ext in extensions:
-                if recursive:
-                    all_files.extend(directory_path.rglob(f"*.{ext}"))
-                else:
-                    all_files.extend(directory_path.glob(f"*.{ext}"))
-        
-        results = []
-        for file_path in all_files:
-            if file_path.is_file():
-                result = self.process_file(file_path)
-                results.append({
-                    'file': str(file_path),
-                    'result': result
-                })
+        all_files = self.find_files(directory_path, recursive)
+        
+        manifest = self.load_manifest()
+        results = {}
+        unchanged = []
+        jobs = []
+        found_keys = set()
+        for file_path, file_type in all_files:
+            key = str(file_path.resolve())
+            entry = manifest.get(key)
+            try:
+                # os.walk lists broken symlinks and unreadable entries as files
+                stat = file_path.stat()
+                unchanged_file = not force and entry and self.is_unchanged(file_path, stat, entry)
+            except OSError as e:
+                self.logger.warning(f"Skipping {file_path}: {e}")
+                continue
+            found_keys.add(key)
+            if unchanged_file:
+                unchanged.append(str(file_path))
+                results[str(file_path)] = {
+                    'success': True,
+                    'skipped': True,
+                    'output_file': entry['output_file'],
+                    'method': entry.get('method'),
+                    'character_count': entry.get('character_count', 0)
+                }
+                continue
+            
+            # Stable output names, so a changed file replaces its own output
+            output_name = f"{file_path.stem}_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:8]}"
+            jobs.append((file_path, file_type, output_name))
+        
+        # Forget inputs that have been deleted or moved since they were converted
+        for key in [key for key in manifest if key not in found_keys and not os.path.exists(key)]:
+            del manifest[key]
+        
+        self.logger.info(f"{len(jobs)} files to convert, {len(unchanged)} unchanged since the last run")
+        
+        try:
+            for (file_path, file_type, _), result in self.convert_files(jobs):
+                self.record_result(file_path, file_type, result)
+                results[str(file_path)] = result
+                key = str(file_path.resolve())
+                if not result.get('success'):
+                    manifest.pop(key, None)
+                    continue
+                try:
+                    stat = file_path.stat()
+                    sha256 = self.file_hash(file_path)
+                except OSError as e:
+                    # Removed or made unreadable while it was being converted
+                    self.logger.warning(f"Not recording {file_path} in the manifest: {e}")
+                    manifest.pop(key, None)
+                    continue
+                manifest[key] = {
+                    'size': stat.st_size,
+                    'mtime_ns': stat.st_mtime_ns,
+                    'sha256': sha256,
+                    'file_type': file_type,
+                    'output_file': result.get('output_file'),
+                    'method': result.get('method'),
+                    'character_count': result.get('character_count', 0),
+                    'version': self.MANIFEST_VERSION
+                }
+        finally:
+            self.save_manifest(manifest)
         
         return {
             'success': True,
             'directory': str(directory_path),
-            'files_processed': len(results),
-            'results': results,
+            'files_processed': len(jobs),
+            'files_unchanged': len(unchanged),
+            'results': [{'file': str(file_path), 'result': results[str(file_path)]}
+                        for file_path, _ in all_files if str(file_path) in results],
             'statistics': self.get_statistics()
         }
     
+    def find_files(self, directory_path: Path, recursive: bool = True) -> List[Tuple[Path, str]]:
+        """
+        Find supported files in one directory walk.
+        
+        Hidden directories, SKIP_DIRECTORIES and this processor's own output
+        and temp directories are not entered.
+        
+        Returns:
+            (path, file_type) pairs in walk order
+        """
+        extension_types = {
+            ext: file_type
+            for file_type, extensions in self.SUPPORTED_EXTENSIONS.items()
+            for ext in extensions
+        }
+        own_directories = {self.output_dir.resolve(), self.temp_dir.resolve()}
+        
+        found = []
+        for root, dirs, files in os.walk(directory_path):
+            if recursive:
+                dirs[:] = sorted(
+                    d for d in dirs
+                    if not d.startswith('.') and d not in self.SKIP_DIRECTORIES
+                    and Path(root, d).resolve() not in own_directories
+                )
+            else:
+                dirs[:] = []
+            
+            for name in sorted(files):
+                file_type = extension_types.get(name.rpartition('.')[2].lower()) if '.' in name else None
+                if file_type:
+                    found.append((Path(root) / name, file_type))
+        
+        return found
+    
+    def load_manifest(self) -> Dict[str, Dict]:
+        """Load the manifest of earlier conversions, keyed by resolved input path."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return {}
+    
+    def save_manifest(self, manifest: Dict[str, Dict]):
+        """Write the manifest atomically."""
+        temp_path = self.manifest_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(temp_path, self.manifest_path)
+    
+    def is_unchanged(self, file_path: Path, stat: os.stat_result, entry: Dict) -> bool:
+        """True if a file still matches its manifest entry and its output exists."""
+        if entry.get('version') != self.MANIFEST_VERSION:
+            return False
+        if not entry.get('output_file') or not Path(entry['output_file']).exists():
+            return False
+        if entry['size'] != stat.st_size:
+            return False
+        if entry['mtime_ns'] == stat.st_mtime_ns:
+            return True
+        
+        # Touched but maybe not modified (e.g. copied with a new mtime)
+        if self.file_hash(file_path) != entry['sha256']:
+            return False
+        entry['mtime_ns'] = stat.st_mtime_ns
+        return True
+    
+    def file_hash(self, file_path: Path) -> str:
+        """SHA-256 of a file, read in blocks."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def concurrency_limit(self, file_type: str) -> int:
+        """
+        Most conversions of a file type to run at once.
+        
+        Whisper uses every core for one video and loads a model per worker;
+        OCR-heavy types get half the pool so light files keep flowing.
+        """
+        if file_type == 'video':
+            return 1
+        if file_type in ('pdf', 'image'):
+            return max(1, self.workers // 2)
+        return self.workers
+    
+    def convert_files(self, jobs: List[Tuple[Path, str, str]]):
+        """
+        Convert files, yielding (job, result) as conversions finish.
+        
+        Args:
+            jobs: (file_path, file_type, output_name) triples
+        """
+        if self.workers == 1 or len(jobs) < 2:
+            for job in jobs:
+                yield job, self.convert_file(*job)
+            return
+        
+        queues = defaultdict(deque)
+        for job in jobs:
+            queues[job[1]].append(job)
+        running = defaultdict(int)
+        in_flight = {}
+        
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(str(self.output_dir), str(self.temp_dir))) as pool:
+            while queues or in_flight:
+                # Fill free workers, taking file types in turn up to their limits
+                submitted = True
+                while submitted and len(in_flight) < self.workers:
+                    submitted = False
+                    for file_type in list(queues):
+                        if len(in_flight) >= self.workers:
+                            break
+                        if running[file_type] >= self.concurrency_limit(file_type):
+                            continue
+                        job = queues[file_type].popleft()
+                        if not queues[file_type]:
+                            del queues[file_type]
+                        future = pool.submit(_convert_in_worker, str(job[0]), job[1], job[2])
+                        in_flight[future] = job
+                        running[file_type] += 1
+                        submitted = True
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    running[job[1]] -= 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'success': False, 'error': f"Worker failed on {job[0]}: {e}", 'seconds': 0.0}
+                    yield job, result
+    
     def get_statistics(self) -> Dict:
         """Get processing statistics."""
         elapsed_time = datetime.now() - self.stats['start_time']
@@ -689,6 +928,16 @@ class DocumentProcessor:
             'failed': self.stats['failed'],
             'success_rate': f"{(self.stats['success'] / max(self.stats['processed'], 1)) * 100:.1f}%",
             'by_type': self.stats['by_type'],
+            'throughput_by_type': {
+                file_type: {
+                    'files': count,
+                    'seconds': round(self.stats['seconds_by_type'].get(file_type, 0.0), 3),
+                    'files_per_second': round(count / max(self.stats['seconds_by_type'].get(file_type, 0.0), 1e-6), 2),
+                    'mb_per_second': round(self.stats['bytes_by_type'].get(file_type, 0) / 1e6
+                                           / max(self.stats['seconds_by_type'].get(file_type, 0.0), 1e-6), 2)
+                }
+                for file_type, count in self.stats['by_type'].items()
+            },
             'elapsed_time': str(elapsed_time),
             'processing_rate': f"{self.stats['processed'] / max(elapsed_time.total_seconds(), 1):.2f} files/second"
         }
@@ -718,6 +967,17 @@ class DocumentProcessor:
         for file_type, count in stats['by_type'].items():
             report += f"- **{file_type.title()}:** {count} files\n"
         
+        report += """
+## Throughput by Type
+
+Conversion time summed over workers, so rates are per worker.
+
+"""
+        for file_type, throughput in stats['throughput_by_type'].items():
+            report += (f"- **{file_type.title()}:** {throughput['files_per_second']} files/second, "
+                       f"{throughput['mb_per_second']} MB/second "
+                       f"({throughput['files']} files in {throughput['seconds']}s)\n")
+        
         report += f"""
 
 ## System Capabilities
@@ -745,6 +1005,18 @@ Each markdown file includes:
         return report
 
 
+_worker_processor = None
+
+
+def _init_worker(output_dir: str, temp_dir: str):
+    global _worker_processor
+    _worker_processor = DocumentProcessor(output_dir=output_dir, temp_dir=temp_dir, workers=1)
+
+
+def _convert_in_worker(file_path: str, file_type: str, output_name: str) -> Dict:
+    return _worker_processor.convert_file(Path(file_path), file_type, output_name)
+
+
 def main():
     """Command-line interface for document processing."""
     import argparse
@@ -757,10 +1029,14 @@ def main():
                        help="Process directories recursively")
     parser.add_argument("--report", action="store_true",
                        help="Generate processing report")
+    parser.add_argument("-w", "--workers", type=int,
+                       help="Worker processes for directory conversion (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                       help="Convert files even if unchanged since the last run")
     
     args = parser.parse_args()
     
-    processor = DocumentProcessor(output_dir=args.output)
+    processor = DocumentProcessor(output_dir=args.output, workers=args.workers)
     
     input_path = Path(args.input)
     
@@ -768,8 +1044,9 @@ def main():
         result = processor.process_file(input_path)
         print(f"Processing result: {result}")
     elif input_path.is_dir():
-        result = processor.process_directory(input_path, recursive=args.recursive)
-        print(f"Processed {result.get('files_processed', 0)} files")
+        result = processor.process_directory(input_path, recursive=args.recursive, force=args.force)
+        print(f"Processed {result.get('files_processed', 0)} files "
+              f"({result.get('files_unchanged', 0)} unchanged)")
         print(f"Statistics: {result.get('statistics', {})}")
     else:
         print(f"Error: {args.input} is not a valid file or directory")
@@ -28,6 +28,8 @@ import argparse
 from dataclasses import dataclass
 import mimetypes
 
+from file_walker import FileWalker
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -53,6 +55,10 @@ class FilenameNormalizer:
     def __init__(self, root_directory: str, dry_run: bool = False):
         self.root_directory = Path(root_directory).resolve()
         self.dry_run = dry_run
+        
+        # Hidden entries, tooling directories and binaries with no links to
+        # update are pruned while walking, so skipped directories are never entered
+        self.walker = FileWalker(exclude_patterns=['.*', '*.pyc', '*.pyo', '*.so', '*.dll', '*.exe'])
         self.mappings: List[FileMapping] = []
         self.processed_files: Set[str] = set()
         
@@ -183,32 +189,13 @@ class FilenameNormalizer:
         
         logging.info(f"Scanning directory: {self.root_directory}")
         
-        for file_path in self.root_directory.rglob('*'):
-            if file_path.is_file() and not self.should_skip_file(file_path):
-                if self.is_filename_problematic(file_path.name):
-                    problematic_files.append(file_path)
+        for entry in self.walker.files(self.root_directory):
+            if self.is_filename_problematic(entry.name):
+                problematic_files.append(Path(entry.path))
         
         logging.info(f"Found {len(problematic_files)} files that need normalization")
         return problematic_files
 
-    def should_skip_file(self, file_path: Path) -> bool:
-        """Check if a file should be skipped during processing"""
-        # Skip hidden files and directories
-        if any(part.startswith('.') for part in file_path.parts):
-            return True
-        
-        # Skip system directories
-        skip_dirs = {'__pycache__', '.git', '.svn', 'node_modules', 'venv', '.venv'}
-        if any(skip_dir in file_path.parts for skip_dir in skip_dirs):
-            return True
-        
-        # Skip binary files that don't need link updates
-        skip_extensions = {'.pyc', '.pyo', '.so', '.dll', '.exe'}
-        if file_path.suffix.lower() in skip_extensions:
-            return True
-            
-        return False
-
     def create_safe_target_path(self, original_path: Path) -> Path:
         """Create a safe target path, handling potential conflicts"""
         normalized_name, reason = self.normalize_filename(original_path.name)
@@ -317,8 +304,7 @@ class FilenameNormalizer:
         
         # Step 3: Update internal references
         logging.info("Updating internal references...")
-        all_files = [f for f in self.root_directory.rglob('*') 
-                    if f.is_file() and not self.should_skip_file(f)]
+        all_files = [Path(entry.path) for entry in self.walker.files(self.root_directory)]
         
         for file_path in all_files:
             self.update_file_references(file_path, mappings_dict)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Shared Keyword Matcher
+Tests every keyword dictionary a module uses against one lowercase copy of a document
+"""
+
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class KeywordMatches:
+    """Keywords found in one document"""
+
+    __slots__ = ("text", "text_lower", "found")
+
+    def __init__(self, text: str, text_lower: str, found: FrozenSet[str]):
+        self.text = text
+        self.text_lower = text_lower
+        self.found = found
+
+    def has_any(self, keywords: Iterable[str]) -> bool:
+        """True if any of the keywords occurs in the text"""
+        return any(keyword in self.found for keyword in keywords)
+
+    def count(self, keywords: Iterable[str]) -> int:
+        """Number of the keywords that occur in the text"""
+        return sum(1 for keyword in keywords if keyword in self.found)
+
+    def labels(self, keyword_groups: Dict[str, Iterable[str]]) -> List[str]:
+        """Labels (in dictionary order) whose keyword list has a match"""
+        return [label for label, keywords in keyword_groups.items() if self.has_any(keywords)]
+
+
+class KeywordMatcher:
+    """
+    Substring matcher for a fixed set of keyword dictionaries.
+
+    Keywords are matched as substrings of the lowercased text, like the
+    `keyword in text.lower()` checks it replaces, so results are identical.
+    The text is lowercased once, and a keyword shared by several dictionaries
+    is looked up once; each lookup is a separate C-level substring search
+    that stops at the first occurrence.
+
+    This is deliberately not a single pass over the text. For the few dozen
+    short keywords each caller has, one compiled alternation (flat or
+    trie-shaped, with a lookahead so overlapping keywords are all found)
+    measured 1.5-8x slower than the separate searches, and an Aho-Corasick
+    automaton has to report every occurrence of common words back to Python.
+
+    The last match is kept, so helpers that each receive the same text
+    share one set of lookups.
+    """
+
+    def __init__(self, keyword_groups: Iterable[Iterable[str]]):
+        """
+        Build a matcher
+
+        Args:
+            keyword_groups: Keyword lists or dictionaries of keyword lists;
+                keywords must already be lowercase
+        """
+        keywords = {}
+        for group in keyword_groups:
+            if isinstance(group, dict):
+                for group_keywords in group.values():
+                    keywords.update(dict.fromkeys(group_keywords))
+            else:
+                keywords.update(dict.fromkeys(group))
+        self.keywords = tuple(keywords)
+        self._last: Optional[KeywordMatches] = None
+
+    def match(self, text: str) -> KeywordMatches:
+        """Find which keywords occur in the text"""
+        last = self._last
+        if last is not None and last.text is text:
+            return last
+
+        text_lower = text.lower()
+        found = frozenset(keyword for keyword in self.keywords if keyword in text_lower)
+        self._last = KeywordMatches(text, text_lower, found)
+        return self._last
@@ -10,8 +10,46 @@ from typing import Dict, List, Any
 from pathlib import Path
 import re
 
+from keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
+# Common technical terms in CRM/BPM/software domain. Every alternative
+# matches a whole word, so one pass finds the same words as separate
+# acronym, api, config, integrat, automat, dashboard and workflow patterns
+TECHNICAL_TERM_PATTERN = re.compile(
+    r'\b(?:[A-Z]{2,}|\w*(?:api|config|integrat|automat|dashboard|workflow)\w*)\b',
+    re.IGNORECASE
+)
+
+DOMAIN_TERMS = ['CRM', 'BPM', 'API', 'integration', 'workflow', 'automation',
+                'dashboard', 'configuration', 'customization', 'Creatio']
+
+CONTENT_INDICATORS = {
+    'tutorial': ['tutorial', 'how to', 'step by step', 'guide', 'learn', 'teach'],
+    'demo': ['demo', 'demonstration', 'show you', 'example', 'walkthrough'],
+    'presentation': ['presentation', 'slide', 'overview', 'introduction', 'agenda'],
+    'webinar': ['webinar', 'live', 'q&a', 'questions', 'audience'],
+    'training': ['training', 'course', 'lesson', 'module', 'exercise'],
+    'documentation': ['documentation', 'reference', 'specification', 'manual'],
+}
+
+# Topic keywords for business software domain
+TOPIC_KEYWORDS = {
+    'user_management': ['user', 'role', 'permission', 'access', 'authentication'],
+    'data_management': ['data', 'import', 'export', 'migration', 'database'],
+    'customization': ['customize', 'configuration', 'settings', 'personalize'],
+    'integration': ['integration', 'api', 'connector', 'sync', 'webhook'],
+    'automation': ['automation', 'workflow', 'business process', 'trigger'],
+    'reporting': ['report', 'dashboard', 'analytics', 'metrics', 'chart'],
+    'sales': ['sales', 'opportunity', 'lead', 'deal', 'pipeline'],
+    'marketing': ['marketing', 'campaign', 'email', 'lead generation'],
+    'customer_service': ['service', 'support', 'ticket', 'case', 'help desk'],
+}
+
+BEGINNER_INDICATORS = ['basic', 'introduction', 'getting started', 'beginner', 'first time']
+ADVANCED_INDICATORS = ['advanced', 'expert', 'complex', 'detailed', 'in-depth']
+
 class LLMSummarizer:
     def __init__(self, provider: str = "mock"):
         """
@@ -21,6 +59,13 @@ class LLMSummarizer:
             provider: LLM provider (mock, openai, anthropic, etc.)
         """
         self.provider = provider
+        self.keyword_matcher = KeywordMatcher([
+            [term.lower() for term in DOMAIN_TERMS],
+            CONTENT_INDICATORS,
+            TOPIC_KEYWORDS,
+            BEGINNER_INDICATORS,
+            ADVANCED_INDICATORS,
+        ])
         
     def generate_enhanced_summary(self, transcription_text: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -114,30 +159,11 @@ class LLMSummarizer:
     
     def _extract_technical_terms(self, text: str) -> List[str]:
         """Extract technical terms and jargon"""
-        # Common technical terms in CRM/BPM/software domain
-        technical_patterns = [
-            r'\b[A-Z]{2,}\b',  # Acronyms
-            r'\b\w*api\w*\b',  # API related terms
-            r'\b\w*config\w*\b',  # Configuration terms
-            r'\b\w*integrat\w*\b',  # Integration terms
-            r'\b\w*automat\w*\b',  # Automation terms
-            r'\b\w*dashboard\w*\b',  # Dashboard terms
-            r'\b\w*workflow\w*\b',  # Workflow terms
-        ]
-        
-        technical_terms = set()
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            technical_terms.update(matches)
+        technical_terms = set(TECHNICAL_TERM_PATTERN.findall(text))
         
         # Add domain-specific terms
-        domain_terms = ['CRM', 'BPM', 'API', 'integration', 'workflow', 'automation', 
-                       'dashboard', 'configuration', 'customization', 'Creatio']
-        
-        found_terms = []
-        for term in domain_terms:
-            if term.lower() in text.lower():
-                found_terms.append(term)
+        matches = self.keyword_matcher.match(text)
+        found_terms = [term for term in DOMAIN_TERMS if term.lower() in matches.found]
         
         technical_terms.update(found_terms)
         return list(technical_terms)[:15]  # Limit to top 15
@@ -164,20 +190,11 @@ class LLMSummarizer:
     
     def _classify_content_type(self, text: str, metadata: Dict) -> str:
         """Classify the type of content"""
-        content_indicators = {
-            'tutorial': ['tutorial', 'how to', 'step by step', 'guide', 'learn', 'teach'],
-            'demo': ['demo', 'demonstration', 'show you', 'example', 'walkthrough'],
-            'presentation': ['presentation', 'slide', 'overview', 'introduction', 'agenda'],
-            'webinar': ['webinar', 'live', 'q&a', 'questions', 'audience'],
-            'training': ['training', 'course', 'lesson', 'module', 'exercise'],
-            'documentation': ['documentation', 'reference', 'specification', 'manual'],
-        }
-        
-        text_lower = text.lower()
+        matches = self.keyword_matcher.match(text)
         scores = {}
         
-        for content_type, indicators in content_indicators.items():
-            score = sum(1 for indicator in indicators if indicator in text_lower)
+        for content_type, indicators in CONTENT_INDICATORS.items():
+            score = matches.count(indicators)
             if score > 0:
                 scores[content_type] = score
         
@@ -185,27 +202,8 @@ class LLMSummarizer:
     
     def _extract_main_topics(self, text: str) -> List[str]:
         """Extract main topics discussed in the content"""
-        # Topic keywords for business software domain
-        topic_keywords = {
-            'user_management': ['user', 'role', 'permission', 'access', 'authentication'],
-            'data_management': ['data', 'import', 'export', 'migration', 'database'],
-            'customization': ['customize', 'configuration', 'settings', 'personalize'],
-            'integration': ['integration', 'api', 'connector', 'sync', 'webhook'],
-            'automation': ['automation', 'workflow', 'business process', 'trigger'],
-            'reporting': ['report', 'dashboard', 'analytics', 'metrics', 'chart'],
-            'sales': ['sales', 'opportunity', 'lead', 'deal', 'pipeline'],
-            'marketing': ['marketing', 'campaign', 'email', 'lead generation'],
-            'customer_service': ['service', 'support', 'ticket', 'case', 'help desk'],
-        }
-        
-        text_lower = text.lower()
-        found_topics = []
-        
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                found_topics.append(topic.replace('_', ' '))
-        
-        return found_topics
+        matches = self.keyword_matcher.match(text)
+        return [topic.replace('_', ' ') for topic in matches.labels(TOPIC_KEYWORDS)]
     
     def _generate_executive_summary(self, sentences: List[str], content_type: str) -> str:
         """Generate an executive summary"""
@@ -276,14 +274,11 @@ class LLMSummarizer:
     
     def _identify_target_audience(self, text: str, technical_terms: List[str]) -> str:
         """Identify the target audience"""
-        beginner_indicators = ['basic', 'introduction', 'getting started', 'beginner', 'first time']
-        advanced_indicators = ['advanced', 'expert', 'complex', 'detailed', 'in-depth']
-        
-        text_lower = text.lower()
+        matches = self.keyword_matcher.match(text)
         
-        if any(indicator in text_lower for indicator in beginner_indicators):
+        if matches.has_any(BEGINNER_INDICATORS):
             return "beginner"
-        elif any(indicator in text_lower for indicator in advanced_indicators) or len(technical_terms) > 10:
+        elif matches.has_any(ADVANCED_INDICATORS) or len(technical_terms) > 10:
             return "advanced"
         else:
             return "intermediate"
@@ -344,7 +339,8 @@ class LLMSummarizer:
     
     def _assess_engagement(self, text: str, questions: List[str]) -> str:
         """Assess engagement level"""
-        engagement_indicators = len(questions) + text.lower().count('example') + text.lower().count('imagine')
+        text_lower = self.keyword_matcher.match(text).text_lower
+        engagement_indicators = len(questions) + text_lower.count('example') + text_lower.count('imagine')
         
         if engagement_indicators > 5:
             return "high"
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+MinHash LSH Index
+Finds sets with high Jaccard similarity by bucket lookups instead of comparing every pair
+"""
+
+import logging
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Smallest prime above 2**32; (a * h + b) stays below 2**64 for 32-bit a, h and b
+MERSENNE_PRIME = np.uint64(4294967311)
+
+
+class MinHashLSH:
+    """
+    MinHash signatures banded into an LSH index.
+
+    Each set is hashed once into `num_perm` minimum hash values; the share
+    of equal values between two signatures estimates their Jaccard
+    similarity. Signatures are cut into bands of `rows_per_band` values and
+    sets sharing any band land in the same bucket, so only bucket-mates are
+    compared. The chance two sets share a bucket is 1 - (1 - J^r)^b for b
+    bands of r rows; the default 64 bands of 2 rows finds 93% of pairs at
+    J = 0.2 and nearly all above 0.3.
+    """
+
+    def __init__(self, num_perm: int = 128, rows_per_band: int = 2, seed: int = 1):
+        """
+        Create an empty index
+
+        Args:
+            num_perm: Hash functions per signature
+            rows_per_band: Signature values per LSH band
+            seed: Seed for the hash functions; indexes compare only with the same seed
+        """
+        if num_perm % rows_per_band:
+            raise ValueError("num_perm must be a multiple of rows_per_band")
+        self.num_perm = num_perm
+        self.rows_per_band = rows_per_band
+        self.bands = num_perm // rows_per_band
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+        self.keys: List[Hashable] = []
+        self.key_rows: Dict[Hashable, int] = {}
+        self._signatures: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self._frozen_buckets: Optional[List[Dict[bytes, np.ndarray]]] = None
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def signature(self, tokens: Iterable[str]) -> Optional[np.ndarray]:
+        """MinHash signature of a set of tokens, or None for an empty set"""
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode('utf-8')) for token in set(tokens)), dtype=np.uint64
+        )
+        if not hashes.size:
+            return None
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+    def add(self, key: Hashable, tokens: Iterable[str]) -> None:
+        """Index the token set of a key; empty sets are kept out of the index"""
+        signature = self.signature(tokens)
+        if signature is None:
+            return
+
+        row = len(self.keys)
+        self.keys.append(key)
+        self.key_rows[key] = row
+        self._signatures.append(signature)
+        self._matrix = None
+        self._frozen_buckets = None
+        for band, bucket_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][bucket_key].append(row)
+
+    def _band_keys(self, signature: np.ndarray) -> Iterable[bytes]:
+        step = self.rows_per_band
+        raw = signature.tobytes()
+        width = signature.itemsize * step
+        return (raw[band * width:(band + 1) * width] for band in range(self.bands))
+
+    def _freeze(self) -> None:
+        """Stack signatures and bucket members into arrays for querying"""
+        self._matrix = np.vstack(self._signatures)
+        self._frozen_buckets = [
+            {bucket_key: np.array(rows, dtype=np.int64) for bucket_key, rows in buckets.items()}
+            for buckets in self._buckets
+        ]
+
+    def query(self, key: Hashable, threshold: float, limit: Optional[int] = None,
+              tokens: Optional[Iterable[str]] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Keys whose estimated Jaccard similarity to a key reaches a threshold
+
+        Args:
+            key: Indexed key to look up; it is left out of the results
+            threshold: Minimum estimated Jaccard similarity
+            limit: Most results to return
+            tokens: Token set to look up instead, for keys not in the index
+
+        Returns:
+            (key, estimated similarity) pairs, most similar first, ties in
+            insertion order
+        """
+        row = self.key_rows.get(key)
+        if tokens is not None or row is None:
+            signature = self.signature(tokens or ())
+            if signature is None:
+                return []
+        else:
+            signature = self._signatures[row]
+
+        if self._matrix is None:
+            self._freeze()
+        members = [
+            self._frozen_buckets[band][bucket_key]
+            for band, bucket_key in enumerate(self._band_keys(signature))
+            if bucket_key in self._frozen_buckets[band]
+        ]
+        if not members:
+            return []
+        # Buckets overlap heavily; mark members rather than sorting them
+        is_candidate = np.zeros(len(self.keys), dtype=bool)
+        is_candidate[np.concatenate(members)] = True
+        if row is not None:
+            is_candidate[row] = False
+        rows = np.flatnonzero(is_candidate)
+        if not rows.size:
+            return []
+
+        estimates = (self._matrix[rows] == signature).mean(axis=1)
+
+        keep = estimates >= threshold
+        rows, estimates = rows[keep], estimates[keep]
+        order = np.argsort(-estimates, kind='stable')
+        if limit is not None:
+            order = order[:limit]
+        return [(self.keys[rows[i]], float(estimates[i])) for i in order]
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+PDF Text Extraction
+Extracts PDF text page by page in a process pool, using the text layer where a page has one
+and OCRing only the image-only pages
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    import PyPDF2
+    PYPDF2_AVAILABLE = True
+except ImportError:
+    PYPDF2_AVAILABLE = False
+    logging.warning("PyPDF2 not available. PDF text extraction will be disabled.")
+
+try:
+    import pytesseract
+    from PIL import Image
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# A text layer with fewer letters and digits than this is not usable
+MIN_TEXT_CHARS = 20
+
+# pdftoppm renders at 150 DPI by default, below the ~300 DPI Tesseract is
+# trained on; 200 DPI grayscale reads slide and body text at under half the
+# pixels of 300 DPI color
+OCR_DPI = 200
+
+# Pages per pool task; each worker parses a PDF once however many tasks it runs
+PAGES_PER_TASK = 8
+
+# Per-worker PdfReader cache: path -> (mtime, reader)
+_readers: Dict[str, Tuple[float, "PyPDF2.PdfReader"]] = {}
+
+
+def ocr_available() -> bool:
+    """True if image-only pages can be rasterized and OCRed"""
+    return TESSERACT_AVAILABLE and shutil.which('pdftoppm') is not None
+
+
+def _reader(pdf_path: str) -> "PyPDF2.PdfReader":
+    """Open a PDF once per process"""
+    mtime = os.path.getmtime(pdf_path)
+    cached = _readers.get(pdf_path)
+    if cached is None or cached[0] != mtime:
+        _readers.clear()  # Workers move on to the next PDF; keep one open
+        cached = (mtime, PyPDF2.PdfReader(pdf_path))
+        _readers[pdf_path] = cached
+    return cached[1]
+
+
+def has_text_layer(text: str) -> bool:
+    """True if extracted page text has enough letters or digits to use"""
+    return sum(ch.isalnum() for ch in text) >= MIN_TEXT_CHARS
+
+
+def _has_images(page) -> bool:
+    """True if the page draws images or forms (which may hold images)"""
+    try:
+        resources = page.get('/Resources')
+        if resources is None:
+            return True  # Inherited resources; assume it might be scanned
+        xobjects = resources.get_object().get('/XObject')
+        if xobjects is None:
+            return False
+        return any(
+            xobject.get_object().get('/Subtype') in ('/Image', '/Form')
+            for xobject in xobjects.get_object().values()
+        )
+    except Exception:
+        return True
+
+
+def _extract_pages(pdf_path: str, page_numbers: List[int]) -> List[Tuple[int, str, bool]]:
+    """
+    Read the text layer of some pages
+
+    Returns:
+        (page_number, text, needs_ocr) per page; needs_ocr is True for pages
+        without a usable text layer that draw images
+    """
+    reader = _reader(pdf_path)
+    results = []
+    for page_number in page_numbers:
+        page = reader.pages[page_number]
+        try:
+            text = page.extract_text() or ''
+        except Exception as e:
+            logger.warning(f"Could not extract text from page {page_number + 1} of {pdf_path}: {e}")
+            text = ''
+        results.append((page_number, text, not has_text_layer(text) and _has_images(page)))
+    return results
+
+
+def _ocr_page(pdf_path: str, page_number: int, dpi: int, lang: str) -> Tuple[int, str]:
+    """Rasterize one page and OCR it"""
+    try:
+        with tempfile.TemporaryDirectory(prefix='pdf_ocr_') as temp_dir:
+            prefix = Path(temp_dir) / 'page'
+            subprocess.run([
+                'pdftoppm', '-f', str(page_number + 1), '-l', str(page_number + 1),
+                '-r', str(dpi), '-gray', '-png', '-singlefile', pdf_path, str(prefix)
+            ], check=True, capture_output=True)
+            with Image.open(prefix.with_suffix('.png')) as image:
+                return page_number, pytesseract.image_to_string(image, lang=lang)
+    except Exception as e:
+        logger.warning(f"OCR failed for page {page_number + 1} of {pdf_path}: {e}")
+        return page_number, ''
+
+
+@dataclass
+class PDFExtraction:
+    """Text of every page of a PDF and how it was obtained"""
+    pages: List[str]
+    ocr_pages: List[int] = field(default_factory=list)  # 0-based
+    seconds: float = 0.0
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    @property
+    def text(self) -> str:
+        return ''.join(page + '\n' for page in self.pages)
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.page_count / self.seconds if self.seconds else 0.0
+
+    @property
+    def method(self) -> str:
+        return 'PyPDF2+OCR' if self.ocr_pages else 'PyPDF2'
+
+
+class PDFTextExtractor:
+    """
+    Page-parallel PDF text extraction.
+
+    Pages are read from the text layer in batches across a process pool.
+    Pages with no usable text layer that draw images are then rasterized
+    one by one at `ocr_dpi` and OCRed in the same pool. Blank pages and
+    pages with text are never rasterized.
+
+    The pool is started on the first PDF large enough to split and reused
+    for later ones; call close() (or use the extractor as a context
+    manager) when done.
+    """
+
+    def __init__(self, workers: Optional[int] = None, ocr: bool = True,
+                 ocr_dpi: int = OCR_DPI, ocr_lang: str = 'eng'):
+        """
+        Initialize the extractor
+
+        Args:
+            workers: Worker processes (default: CPU count); 1 extracts in this process
+            ocr: OCR image-only pages when Tesseract and pdftoppm are available
+            ocr_dpi: Resolution image-only pages are rasterized at
+            ocr_lang: Tesseract language
+        """
+        if not PYPDF2_AVAILABLE:
+            raise RuntimeError("PyPDF2 is required for PDF text extraction")
+        self.workers = workers or os.cpu_count() or 1
+        self.ocr = ocr and ocr_available()
+        self.ocr_dpi = ocr_dpi
+        self.ocr_lang = ocr_lang
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _map(self, func, calls: List[tuple]) -> List:
+        """Run calls in the pool, or here if there is nothing to split"""
+        if self.workers == 1 or len(calls) < 2:
+            return [func(*args) for args in calls]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [self._pool.submit(func, *args) for args in calls]
+        return [future.result() for future in futures]
+
+    def extract(self, pdf_path: Union[str, Path]) -> PDFExtraction:
+        """
+        Extract the text of every page of a PDF
+
+        Args:
+            pdf_path: PDF file
+
+        Returns:
+            Page texts, in page order, and which pages were OCRed
+        """
+        start = time.perf_counter()
+        pdf_path = str(pdf_path)
+        # Forked workers inherit the parsed reader
+        page_count = len(_reader(pdf_path).pages)
+
+        batches = [
+            (pdf_path, list(range(first, min(first + PAGES_PER_TASK, page_count))))
+            for first in range(0, page_count, PAGES_PER_TASK)
+        ]
+        pages = [''] * page_count
+        image_only = []
+        for batch in self._map(_extract_pages, batches):
+            for page_number, text, needs_ocr in batch:
+                pages[page_number] = text
+                if needs_ocr:
+                    image_only.append(page_number)
+
+        ocr_pages = []
+        if image_only and self.ocr:
+            calls = [(pdf_path, page_number, self.ocr_dpi, self.ocr_lang) for page_number in image_only]
+            for page_number, text in self._map(_ocr_page, calls):
+                if text.strip():
+                    pages[page_number] = text
+                    ocr_pages.append(page_number)
+        elif image_only:
+            logger.warning(f"{len(image_only)} image-only pages in {pdf_path} not OCRed "
+                           "(OCR disabled or Tesseract/pdftoppm not available)")
+
+        extraction = PDFExtraction(pages, ocr_pages, time.perf_counter() - start)
+        logger.debug(f"Extracted {extraction.page_count} pages from {pdf_path} "
+                     f"({len(ocr_pages)} OCRed) at {extraction.pages_per_second:.1f} pages/sec")
+        return extraction
@@ -65,38 +65,44 @@ def main():
         logger.error("Virtual environment not found. Please run setup first.")
         return False
     
-    total_processed = 0
-    total_failed = 0
-    
-    # Process each video directory
+    video_paths = []
     for video_dir in video_dirs:
         video_path = base_dir / video_dir
-        
         if not video_path.exists():
             logger.warning(f"Video directory not found: {video_path}")
             continue
-        
-        logger.info(f"\n{'='*60}")
-        logger.info(f"PROCESSING DIRECTORY: {video_path}")
-        logger.info(f"{'='*60}")
-        
-        # First, do a dry run to see what we have
-        logger.info("Performing dry run to count files...")
-        dry_run_cmd = [
-            str(venv_python), "batch_transcribe.py", str(video_path),
-            "--model", whisper_model,
-            "--output", output_dir,
-            "--dry-run"
-        ]
-        
-        if not run_command(dry_run_cmd, logger):
-            logger.error(f"Dry run failed for {video_path}")
-            continue
-        
-        # Process the directory with enhanced summaries
+        video_paths.append(str(video_path))
+    
+    if not video_paths:
+        logger.error("No video directories found")
+        return False
+    
+    # All directories go to one batch run, so a single worker pool (sized by
+    # processing.max_concurrent in config.yaml) packs the whole library
+    logger.info(f"\n{'='*60}")
+    logger.info(f"PROCESSING DIRECTORIES: {', '.join(video_paths)}")
+    logger.info(f"{'='*60}")
+    
+    # First, do a dry run to see what we have
+    logger.info("Performing dry run to count files...")
+    dry_run_cmd = [
+        str(venv_python), "batch_transcribe.py", *video_paths,
+        "--model", whisper_model,
+        "--output", output_dir,
+        "--dry-run"
+    ]
+    
+    total_processed = 0
+    total_failed = 0
+    
+    if not run_command(dry_run_cmd, logger):
+        logger.error("Dry run failed")
+        total_failed = len(video_paths)
+    else:
+        # Process the directories with enhanced summaries
         logger.info("Starting full processing with enhanced summaries...")
         process_cmd = [
-            str(venv_python), "batch_transcribe.py", str(video_path),
+            str(venv_python), "batch_transcribe.py", *video_paths,
             "--model", whisper_model,
             "--output", output_dir,
             "--enhance",
@@ -104,11 +110,11 @@ def main():
         ]
         
         if run_command(process_cmd, logger):
-            logger.info(f"Successfully processed {video_path}")
-            total_processed += 1
+            logger.info(f"Successfully processed {', '.join(video_paths)}")
+            total_processed = len(video_paths)
         else:
-            logger.error(f"Failed to process {video_path}")
-            total_failed += 1
+            logger.error(f"Failed to process {', '.join(video_paths)}")
+            total_failed = len(video_paths)
     
     # Generate final report
     logger.info("\n" + "="*80)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Sharded Search Index
+Writes the metadata search index as a small manifest, hash-bucketed facet postings and
+file-id-range text shards, and reads back only the pieces a lookup needs
+"""
+
+import json
+import logging
+import math
+import os
+import shutil
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes; readers refuse other versions
+INDEX_VERSION = 1
+
+# Files per text shard
+SHARD_SIZE = 256
+
+# Facet values per posting bucket, so a bucket stays small whatever the corpus size
+VALUES_PER_BUCKET = 128
+
+# Facets of the search index dict, plus file_path for lookups by path
+FACETS = ('topics', 'concepts', 'categories', 'extensions')
+PATH_FACET = 'file_path'
+
+# File in the index directory naming the current version directory
+CURRENT_FILE = 'CURRENT'
+
+
+def bucket_of(value: str, buckets: int) -> int:
+    """Posting bucket a facet value is stored in"""
+    return zlib.crc32(value.encode('utf-8')) % buckets
+
+
+def _bucket_name(facet: str, bucket: int) -> str:
+    return f"facets/{facet}/{bucket:04d}.json"
+
+
+def _shard_name(shard: int) -> str:
+    return f"text/{shard:05d}.json"
+
+
+def _dump(data: Any, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def current_version_dir(index_dir: Union[str, Path]) -> Path:
+    """Directory holding the current version of an index (index_dir itself for the flat layout)"""
+    index_dir = Path(index_dir)
+    try:
+        version = (index_dir / CURRENT_FILE).read_text(encoding='utf-8').strip()
+    except FileNotFoundError:
+        return index_dir
+    return index_dir / version
+
+
+def write_sharded_index(search_index: Dict[str, Any], index_dir: Union[str, Path],
+                        shard_size: int = SHARD_SIZE) -> Dict[str, Any]:
+    """
+    Write a search index as sharded files
+
+    Files get ids in index order. Text shard k holds the records of ids
+    k * shard_size up to (k + 1) * shard_size. Each facet's values are
+    spread over buckets by CRC32, each bucket mapping values to file ids.
+
+    Each write is a new version directory inside index_dir (v000001, ...).
+    Once it is complete, the CURRENT file is atomically replaced to name it,
+    so readers opening the index always find a complete version. The
+    previous version is kept, so a reader opened before this write can
+    still load its shards; older versions are removed.
+
+    Args:
+        search_index: Index as built by MetadataGenerator.build_search_index
+        index_dir: Directory holding the index versions
+        shard_size: Files per text shard
+
+    Returns:
+        The manifest
+    """
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    previous = current_version_dir(index_dir)
+    numbers = [int(path.name[1:].split('.')[0]) for path in index_dir.glob('v[0-9]*')]
+    version = f"v{max(numbers, default=0) + 1:06d}"
+    temp_dir = index_dir / f"{version}.tmp"
+
+    files = search_index.get('files', {})
+    ids = {file_path: file_id for file_id, file_path in enumerate(files)}
+
+    shard = []
+    for file_id, (file_path, record) in enumerate(files.items()):
+        shard.append(dict(record, id=file_id, file_path=file_path))
+        if len(shard) == shard_size:
+            _dump(shard, temp_dir / _shard_name(file_id // shard_size))
+            shard = []
+    if shard:
+        _dump(shard, temp_dir / _shard_name(len(files) // shard_size))
+
+    postings = {facet: search_index.get(facet, {}) for facet in FACETS}
+    postings[PATH_FACET] = {file_path: [file_path] for file_path in files}
+
+    facets = {}
+    for facet, values in postings.items():
+        buckets = max(1, math.ceil(len(values) / VALUES_PER_BUCKET))
+        bucketed = [{} for _ in range(buckets)]
+        for value, file_paths in values.items():
+            bucketed[bucket_of(value, buckets)][value] = [
+                ids[file_path] for file_path in file_paths if file_path in ids
+            ]
+        for bucket, entries in enumerate(bucketed):
+            _dump(entries, temp_dir / _bucket_name(facet, bucket))
+        facets[facet] = {'values': len(values), 'buckets': buckets}
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'index_generated': search_index.get('index_generated'),
+        'file_count': len(files),
+        'shard_size': shard_size,
+        'shard_count': math.ceil(len(files) / shard_size),
+        'facets': facets
+    }
+    _dump(manifest, temp_dir / 'manifest.json')
+
+    # Publish the complete version, then point readers at it
+    os.replace(temp_dir, index_dir / version)
+    pointer = index_dir / (CURRENT_FILE + '.tmp')
+    pointer.write_text(version, encoding='utf-8')
+    os.replace(pointer, index_dir / CURRENT_FILE)
+
+    # Keep this version and the previous one; drop older versions, leftovers
+    # of interrupted writes and the files of the flat layout
+    keep = {CURRENT_FILE, version}
+    if previous != index_dir:
+        keep.add(previous.name)
+    for path in index_dir.iterdir():
+        if path.name not in keep:
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+
+    logger.info(f"Wrote search index for {len(files)} files to {index_dir} "
+                f"({manifest['shard_count']} text shards)")
+    return manifest
+
+
+class ShardedIndexReader:
+    """
+    Reads a sharded search index on demand.
+
+    Opening reads only the manifest. A facet lookup reads one posting
+    bucket; fetching documents reads only the text shards holding them.
+    Loaded files are kept in an LRU cache. A reader stays on the version
+    that was current when it was opened.
+    """
+
+    def __init__(self, index_dir: Union[str, Path], cache_size: int = 64):
+        """
+        Open a sharded index
+
+        Args:
+            index_dir: Directory written by write_sharded_index
+            cache_size: Posting buckets and text shards kept in memory
+        """
+        self.index_dir = Path(index_dir)
+        self.version_dir = current_version_dir(self.index_dir)
+        with open(self.version_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        if self.manifest.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version {self.manifest.get('version')} "
+                             f"in {self.version_dir}")
+        self.files_loaded = 0
+        self._load = lru_cache(maxsize=cache_size)(self._read)
+
+    def _read(self, name: str) -> Any:
+        self.files_loaded += 1
+        with open(self.version_dir / name, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @property
+    def facets(self) -> List[str]:
+        return [facet for facet in self.manifest['facets'] if facet != PATH_FACET]
+
+    def __len__(self) -> int:
+        return self.manifest['file_count']
+
+    def lookup(self, facet: str, value: str) -> List[int]:
+        """
+        File ids with a facet value
+
+        Args:
+            facet: One of topics, concepts, categories, extensions
+            value: Facet value, e.g. a topic
+
+        Returns:
+            Matching file ids in index order
+        """
+        info = self.manifest['facets'].get(facet)
+        if info is None:
+            raise KeyError(f"Unknown facet {facet!r}; expected one of {self.facets}")
+        return self._load(_bucket_name(facet, bucket_of(value, info['buckets']))).get(value, [])
+
+    def document(self, file_id: int) -> Dict[str, Any]:
+        """Record of one file, loading only its text shard"""
+        if not 0 <= file_id < len(self):
+            raise IndexError(f"File id {file_id} out of range")
+        shard_size = self.manifest['shard_size']
+        return self._load(_shard_name(file_id // shard_size))[file_id % shard_size]
+
+    def documents(self, file_ids: Iterable[int]) -> List[Dict[str, Any]]:
+        """Records of some files, in the given order"""
+        return [self.document(file_id) for file_id in file_ids]
+
+    def files(self, facet: str, value: str) -> List[str]:
+        """Relative paths of files with a facet value"""
+        return [record['file_path'] for record in self.documents(self.lookup(facet, value))]
+
+    def find_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Record of a file by its relative path, or None"""
+        file_ids = self.lookup(PATH_FACET, file_path)
+        return self.documents(file_ids)[0] if file_ids else None
+
+    def search(self, query: str, limit: Optional[int] = None,
+               **facet_values: str) -> List[Dict[str, Any]]:
+        """
+        Files whose searchable text contains every word of a query
+
+        Facet filters (e.g. categories='documents') narrow the files
+        first, so only their shards are read; without filters every
+        shard is scanned once.
+
+        Args:
+            query: Words to look for
+            limit: Most records to return
+            **facet_values: Facet value each result must have
+
+        Returns:
+            Matching records in index order
+        """
+        words = query.lower().split()
+        if facet_values:
+            candidates = None
+            for facet, value in facet_values.items():
+                matching = set(self.lookup(facet, value))
+                candidates = matching if candidates is None else candidates & matching
+            file_ids = sorted(candidates)
+        else:
+            file_ids = range(len(self))
+
+        results = []
+        for file_id in file_ids:
+            record = self.document(file_id)
+            text = record.get('searchable_text', '')
+            if all(word in text for word in words):
+                results.append(record)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
@@ -6,17 +6,21 @@ Comprehensive tool for generating transcriptions and structured metadata for vid
 
 import os
 import json
+import time
 import subprocess
 import argparse
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import whisper
 import yaml
 from tqdm import tqdm
 import re
 
+from audio_cache import AudioCache
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -28,27 +32,91 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config.yaml"
+
+DEFAULT_PROCESSING_CONFIG = {
+    "max_concurrent": 1,
+    "skip_existing": True,
+}
+
+def load_processing_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the processing section of config.yaml, falling back to defaults"""
+    config = dict(DEFAULT_PROCESSING_CONFIG)
+    config_path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config.update((yaml.safe_load(f) or {}).get("processing") or {})
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Could not read {config_path}: {e}")
+    return config
+
+# One processor (and Whisper model) per pool worker process
+_worker_processor = None
+
+def _init_worker(whisper_model: str, output_dir: str, cache_settings: Dict[str, Any], torch_threads: int):
+    """Load the Whisper model once per worker, with torch pinned to its share of the cores"""
+    global _worker_processor
+    import torch
+    torch.set_num_threads(torch_threads)
+    _worker_processor = TranscriptionProcessor(
+        whisper_model=whisper_model,
+        output_dir=output_dir,
+        audio_cache=AudioCache(**cache_settings)
+    )
+    _worker_processor.load_model()
+
+def _process_in_worker(video_path: Path, skip_existing: bool) -> Tuple[bool, float]:
+    start = time.perf_counter()
+    success = _worker_processor.process_video(video_path, skip_existing=skip_existing)
+    return success, time.perf_counter() - start
+
 class TranscriptionProcessor:
-    def __init__(self, whisper_model: str = "base", output_dir: str = "transcriptions"):
+    def __init__(self, whisper_model: str = "base", output_dir: str = "transcriptions",
+                 audio_cache: Optional[AudioCache] = None, config_path: Optional[str] = None):
         """
         Initialize the transcription processor
         
         Args:
             whisper_model: Whisper model size (tiny, base, small, medium, large)
             output_dir: Directory to store transcriptions and metadata
+            audio_cache: Shared audio extraction cache (opened at the default
+                location on first use if omitted)
+            config_path: config.yaml providing the processing settings
         """
         self.whisper_model = whisper_model
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self._audio_cache = audio_cache
+        self.processing_config = load_processing_config(config_path)
         
-        # Initialize Whisper model
-        logger.info(f"Loading Whisper model: {whisper_model}")
-        self.model = whisper.load_model(whisper_model)
+        # Whisper is loaded on first use; with a worker pool only the workers load it
+        self._model = None
         
         # Create subdirectories
         (self.output_dir / "transcripts").mkdir(exist_ok=True)
         (self.output_dir / "metadata").mkdir(exist_ok=True)
         (self.output_dir / "summaries").mkdir(exist_ok=True)
+    
+    @property
+    def audio_cache(self) -> AudioCache:
+        """Audio extraction cache, opened on first use"""
+        if self._audio_cache is None:
+            self._audio_cache = AudioCache()
+        return self._audio_cache
+    
+    @property
+    def model(self):
+        """Whisper model, loaded on first use"""
+        return self.load_model()
+    
+    def load_model(self):
+        """Load the Whisper model if it is not loaded yet, and return it"""
+        if self._model is None:
+            logger.info(f"Loading Whisper model: {self.whisper_model}")
+            self._model = whisper.load_model(self.whisper_model)
+        return self._model
         
     def find_video_files(self, directory: str) -> List[Path]:
         """Find all video files in directory and subdirectories"""
@@ -64,9 +132,10 @@ class TranscriptionProcessor:
     def get_video_duration(self, video_path: Path) -> float:
         """Get video duration using ffprobe"""
         try:
+            # The container duration is read from the header, without demuxing the file
             cmd = [
-                'ffprobe', '-v', 'error', '-select_streams', 'v:0',
-                '-count_packets', '-show_entries', 'stream=duration',
+                'ffprobe', '-v', 'error',
+                '-show_entries', 'format=duration',
                 '-of', 'csv=p=0', str(video_path)
             ]
             result = subprocess.run(cmd, capture_output=True, text=True)
@@ -160,9 +229,9 @@ class TranscriptionProcessor:
         logger.info(f"Transcribing {video_path.name}")
         
         try:
-            # Transcribe with Whisper
+            # Transcribe with Whisper from the cached 16 kHz audio
             result = self.model.transcribe(
-                str(video_path),
+                self.audio_cache.load_audio(video_path),
                 word_timestamps=True,
                 verbose=True
             )
@@ -276,9 +345,10 @@ class TranscriptionProcessor:
             'development': ['development', 'code', 'programming', 'developer', 'custom'],
         }
         
+        word_set = set(words)
         detected_topics = []
         for topic, keywords in topic_keywords.items():
-            if any(keyword in words for keyword in keywords):
+            if any(keyword in word_set for keyword in keywords):
                 detected_topics.append(topic)
         
         return detected_topics
@@ -384,15 +454,17 @@ class TranscriptionProcessor:
         millisecs = int((seconds % 1) * 1000)
         return f"{hours:02d}:{minutes:02d}:{secs:02d},{millisecs:03d}"
     
-    def process_video(self, video_path: Path) -> bool:
+    def is_processed(self, video_path: Path) -> bool:
+        """Check whether a video already has its metadata written"""
+        return (self.output_dir / "metadata" / f"{video_path.stem}_metadata.yaml").exists()
+    
+    def process_video(self, video_path: Path, skip_existing: bool = True) -> bool:
         """Process a single video file"""
         try:
             logger.info(f"Processing {video_path}")
             
             # Check if already processed
-            base_name = video_path.stem
-            metadata_file = self.output_dir / "metadata" / f"{base_name}_metadata.yaml"
-            if metadata_file.exists():
+            if skip_existing and self.is_processed(video_path):
                 logger.info(f"Already processed {video_path}, skipping...")
                 return True
             
@@ -414,39 +486,139 @@ class TranscriptionProcessor:
             logger.error(f"Failed to process {video_path}: {e}")
             return False
     
-    def process_directory(self, directory: str, max_files: Optional[int] = None):
+    def process_directory(self, directory: str, max_files: Optional[int] = None,
+                          max_concurrent: Optional[int] = None,
+                          skip_existing: Optional[bool] = None) -> Dict[str, Any]:
         """Process all video files in a directory"""
         video_files = self.find_video_files(directory)
         
         if max_files:
             video_files = video_files[:max_files]
         
+        return self.process_files(video_files, max_concurrent=max_concurrent, skip_existing=skip_existing)
+    
+    def process_files(self, video_files: List[Path], max_concurrent: Optional[int] = None,
+                      skip_existing: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Transcribe video files with a pool of Whisper workers
+        
+        Args:
+            video_files: Videos to process
+            max_concurrent: Worker processes, each with its own model
+                (default: processing.max_concurrent)
+            skip_existing: Skip videos that already have metadata
+                (default: processing.skip_existing)
+            
+        Returns:
+            Throughput metrics for the run
+        """
+        if max_concurrent is None:
+            max_concurrent = int(self.processing_config["max_concurrent"])
+        if skip_existing is None:
+            skip_existing = bool(self.processing_config["skip_existing"])
+        
+        pending = list(video_files)
+        if skip_existing:
+            pending = [video_path for video_path in pending if not self.is_processed(video_path)]
+        skipped = len(video_files) - len(pending)
+        if skipped:
+            logger.info(f"Skipping {skipped} already processed files")
+        
+        # Longest first, so the pool finishes on short videos instead of
+        # leaving one worker alone with a long one
+        durations = {video_path: self.get_video_duration(video_path) for video_path in pending}
+        pending.sort(key=lambda video_path: (durations[video_path], video_path.stat().st_size), reverse=True)
+        
+        workers = max(1, min(max_concurrent, len(pending)))
+        logger.info(f"Transcribing {len(pending)} videos "
+                    f"({sum(durations.values()) / 3600:.1f} hours of audio) with {workers} workers")
+        
         successful = 0
         failed = 0
+        audio_seconds = 0.0
+        start = time.perf_counter()
         
-        for video_path in tqdm(video_files, desc="Processing videos"):
-            if self.process_video(video_path):
+        def record(video_path: Path, success: bool, elapsed: float):
+            nonlocal successful, failed, audio_seconds
+            duration = durations[video_path]
+            if success:
                 successful += 1
+                audio_seconds += duration
             else:
                 failed += 1
+            done = successful + failed
+            speed = f" ({duration / elapsed:.1f}x realtime)" if success and elapsed > 0 else ""
+            logger.info(f"[{done}/{len(pending)}] {'Done' if success else 'FAILED'}: {video_path.name} - "
+                        f"{duration:.0f}s of audio in {elapsed:.1f}s{speed}")
+        
+        with tqdm(total=len(pending), desc="Processing videos") as progress:
+            if workers == 1:
+                for video_path in pending:
+                    file_start = time.perf_counter()
+                    success = self.process_video(video_path, skip_existing=skip_existing)
+                    record(video_path, success, time.perf_counter() - file_start)
+                    progress.update()
+            else:
+                cache_settings = {
+                    "cache_dir": self.audio_cache.cache_dir,
+                    "max_bytes": self.audio_cache.max_bytes,
+                    "audio_format": self.audio_cache.audio_format
+                }
+                torch_threads = max(1, (os.cpu_count() or 1) // workers)
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(self.whisper_model, str(self.output_dir), cache_settings, torch_threads)
+                ) as pool:
+                    futures = {
+                        pool.submit(_process_in_worker, video_path, skip_existing): video_path
+                        for video_path in pending
+                    }
+                    for future in as_completed(futures):
+                        try:
+                            success, elapsed = future.result()
+                        except Exception as e:
+                            logger.error(f"Worker failed on {futures[future]}: {e}")
+                            success, elapsed = False, 0.0
+                        record(futures[future], success, elapsed)
+                        progress.update()
+        
+        wall_seconds = time.perf_counter() - start
+        throughput = {
+            "workers": workers,
+            "files_processed": successful,
+            "files_skipped": skipped,
+            "audio_hours": round(audio_seconds / 3600, 3),
+            "wall_seconds": round(wall_seconds, 1),
+            "files_per_hour": round(successful / wall_seconds * 3600, 1) if wall_seconds > 0 else 0.0,
+            "realtime_factor": round(audio_seconds / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        }
         
-        logger.info(f"Processing complete: {successful} successful, {failed} failed")
+        logger.info(f"Processing complete: {successful} successful, {failed} failed, {skipped} skipped")
+        logger.info(f"Throughput: {throughput['files_per_hour']} files/hour, "
+                    f"{throughput['realtime_factor']}x realtime with {workers} workers")
         
         # Generate summary report
-        self.generate_processing_report(successful, failed, len(video_files))
+        self.generate_processing_report(successful, failed, len(video_files), throughput, skipped=skipped)
+        return throughput
     
-    def generate_processing_report(self, successful: int, failed: int, total: int):
-        """Generate a processing summary report"""
+    def generate_processing_report(self, successful: int, failed: int, total: int,
+                                   throughput: Optional[Dict[str, Any]] = None, skipped: int = 0):
+        """Generate a processing summary report; the success rate covers the files attempted"""
+        attempted = successful + failed
         report = {
             "processing_summary": {
                 "total_files": total,
                 "successful": successful,
                 "failed": failed,
-                "success_rate": f"{(successful/total*100):.1f}%" if total > 0 else "0%",
+                "skipped": skipped,
+                "success_rate": f"{(successful/attempted*100):.1f}%" if attempted > 0 else "0%",
                 "processed_at": datetime.now().isoformat(),
                 "whisper_model": self.whisper_model,
             }
         }
+        if throughput:
+            report["throughput"] = throughput
         
         report_file = self.output_dir / "processing_report.json"
         with open(report_file, 'w') as f:
@@ -461,11 +633,14 @@ def main():
                        help="Whisper model size")
     parser.add_argument("--output", default="transcriptions", help="Output directory")
     parser.add_argument("--max-files", type=int, help="Maximum number of files to process")
+    parser.add_argument("--workers", type=int,
+                       help="Parallel Whisper workers (default: processing.max_concurrent in config.yaml)")
+    parser.add_argument("--config", help="Path to config.yaml")
     
     args = parser.parse_args()
     
-    processor = TranscriptionProcessor(whisper_model=args.model, output_dir=args.output)
-    processor.process_directory(args.directory, max_files=args.max_files)
+    processor = TranscriptionProcessor(whisper_model=args.model, output_dir=args.output, config_path=args.config)
+    processor.process_directory(args.directory, max_files=args.max_files, max_concurrent=args.workers)
 
 if __name__ == "__main__":
     main()
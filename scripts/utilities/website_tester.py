@@ -22,6 +22,8 @@ from dataclasses import dataclass
 from urllib.parse import urljoin, urlparse
 import mimetypes
 
+from file_walker import FileWalker
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -60,6 +62,9 @@ class WebsiteTester:
         # File extensions to test for link references
         self.testable_extensions = {'.html', '.htm', '.css', '.js', '.xml', '.json', '.txt', '.md'}
         
+        # Hidden entries and tooling directories are pruned while walking
+        self.walker = FileWalker(exclude_patterns=['.*'], extensions=self.testable_extensions)
+        
         # Common link patterns to search for
         self.link_patterns = [
             # HTML links
@@ -213,27 +218,7 @@ class WebsiteTester:
 
     def scan_all_files(self) -> List[Path]:
         """Get all testable files in the directory"""
-        files = []
-        
-        for file_path in self.root_directory.rglob('*'):
-            if file_path.is_file() and not self.should_skip_file(file_path):
-                if file_path.suffix.lower() in self.testable_extensions:
-                    files.append(file_path)
-                    
-        return files
-
-    def should_skip_file(self, file_path: Path) -> bool:
-        """Check if a file should be skipped during testing"""
-        # Skip hidden files and directories
-        if any(part.startswith('.') for part in file_path.parts):
-            return True
-            
-        # Skip system directories
-        skip_dirs = {'__pycache__', '.git', '.svn', 'node_modules', 'venv', '.venv'}
-        if any(skip_dir in file_path.parts for skip_dir in skip_dirs):
-            return True
-            
-        return False
+        return [Path(entry.path) for entry in self.walker.files(self.root_directory)]
 
     def run_tests(self):
         """Run all website functionality tests"""
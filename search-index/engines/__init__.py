@@ -12,6 +12,8 @@ This package provides multi-level indexing and search capabilities including:
 from .core import SearchEngineCore
 from .indexers import DocumentIndexer, VideoIndexer, CodeIndexer, ImageIndexer
 from .semantic_search import SemanticSearchEngine
+from .document_store import DocumentStore
+from .ocr_cache import OCRCache
 from .faceted_search import FacetedSearchEngine
 from .autocomplete import AutocompleteEngine
 
@@ -23,6 +25,8 @@ __all__ = [
     "CodeIndexer",
     "ImageIndexer",
     "SemanticSearchEngine",
+    "DocumentStore",
+    "OCRCache",
     "FacetedSearchEngine",
     "AutocompleteEngine"
 ]
@@ -0,0 +1,156 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional, Sequence
+
+
+class DocumentStore:
+    """
+    Compact document store backing the semantic search engine.
+
+    Only ids, titles and types are kept in memory, one entry per index row.
+    Document bodies and remaining fields live in a SQLite table keyed by the
+    same row number, so a search hit is a primary-key lookup and content is
+    only read when a caller asks for it.
+
+    The connection is shared by request threads. Writes are serialized by a
+    lock, and the in-memory columns change only once a write has committed,
+    so they never disagree with the table.
+    """
+
+    def __init__(self, db_path):
+        """
+        Open (or create) a document store.
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._write_lock = threading.Lock()
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL,
+                title TEXT,
+                type TEXT,
+                content TEXT,
+                fields TEXT
+            )
+        ''')
+        self.conn.commit()
+
+        self.ids = []
+        self.titles = []
+        self.types = []
+        self.id_to_row = {}
+        for row, doc_id, title, doc_type in self.conn.execute(
+                'SELECT row, id, title, type FROM documents ORDER BY row'):
+            self._remember(doc_id, title, doc_type)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_of(self, document_id: str) -> Optional[int]:
+        """Return the index row of a document id, or None."""
+        return self.id_to_row.get(document_id)
+
+    def replace_all(self, documents: List[Dict]) -> None:
+        """Replace the whole store with a new list of documents."""
+        ids, titles, types = [], [], []
+
+        def rows():
+            for row, document in enumerate(documents):
+                table_row = self._to_row(row, document)
+                ids.append(table_row[1])
+                titles.append(table_row[2])
+                types.append(table_row[3])
+                yield table_row
+
+        with self._write_lock:
+            with self.conn:
+                self.conn.execute('DELETE FROM documents')
+                self.conn.executemany(
+                    'INSERT INTO documents (row, id, title, type, content, fields) VALUES (?, ?, ?, ?, ?, ?)',
+                    rows()
+                )
+            self.ids, self.titles, self.types = ids, titles, types
+            self.id_to_row = {doc_id: row for row, doc_id in enumerate(ids)}
+
+    def add(self, document: Dict) -> int:
+        """Append a document and return its row."""
+        with self._write_lock:
+            table_row = self._to_row(len(self.ids), document)
+            with self.conn:
+                self.conn.execute(
+                    'INSERT INTO documents (row, id, title, type, content, fields) VALUES (?, ?, ?, ?, ?, ?)',
+                    table_row
+                )
+            self._remember(*table_row[1:4])
+        return table_row[0]
+
+    def get(self, row: int, fields: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Fetch a document by row.
+
+        Args:
+            row: Index row of the document
+            fields: Fields to return; None returns the full document
+        """
+        row = int(row)
+        if fields is None:
+            content, stored_fields = self.conn.execute(
+                'SELECT content, fields FROM documents WHERE row = ?', (row,)
+            ).fetchone()
+            return {'id': self.ids[row], **json.loads(stored_fields), 'content': content}
+
+        result = {}
+        stored_fields = None
+        for field in fields:
+            if field == 'id':
+                result['id'] = self.ids[row]
+            elif field == 'title':
+                result['title'] = self.titles[row]
+            elif field == 'type':
+                result['type'] = self.types[row]
+            elif field == 'content':
+                result['content'] = self.conn.execute(
+                    'SELECT content FROM documents WHERE row = ?', (row,)
+                ).fetchone()[0]
+            else:
+                if stored_fields is None:
+                    stored_fields = json.loads(self.conn.execute(
+                        'SELECT fields FROM documents WHERE row = ?', (row,)
+                    ).fetchone()[0])
+                if field in stored_fields:
+                    result[field] = stored_fields[field]
+        return result
+
+    def import_json(self, documents_file) -> int:
+        """Import a legacy documents.json file and return the number of documents."""
+        with open(documents_file, 'r') as f:
+            documents = json.load(f)
+        self.replace_all(documents)
+        return len(documents)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self.conn.close()
+
+    @staticmethod
+    def _to_row(row: int, document: Dict) -> tuple:
+        """Split a document into its table row."""
+        metadata = document.get('metadata') or {}
+        title = document.get('title') or metadata.get('title')
+        doc_type = document.get('type') or metadata.get('content_type') or metadata.get('type')
+
+        stored_fields = {k: v for k, v in document.items() if k not in ('id', 'content')}
+        return (row, document['id'], title, doc_type, document.get('content', ''),
+                json.dumps(stored_fields, ensure_ascii=False))
+
+    def _remember(self, document_id: str, title: Optional[str], doc_type: Optional[str]) -> None:
+        self.id_to_row[document_id] = len(self.ids)
+        self.ids.append(document_id)
+        self.titles.append(title)
+        self.types.append(doc_type)
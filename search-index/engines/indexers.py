@@ -4,8 +4,7 @@ import json
 import os
 import re
 from bs4 import BeautifulSoup
-import pytesseract
-from PIL import Image
+from .ocr_cache import OCRCache
 
 class DocumentIndexer:
     def __init__(self, core: SearchEngineCore):
@@ -112,15 +111,29 @@ class CodeIndexer:
         writer.commit()
 
 class ImageIndexer:
-    def __init__(self, core: SearchEngineCore):
+    def __init__(self, core: SearchEngineCore, ocr_cache_path=None, workers=None):
         self.core = core
+        # OCR text survives restarts; only new or changed images are OCRed
+        self.ocr_cache = OCRCache(
+            ocr_cache_path or os.path.join(core.index_dir, 'ocr_cache.db'),
+            workers=workers
+        )
 
     def index_images(self, directory='images', ocr_enabled=True):
+        """Index the OCR text of images, OCRing cache misses in parallel."""
+        filepaths = [
+            os.path.join(directory, filename)
+            for filename in os.listdir(directory)
+            if filename.lower().endswith(('.png', '.jpg', '.jpeg'))
+        ]
         writer = self.core.ix.writer()
-        for filename in os.listdir(directory):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                filepath = os.path.join(directory, filename)
-                if ocr_enabled:
-                    text = pytesseract.image_to_string(Image.open(filepath))
-                    writer.add_document(title=filename, path=filepath, content=text)
+        try:
+            if ocr_enabled:
+                texts = self.ocr_cache.ocr_images(filepaths)
+                for filepath in filepaths:
+                    writer.add_document(title=os.path.basename(filepath), path=filepath, content=texts[filepath])
+        except Exception:
+            # Release the index lock, so a later pass can write
+            writer.cancel()
+            raise
         writer.commit()
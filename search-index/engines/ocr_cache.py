@@ -0,0 +1,236 @@
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pytesseract
+from PIL import Image, ImageFilter
+
+# Bump when preprocessing changes; text cached by other versions is not reused
+PREPROCESS_VERSION = 1
+
+# Tesseract is most accurate around 300 DPI; higher-resolution scans are
+# scaled down to it, smaller images are left alone
+TARGET_DPI = 300
+
+# Share of strong-edge pixels below which an image is taken to have no text
+# (blank, flat or smooth-gradient images)
+MIN_TEXT_LIKELIHOOD = 0.01
+
+# Grayscale copy the text likelihood is measured on
+LIKELIHOOD_THUMBNAIL = (256, 256)
+EDGE_THRESHOLD = 64
+
+
+def text_likelihood(image: Image.Image) -> float:
+    """
+    Share of strong-edge pixels in a small grayscale copy of the image.
+
+    Images whose copy is under 3 pixels on either side (tiny images, thin
+    banners) have no inner pixels to measure and score 0.
+    """
+    thumbnail = image.convert('L')
+    thumbnail.thumbnail(LIKELIHOOD_THUMBNAIL)
+    # The edge filter marks the outermost pixels of any image; leave them out
+    width, height = thumbnail.size
+    if width < 3 or height < 3:
+        return 0.0
+    edges = thumbnail.filter(ImageFilter.FIND_EDGES).crop((1, 1, width - 1, height - 1))
+    histogram = edges.histogram()
+    return sum(histogram[EDGE_THRESHOLD:]) / ((width - 2) * (height - 2))
+
+
+def preprocess(image: Image.Image, target_dpi: int = TARGET_DPI) -> Image.Image:
+    """Convert an image to grayscale and scale it down to target_dpi."""
+    dpi = image.info.get('dpi')
+    gray = image.convert('L')
+    if dpi and dpi[0] > target_dpi:
+        scale = target_dpi / float(dpi[0])
+        size = (max(1, round(gray.width * scale)), max(1, round(gray.height * scale)))
+        gray = gray.resize(size, Image.LANCZOS)
+    return gray
+
+
+def ocr_image(path: str, lang: str, config: str, target_dpi: int,
+              min_text_likelihood: float) -> Optional[Tuple[str, bool]]:
+    """
+    OCR one image file.
+
+    Returns:
+        (text, skipped); skipped is True if the image was judged to have no
+        text and Tesseract was not run. None if the image could not be read
+        or OCRed.
+    """
+    try:
+        with Image.open(path) as image:
+            image.load()
+            if text_likelihood(image) < min_text_likelihood:
+                return '', True
+            gray = preprocess(image, target_dpi)
+        return pytesseract.image_to_string(gray, lang=lang, config=config), False
+    except Exception as e:
+        print(f"Could not OCR {path}: {e}")
+        return None
+
+
+class OCRCache:
+    """
+    OCR text cached by image content.
+
+    Entries are keyed by the SHA-256 of the image file and by the OCR
+    settings (Tesseract version, language, config and preprocessing), so
+    copies and renames hit while an edited image, a Tesseract upgrade or new
+    options miss. File hashes are remembered by path, size and mtime, so an
+    unchanged image set is not even re-read. Misses are OCRed across a
+    process pool.
+    """
+
+    def __init__(self, db_path, lang: str = 'eng', config: str = '',
+                 target_dpi: int = TARGET_DPI,
+                 min_text_likelihood: float = MIN_TEXT_LIKELIHOOD,
+                 workers: Optional[int] = None):
+        """
+        Open (or create) an OCR cache.
+
+        Args:
+            db_path: Path of the SQLite database file
+            lang: Tesseract language
+            config: Extra Tesseract options
+            target_dpi: Resolution images are scaled down to before OCR
+            min_text_likelihood: Images scoring below this are not OCRed
+            workers: Processes for cache misses (default: CPU count)
+        """
+        self.db_path = Path(db_path)
+        self.lang = lang
+        self.config = config
+        self.target_dpi = target_dpi
+        self.min_text_likelihood = min_text_likelihood
+        self.workers = workers or os.cpu_count() or 1
+        self._settings_key = None
+        self.stats = {'hits': 0, 'misses': 0, 'skipped': 0, 'failed': 0}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS ocr_text (
+                content_hash TEXT NOT NULL,
+                settings TEXT NOT NULL,
+                text TEXT NOT NULL,
+                skipped INTEGER NOT NULL,
+                PRIMARY KEY (content_hash, settings)
+            );
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+        ''')
+        self.conn.commit()
+
+    @property
+    def settings_key(self) -> str:
+        """Everything besides the image that changes the OCR output."""
+        if self._settings_key is None:
+            self._settings_key = '|'.join([
+                f"tesseract={pytesseract.get_tesseract_version()}",
+                f"lang={self.lang}",
+                f"config={self.config}",
+                f"dpi={self.target_dpi}",
+                f"min_text_likelihood={self.min_text_likelihood}",
+                f"preprocess={PREPROCESS_VERSION}",
+            ])
+        return self._settings_key
+
+    def content_hash(self, path: str) -> str:
+        """SHA-256 of a file, reused while its size and mtime are unchanged."""
+        stat = os.stat(path)
+        row = self.conn.execute(
+            'SELECT content_hash FROM file_hashes WHERE path = ? AND size = ? AND mtime_ns = ?',
+            (path, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if row:
+            return row[0]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        content_hash = digest.hexdigest()
+        self.conn.execute(
+            'INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, content_hash) VALUES (?, ?, ?, ?)',
+            (path, stat.st_size, stat.st_mtime_ns, content_hash)
+        )
+        return content_hash
+
+    def ocr_images(self, paths: Sequence[str]) -> Dict[str, str]:
+        """
+        Return the OCR text of each image, OCRing only cache misses.
+
+        Args:
+            paths: Image files
+
+        Returns:
+            Mapping of path to text ('' for images judged to have no text
+            and for images that failed; failures are not cached, so they are
+            retried on the next call)
+        """
+        settings = self.settings_key
+        hashes = {path: self.content_hash(path) for path in paths}
+        self.conn.commit()
+
+        cached = {}
+        for content_hash in set(hashes.values()):
+            row = self.conn.execute(
+                'SELECT text FROM ocr_text WHERE content_hash = ? AND settings = ?',
+                (content_hash, settings)
+            ).fetchone()
+            if row:
+                cached[content_hash] = row[0]
+
+        # One OCR run per distinct image, whatever its file name
+        misses: Dict[str, str] = {}
+        for path, content_hash in hashes.items():
+            if content_hash not in cached:
+                misses.setdefault(content_hash, path)
+        self.stats['hits'] += sum(1 for content_hash in hashes.values() if content_hash in cached)
+        self.stats['misses'] += len(misses)
+
+        for content_hash, result in zip(misses, self._ocr_all(list(misses.values()))):
+            if result is None:
+                cached[content_hash] = ''
+                self.stats['failed'] += 1
+                continue
+            text, skipped = result
+            cached[content_hash] = text
+            self.stats['skipped'] += skipped
+            with self.conn:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO ocr_text (content_hash, settings, text, skipped) VALUES (?, ?, ?, ?)',
+                    (content_hash, settings, text, int(skipped))
+                )
+
+        return {path: cached[content_hash] for path, content_hash in hashes.items()}
+
+    def _ocr_all(self, paths: List[str]):
+        """OCR images in order, across a process pool when there are several."""
+        args = (self.lang, self.config, self.target_dpi, self.min_text_likelihood)
+        if self.workers == 1 or len(paths) < 2:
+            for path in paths:
+                yield ocr_image(path, *args)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(paths))) as pool:
+            futures = [pool.submit(ocr_image, path, *args) for path in paths]
+            for path, future in zip(paths, futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # A worker that died takes its image down, not the whole pass
+                    print(f"Could not OCR {path}: {e}")
+                    yield None
+
+    def close(self) -> None:
+        self.conn.close()
@@ -7,6 +7,8 @@ import json
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 
+from .document_store import DocumentStore
+
 class SemanticSearchEngine:
     def __init__(self, model_name='all-MiniLM-L6-v2', index_path='embeddings'):
         """
@@ -21,9 +23,13 @@ class SemanticSearchEngine:
         self.index_path.mkdir(exist_ok=True)
         
         self.index = None
-        self.documents = []
+        self.store = DocumentStore(self.index_path / 'documents.db')
         self.embeddings = None
         
+        # Precomputed nearest-neighbour table for find_similar_documents
+        self.knn_ids = None     # int32 (n, k), -1 marks an empty slot
+        self.knn_scores = None  # float16 (n, k)
+        
         # Load existing index if available
         self.load_index()
     
@@ -61,9 +67,12 @@ class SemanticSearchEngine:
         self.index.add(embeddings.astype('float32'))
         
         # Store documents and embeddings
-        self.documents = documents
+        self.store.replace_all(documents)
         self.embeddings = embeddings
         
+        # Precompute related documents offline
+        self.build_knn_graph()
+        
         # Save index
         self.save_index()
         print("Embeddings created and saved successfully!")
@@ -87,12 +96,17 @@ class SemanticSearchEngine:
             self.embeddings = np.vstack([self.embeddings, embedding])
         
         self.index.add(embedding.astype('float32'))
-        self.documents.append(document)
+        self.store.add(document)
+        
+        # Fold the new document into the neighbour table
+        if self.knn_ids is not None:
+            self._add_to_knn_graph(embedding[0].astype('float32'))
         
         # Save updated index
         self.save_index()
     
-    def search(self, query: str, top_k: int = 10, min_score: float = 0.5) -> List[Dict]:
+    def search(self, query: str, top_k: int = 10, min_score: float = 0.5,
+               fields: Optional[List[str]] = None) -> List[Dict]:
         """
         Perform semantic search.
         
@@ -100,11 +114,12 @@ class SemanticSearchEngine:
             query: Search query text
             top_k: Number of results to return
             min_score: Minimum similarity score (0-1)
+            fields: Document fields to return; None returns full documents
         
         Returns:
             List of search results with scores
         """
-        if self.index is None or len(self.documents) == 0:
+        if self.index is None or len(self.store) == 0:
             return []
         
         # Create query embedding
@@ -116,8 +131,8 @@ class SemanticSearchEngine:
         
         results = []
         for score, idx in zip(scores[0], indices[0]):
-            if score >= min_score and idx < len(self.documents):
-                result = self.documents[idx].copy()
+            if score >= min_score and 0 <= idx < len(self.store):
+                result = self.store.get(idx, fields)
                 result['semantic_score'] = float(score)
                 results.append(result)
         
@@ -188,18 +203,24 @@ class SemanticSearchEngine:
         
         return sorted_results[:top_k]
     
-    def find_similar_documents(self, document_id: str, top_k: int = 5) -> List[Dict]:
+    def find_similar_documents(self, document_id: str, top_k: int = 5,
+                               fields: Optional[List[str]] = None) -> List[Dict]:
         """Find documents similar to a given document."""
-        # Find the document
-        doc_idx = None
-        for i, doc in enumerate(self.documents):
-            if doc['id'] == document_id:
-                doc_idx = i
-                break
-        
+        doc_idx = self.store.row_of(document_id)
         if doc_idx is None:
             return []
         
+        # Serve from the precomputed neighbour table when it is deep enough
+        if self.knn_ids is not None and top_k <= self.knn_ids.shape[1]:
+            results = []
+            for idx, score in zip(self.knn_ids[doc_idx, :top_k], self.knn_scores[doc_idx, :top_k]):
+                if idx < 0:
+                    break
+                result = self.store.get(idx, fields)
+                result['similarity_score'] = float(score)
+                results.append(result)
+            return results
+        
         # Use the document's embedding as query
         if self.embeddings is not None and doc_idx < len(self.embeddings):
             query_embedding = self.embeddings[doc_idx].reshape(1, -1)
@@ -207,8 +228,8 @@ class SemanticSearchEngine:
             
             results = []
             for score, idx in zip(scores[0], indices[0]):
-                if idx != doc_idx and idx < len(self.documents):  # Exclude self
-                    result = self.documents[idx].copy()
+                if idx != doc_idx and 0 <= idx < len(self.store):  # Exclude self
+                    result = self.store.get(idx, fields)
                     result['similarity_score'] = float(score)
                     results.append(result)
             
@@ -216,19 +237,81 @@ class SemanticSearchEngine:
         
         return []
     
+    def build_knn_graph(self, k: int = 10, batch_size: int = 1024) -> None:
+        """
+        Precompute the k nearest neighbours of every document.
+        
+        Neighbours are found with batched index searches and stored as int32 ids
+        and float16 scores, so related-content lookups need no search at all.
+        """
+        if self.index is None or self.embeddings is None or len(self.embeddings) == 0:
+            return
+        
+        embeddings = np.ascontiguousarray(self.embeddings, dtype='float32')
+        n = len(embeddings)
+        knn_ids = np.full((n, k), -1, dtype=np.int32)
+        knn_scores = np.zeros((n, k), dtype=np.float16)
+        
+        for start in range(0, n, batch_size):
+            batch = embeddings[start:start + batch_size]
+            scores, indices = self.index.search(batch, min(k + 1, n))
+            
+            for offset in range(len(batch)):
+                row = start + offset
+                # Drop the document itself and any padding
+                keep = (indices[offset] != row) & (indices[offset] >= 0)
+                neighbours = indices[offset][keep][:k]
+                knn_ids[row, :len(neighbours)] = neighbours
+                knn_scores[row, :len(neighbours)] = scores[offset][keep][:k]
+        
+        self.knn_ids = knn_ids
+        self.knn_scores = knn_scores
+        print(f"Built kNN graph with {k} neighbours for {n} documents")
+    
+    def _add_to_knn_graph(self, embedding: np.ndarray) -> None:
+        """Append a newly added document to the neighbour table."""
+        k = self.knn_ids.shape[1]
+        new_row = len(self.embeddings) - 1
+        
+        # Similarity of the new document to every existing one
+        similarities = self.embeddings[:new_row] @ embedding
+        
+        # Neighbours of the new document
+        order = np.argsort(-similarities)[:k]
+        new_ids = np.full((1, k), -1, dtype=np.int32)
+        new_scores = np.zeros((1, k), dtype=np.float16)
+        new_ids[0, :len(order)] = order
+        new_scores[0, :len(order)] = similarities[order]
+        
+        # Existing documents whose worst neighbour is beaten by the new one
+        worst = np.where(self.knn_ids[:, -1] < 0, -np.inf, self.knn_scores[:, -1])
+        for row in np.flatnonzero(similarities > worst):
+            ids = np.append(self.knn_ids[row], new_row)
+            scores = np.append(self.knn_scores[row].astype('float32'), similarities[row])
+            scores[ids < 0] = -np.inf
+            keep = np.argsort(-scores, kind='stable')[:k]
+            self.knn_ids[row] = ids[keep]
+            self.knn_scores[row] = np.where(ids[keep] < 0, 0, scores[keep])
+        
+        self.knn_ids = np.vstack([self.knn_ids, new_ids])
+        self.knn_scores = np.vstack([self.knn_scores, new_scores])
+    
     def save_index(self) -> None:
         """Save FAISS index and associated data."""
         if self.index is not None:
             # Save FAISS index
             faiss.write_index(self.index, str(self.index_path / 'faiss.index'))
             
-            # Save documents
-            with open(self.index_path / 'documents.json', 'w') as f:
-                json.dump(self.documents, f)
+            # Documents are written through to the document store
             
             # Save embeddings
             if self.embeddings is not None:
                 np.save(self.index_path / 'embeddings.npy', self.embeddings)
+            
+            # Save neighbour table
+            if self.knn_ids is not None:
+                np.savez(self.index_path / 'knn_graph.npz', 
+                         ids=self.knn_ids, scores=self.knn_scores)
     
     def load_index(self) -> bool:
         """Load existing FAISS index and associated data."""
@@ -237,19 +320,52 @@ class SemanticSearchEngine:
             documents_file = self.index_path / 'documents.json'
             embeddings_file = self.index_path / 'embeddings.npy'
             
-            if index_file.exists() and documents_file.exists():
+            # Migrate a legacy documents.json into the document store once
+            if len(self.store) == 0 and documents_file.exists():
+                self.store.import_json(documents_file)
+            
+            if index_file.exists() and len(self.store) > 0:
                 # Load FAISS index
-                self.index = faiss.read_index(str(index_file))
-                
-                # Load documents
-                with open(documents_file, 'r') as f:
-                    self.documents = json.load(f)
+                index = faiss.read_index(str(index_file))
                 
                 # Load embeddings if available
-                if embeddings_file.exists():
-                    self.embeddings = np.load(embeddings_file)
+                embeddings = np.load(embeddings_file) if embeddings_file.exists() else None
+                
+                # A save interrupted between files leaves them out of step;
+                # repair from whichever one still matches the documents
+                count = len(self.store)
+                embeddings_match = embeddings is not None and len(embeddings) == count
+                repaired = False
+                if index.ntotal != count and embeddings_match:
+                    print(f"Index has {index.ntotal} vectors for {count} documents; rebuilding it from the embeddings")
+                    index = faiss.IndexFlatIP(embeddings.shape[1])
+                    index.add(np.ascontiguousarray(embeddings, dtype='float32'))
+                    repaired = True
+                elif index.ntotal == count and not embeddings_match:
+                    print(f"Embeddings do not match the {count} documents; restoring them from the index")
+                    embeddings = index.reconstruct_n(0, count)
+                    repaired = True
+                elif index.ntotal != count:
+                    print(f"Index ({index.ntotal} vectors) and embeddings do not match the {count} "
+                          f"documents; recreate the document embeddings")
+                    return False
+                
+                self.index = index
+                self.embeddings = embeddings
+                
+                # Rebuild the neighbour table after a repair, otherwise load it
+                # if it matches the documents
+                knn_file = self.index_path / 'knn_graph.npz'
+                if repaired:
+                    self.build_knn_graph()
+                    self.save_index()
+                elif knn_file.exists():
+                    with np.load(knn_file) as knn:
+                        if len(knn['ids']) == count:
+                            self.knn_ids = knn['ids']
+                            self.knn_scores = knn['scores']
                 
-                print(f"Loaded existing index with {len(self.documents)} documents")
+                print(f"Loaded existing index with {count} documents")
                 return True
         except Exception as e:
             print(f"Could not load existing index: {e}")
@@ -259,7 +375,7 @@ class SemanticSearchEngine:
     def get_stats(self) -> Dict:
         """Get statistics about the semantic search index."""
         return {
-            'total_documents': len(self.documents),
+            'total_documents': len(self.store),
             'embedding_dimension': self.embeddings.shape[1] if self.embeddings is not None else 0,
             'model_name': self.model._modules['0'].get_sentence_embedding_dimension() if hasattr(self.model, '_modules') else 'unknown',
             'index_exists': self.index is not None
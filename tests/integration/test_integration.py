@@ -8,6 +8,17 @@ from pathlib import Path
 from unittest.mock import patch, Mock
 import json
 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture(autouse=True, scope="module")
+def run_in_temp_dir(tmp_path_factory):
+    """Run from a temporary directory, so modules that log to the working directory write there"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.syspath_prepend(str(PROJECT_ROOT))
+        mp.chdir(tmp_path_factory.mktemp("integration"))
+        yield
+
 
 @pytest.mark.integration
 class TestKnowledgeHubIntegration:
@@ -102,8 +113,7 @@ class TestKnowledgeHubIntegration:
         conn.close()
     
     @patch('ai_knowledge_hub_integration.whisper')
-    @patch('ai_knowledge_hub_integration.PyPDF2')
-    def test_content_processing_integration(self, mock_pypdf2, mock_whisper, temp_integration_setup):
+    def test_content_processing_integration(self, mock_whisper, temp_integration_setup):
         """Test integration of video and PDF processing"""
         from ai_knowledge_hub_integration import AIKnowledgeHubIntegrator
         
@@ -114,17 +124,6 @@ class TestKnowledgeHubIntegration:
         }
         mock_whisper.load_model.return_value = mock_model
         
-        # Mock PDF reader
-        mock_pdf_reader = Mock()
-        mock_page = Mock()
-        mock_page.extract_text.return_value = "This document describes the ModifySchema API for Creatio development."
-        mock_pdf_reader.pages = [mock_page]
-        
-        mock_pdf_file = Mock()
-        mock_pdf_file.__enter__.return_value = mock_pdf_file
-        mock_pdf_file.__exit__.return_value = None
-        mock_pypdf2.PdfReader.return_value = mock_pdf_reader
-        
         # Initialize and run integration
         integrator = AIKnowledgeHubIntegrator(str(temp_integration_setup))
         integrator.initialize_database()
@@ -145,9 +144,9 @@ class TestKnowledgeHubIntegration:
         conn = sqlite3.connect(db_path)
         cursor = conn.cursor()
         
-        # Insert test data
+        # Insert test data; triggers keep search_fts in sync
         cursor.execute("""
-            INSERT INTO search_fts (content_type, content_id, title, content, keywords)
+            INSERT INTO search_index (content_type, content_id, section, content, keywords)
             VALUES (?, ?, ?, ?, ?)
         """, ('video', 'test-001', 'Test Video', 'This is about Creatio development', 'creatio,development'))
         
@@ -191,10 +190,66 @@ class TestKnowledgeHubIntegration:
         dev_commands = cursor.fetchall()
         assert len(dev_commands) == 1
         assert dev_commands[0][1] == 'CreateSection'
-        
+
         conn.commit()
         conn.close()
 
+    def test_search_index_reload_is_idempotent(self, temp_integration_setup):
+        """Test that reloading the same content neither duplicates nor truncates it"""
+        from ai_knowledge_hub_integration import AIKnowledgeHubIntegrator, VideoContent
+
+        integrator = AIKnowledgeHubIntegrator(str(temp_integration_setup))
+        video = VideoContent(
+            video_id='test-001', file_path='test_video.mp4', title='Test Video', duration=60.0,
+            transcript='creatio ' * 2000 + 'lastword', summary='', topics=['creatio'],
+            complexity_level='beginner', commands=['CreateEntity()'], api_references=[],
+            code_examples=[]
+        )
+
+        counts = []
+        for _ in range(2):
+            integrator.initialize_database()
+            integrator.create_searchable_index([video], [])
+
+            conn = sqlite3.connect(integrator.db_path)
+            counts.append([
+                conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('videos', 'search_index', 'search_fts', 'commands')
+            ])
+            matches = conn.execute(
+                "SELECT COUNT(*) FROM search_fts WHERE search_fts MATCH 'lastword'"
+            ).fetchone()[0]
+            conn.close()
+            assert matches == 1
+
+        assert counts[0] == counts[1]
+        assert counts[0][1] > 1  # Transcript split into several sections
+
+    def test_mcp_server_searches_loaded_index(self, temp_integration_setup):
+        """Test the MCP server search query against a database built by the integrator"""
+        from ai_knowledge_hub_integration import AIKnowledgeHubIntegrator, VideoContent
+        from ai_knowledge_hub.enhanced_mcp_server import KnowledgeHubService
+
+        integrator = AIKnowledgeHubIntegrator(str(temp_integration_setup))
+        integrator.initialize_database()
+        integrator.create_searchable_index([VideoContent(
+            video_id='test-001', file_path='test_video.mp4', title='Test Video', duration=60.0,
+            transcript='This video explains Creatio workflow automation', summary='',
+            topics=['bpm'], complexity_level='beginner', commands=[], api_references=[],
+            code_examples=[]
+        )], [])
+
+        service = KnowledgeHubService()
+        service.db_path = integrator.db_path
+
+        for content_type in ('all', 'video'):
+            results = service.search_content('workflow', content_type)
+            assert len(results) == 1
+            assert results[0]['content_id'] == 'test-001'
+            assert results[0]['title'] == 'Test Video'
+            assert 'workflow' in results[0]['content_snippet']
+        assert service.search_content('workflow', 'pdf') == []
+
 
 @pytest.mark.integration
 class TestMCPServerIntegration:
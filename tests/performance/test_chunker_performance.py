@@ -0,0 +1,204 @@
+"""
+Throughput benchmarks for the semantic document chunker
+
+Run with: pytest tests/performance/test_chunker_performance.py -m performance -s
+"""
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "ai_optimization"))
+
+bs4 = pytest.importorskip("bs4")
+pytest.importorskip("tiktoken")
+
+ARCHIVE_DIR = ROOT / "creatio-academy-archive" / "pages" / "raw"
+TRANSCRIPTS_DIR = ROOT / "ai_optimization" / "creatio-academy-db" / "developer_course" / "transcripts"
+SAMPLE_PAGES = 200
+
+
+class FakeEncoding:
+    """Whitespace tokenizer standing in for tiktoken (no network in tests)"""
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture(scope="module")
+def chunker():
+    with patch("tiktoken.get_encoding", return_value=FakeEncoding()):
+        from document_chunker import SemanticDocumentChunker
+        return SemanticDocumentChunker()
+
+
+@pytest.fixture(scope="module")
+def archive_html():
+    if not ARCHIVE_DIR.exists():
+        pytest.skip("creatio-academy-archive pages not available")
+    pages = sorted(ARCHIVE_DIR.glob("*.html"))[:SAMPLE_PAGES]
+    return [page.read_text(encoding="utf-8", errors="ignore") for page in pages]
+
+
+class CountingEncoding(FakeEncoding):
+    """Records how many texts go through the tokenizer"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, text):
+        self.encoded.append(text)
+        return super().encode(text)
+
+    def encode_ordinary(self, text):
+        self.encoded.append(text)
+        return super().encode_ordinary(text)
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        self.encoded.extend(texts)
+        return super().encode_ordinary_batch(texts, num_threads)
+
+
+@pytest.fixture(scope="module")
+def transcripts():
+    files = sorted(TRANSCRIPTS_DIR.glob("*_text.txt"))
+    if not files:
+        pytest.skip("developer course transcripts not available")
+    return [f.read_text(encoding="utf-8", errors="ignore") for f in files]
+
+
+def legacy_structure_walk(chunker, soup):
+    """The previous find_all-based extraction: every nested container is re-read"""
+    elements = soup.find_all([
+        "h1", "h2", "h3", "h4", "h5", "h6",
+        "p", "div", "section", "article",
+        "pre", "code", "table", "ul", "ol"
+    ])
+    for element in elements:
+        text = element.get_text().strip()
+        chunker.encoding.encode(text)
+
+
+def pages_per_second(func, pages):
+    start = time.perf_counter()
+    for page in pages:
+        func(page)
+    return len(pages) / (time.perf_counter() - start)
+
+
+@pytest.mark.performance
+def test_structure_walk_throughput(chunker, archive_html):
+    """The single-pass walk should beat the nested find_all walk"""
+    soups = [bs4.BeautifulSoup(html, chunker.html_parser) for html in archive_html]
+
+    def walk(soup):
+        structure = chunker._extract_document_structure(soup)
+        for section in structure["sections"]:
+            for element, text in section["content_elements"]:
+                chunker._analyze_element(element, text)
+
+    legacy_rate = pages_per_second(lambda soup: legacy_structure_walk(chunker, soup), soups)
+    walk_rate = pages_per_second(walk, soups)
+
+    print(f"\nstructure walk: {walk_rate:.1f} pages/sec (legacy find_all: {legacy_rate:.1f} pages/sec)")
+    assert walk_rate > legacy_rate
+
+
+@pytest.mark.performance
+def test_html_chunking_throughput(chunker, archive_html):
+    """Report end-to-end HTML chunking throughput on the archive"""
+    rate = pages_per_second(
+        lambda html: chunker.chunk_html_document(html, "benchmark"), archive_html
+    )
+    print(f"\nchunk_html_document ({chunker.html_parser}): {rate:.1f} pages/sec")
+    assert rate > 0
+
+
+@pytest.mark.performance
+def test_text_chunking_encodes_each_unit_once(transcripts):
+    """Guard: chunking never re-tokenizes a paragraph or an assembled chunk"""
+    encoding = CountingEncoding()
+    with patch("tiktoken.get_encoding", return_value=encoding):
+        from document_chunker import SemanticDocumentChunker
+        chunker = SemanticDocumentChunker(max_chunk_size=300, overlap_size=100)
+
+    encoding.encoded.clear()
+    for i, text in enumerate(transcripts):
+        chunker.chunk_text_document(text, f"transcript-{i}")
+
+    assert len(encoding.encoded) == len(set(encoding.encoded))
+
+
+@pytest.mark.performance
+def test_text_chunking_throughput(chunker, transcripts):
+    """Report chunking throughput on the developer course transcripts"""
+    total_mb = sum(len(text.encode("utf-8")) for text in transcripts) / 1_000_000
+    start = time.perf_counter()
+    for i, text in enumerate(transcripts):
+        chunker.chunk_text_document(text, f"transcript-{i}")
+    elapsed = time.perf_counter() - start
+
+    print(f"\nchunk_text_document: {total_mb / elapsed:.2f} MB/sec over {len(transcripts)} transcripts")
+    assert elapsed > 0
+
+
+@pytest.mark.performance
+def test_compact_chunk_memory(chunker, archive_html):
+    """Report retained bytes per chunk for DocumentChunk vs CompactChunk"""
+    from document_chunker import ChunkInterner, CompactChunk, DocumentChunk, chunk_as_dict
+
+    records = []
+    for i, html in enumerate(archive_html):
+        metadata = {"source": "archive", "document": f"page-{i}"}
+        records.extend(
+            json.dumps(chunk_as_dict(chunk))
+            for chunk in chunker.chunk_html_document(html, f"page-{i}", metadata)
+        )
+
+    def retained_bytes_per_chunk(build):
+        tracemalloc.start()
+        chunks = [build(json.loads(record)) for record in records]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(chunks) == len(records)
+        return size / len(records)
+
+    interner = ChunkInterner()
+    plain = retained_bytes_per_chunk(lambda data: DocumentChunk(**data))
+    compact = retained_bytes_per_chunk(lambda data: CompactChunk(**data, interner=interner))
+
+    print(f"\n{len(records)} chunks: DocumentChunk {plain:.0f} B/chunk, CompactChunk {compact:.0f} B/chunk")
+    assert compact < plain
+
+
+@pytest.mark.performance
+def test_duplicate_suppression_on_archive(archive_html):
+    """Report how much embedding and index work duplicate suppression avoids"""
+    from chunk_deduplicator import ChunkDeduplicator
+
+    dedup = ChunkDeduplicator()
+    with patch("tiktoken.get_encoding", return_value=FakeEncoding()):
+        from document_chunker import SemanticDocumentChunker
+        chunker = SemanticDocumentChunker(deduplicator=dedup)
+
+    start = time.perf_counter()
+    kept = sum(len(chunker.chunk_html_document(html, f"page-{i}")) for i, html in enumerate(archive_html))
+    rate = len(archive_html) / (time.perf_counter() - start)
+    report = dedup.report()
+
+    print(f"\nduplicate suppression: {report['chunks_suppressed']}/{report['chunks_seen']} chunks "
+          f"({report['exact_duplicates']} exact, {report['near_duplicates']} near), "
+          f"{report['tokens_avoided']} tokens ({report['token_ratio_avoided']:.1%}) not embedded, "
+          f"{rate:.1f} pages/sec")
+    assert kept == report["chunks_kept"]
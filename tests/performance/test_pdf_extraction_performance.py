@@ -0,0 +1,82 @@
+"""
+Throughput benchmarks for page-parallel PDF text extraction
+
+Run with: pytest tests/performance/test_pdf_extraction_performance.py -m performance -s
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+PyPDF2 = pytest.importorskip("PyPDF2")
+
+from pdf_extractor import PDFTextExtractor, _extract_pages
+
+PDF_DIR = ROOT / "ai_optimization" / "creatio-academy-db" / "developer_course" / "pdfs"
+
+
+@pytest.fixture(scope="module")
+def course_pdfs():
+    # The binder repeats the session PDFs; the sessions alone are ~470 pages
+    pdfs = sorted(PDF_DIR.glob("Creatio-Developer-*.pdf"))
+    if not pdfs:
+        pytest.skip("developer course PDFs not available")
+    return pdfs
+
+
+def legacy_extract(pdf_path):
+    """The previous loop: one page at a time, text built with +="""
+    content = ""
+    for page in PyPDF2.PdfReader(str(pdf_path)).pages:
+        content += page.extract_text() + "\n"
+    return content
+
+
+def run(extract, pdfs):
+    start = time.perf_counter()
+    texts = [extract(pdf) for pdf in pdfs]
+    return texts, time.perf_counter() - start
+
+
+@pytest.mark.performance
+def test_extraction_throughput(course_pdfs):
+    """Report pages/sec serially and across the pool; text must match the legacy loop"""
+    page_count = sum(len(PyPDF2.PdfReader(str(pdf)).pages) for pdf in course_pdfs)
+    workers = os.cpu_count() or 1
+
+    legacy, legacy_seconds = run(legacy_extract, course_pdfs)
+    with PDFTextExtractor(workers=1) as extractor:
+        serial, serial_seconds = run(lambda pdf: extractor.extract(pdf).text, course_pdfs)
+    with PDFTextExtractor(workers=workers) as extractor:
+        parallel, parallel_seconds = run(lambda pdf: extractor.extract(pdf).text, course_pdfs)
+
+    print(f"\n{page_count} pages: legacy {page_count / legacy_seconds:.1f} pages/sec, "
+          f"serial {page_count / serial_seconds:.1f} pages/sec, "
+          f"{workers} workers {page_count / parallel_seconds:.1f} pages/sec")
+    assert serial == legacy
+    assert parallel == legacy
+
+
+@pytest.mark.performance
+def test_only_image_pages_need_ocr(course_pdfs, tmp_path):
+    """Pages with a text layer and blank pages are never rasterized"""
+    for pdf in course_pdfs[:3]:
+        pages = range(len(PyPDF2.PdfReader(str(pdf)).pages))
+        assert not any(needs_ocr for _, _, needs_ocr in _extract_pages(str(pdf), list(pages)))
+
+    Image = pytest.importorskip("PIL.Image")
+    scanned = tmp_path / "scanned.pdf"
+    Image.new("RGB", (200, 100), "white").save(scanned)
+    blank = tmp_path / "blank.pdf"
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(100, 100)
+    with open(blank, "wb") as f:
+        writer.write(f)
+
+    assert _extract_pages(str(scanned), [0])[0][2]
+    assert not _extract_pages(str(blank), [0])[0][2]
@@ -0,0 +1,90 @@
+"""
+Scaling benchmarks for MinHash LSH related-file detection
+
+Run with: pytest tests/performance/test_related_files_performance.py -m performance -s
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+pytest.importorskip("numpy")
+
+from minhash_lsh import MinHashLSH
+
+THRESHOLD = 0.1
+
+# As configured in MetadataGenerator: the band S-curve sits just under THRESHOLD
+NUM_PERM = 256
+ROWS_PER_BAND = 2
+
+
+def make_previews(count, seed=7):
+    """Content previews drawn from per-topic vocabularies sharing a common core"""
+    rng = random.Random(seed)
+    topics = count // 5  # Clusters of five files, whatever the corpus size
+    common = [f"word{i}" for i in range(300)]
+    vocabularies = [[f"topic{t}_{i}" for i in range(120)] for t in range(topics)]
+    previews = {}
+    for n in range(count):
+        words = rng.sample(vocabularies[n % topics], 60) + rng.sample(common, 20)
+        previews[f"docs/file_{n}.md"] = set(words)
+    return previews
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def pairwise_related(previews):
+    """The previous scan: every file compared with every other file"""
+    return {
+        path: [other for other, other_words in previews.items()
+               if other != path and jaccard(words, other_words) > THRESHOLD]
+        for path, words in previews.items()
+    }
+
+
+def lsh_related(previews):
+    index = MinHashLSH(num_perm=NUM_PERM, rows_per_band=ROWS_PER_BAND)
+    for path, words in previews.items():
+        index.add(path, words)
+    return {path: [other for other, _ in index.query(path, THRESHOLD)] for path in previews}
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("count", [1000, 10000, 50000])
+def test_lsh_scaling(count):
+    """Report files/sec for indexing and querying every file"""
+    previews = make_previews(count)
+    start = time.perf_counter()
+    related = lsh_related(previews)
+    seconds = time.perf_counter() - start
+    print(f"\n{count} files: LSH {seconds:.2f}s ({count / seconds:.0f} files/sec), "
+          f"{sum(map(len, related.values())) / count:.1f} related per file")
+
+
+@pytest.mark.performance
+def test_lsh_recall_against_pairwise():
+    """Nearly every pair at J >= 0.15 must be found; the pairwise scan is quadratic"""
+    previews = make_previews(1000)
+
+    start = time.perf_counter()
+    exact = pairwise_related(previews)
+    pairwise_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    approximate = lsh_related(previews)
+    lsh_seconds = time.perf_counter() - start
+
+    strong = [(path, other) for path, others in exact.items() for other in others
+              if jaccard(previews[path], previews[other]) >= 0.15]
+    found = sum(other in approximate[path] for path, other in strong)
+    print(f"\n1000 files: pairwise {pairwise_seconds:.2f}s, LSH {lsh_seconds:.2f}s; "
+          f"recall at J >= 0.15: {found}/{len(strong)}")
+    assert strong
+    assert found / len(strong) >= 0.95
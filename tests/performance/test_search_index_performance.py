@@ -0,0 +1,56 @@
+"""
+Load-time benchmarks for the sharded metadata search index
+
+Run with: pytest tests/performance/test_search_index_performance.py -m performance -s
+"""
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+from sharded_search_index import ShardedIndexReader, write_sharded_index
+
+
+def make_index(count):
+    """Index shaped like MetadataGenerator output: 30 topics and 500 characters of text per file"""
+    index = {'files': {}, 'topics': {}, 'concepts': {}, 'categories': {}, 'extensions': {}}
+    for i in range(count):
+        path = f"docs/section_{i // 100}/file_{i}.md"
+        topics = [f"topic{(i * 7 + j) % (count // 10 + 30)}" for j in range(30)]
+        index['files'][path] = {'title': f"File {i}", 'searchable_text': "lorem ipsum " * 42,
+                                'category': 'documents', 'topics': topics, 'concepts': []}
+        for topic in topics:
+            index['topics'].setdefault(topic, []).append(path)
+        index['categories'].setdefault('documents', []).append(path)
+        index['extensions'].setdefault('.md', []).append(path)
+    return index
+
+
+@pytest.mark.performance
+@pytest.mark.parametrize("count", [1000, 10000, 100000])
+def test_facet_lookup_load_time(count, tmp_path):
+    """A cold topic lookup reads one posting bucket; the monolith is parsed whole"""
+    index = make_index(count)
+    with open(tmp_path / "search_index.json", "w") as f:
+        json.dump(index, f, indent=2)
+    write_sharded_index(index, tmp_path / "search_index")
+
+    start = time.perf_counter()
+    with open(tmp_path / "search_index.json") as f:
+        expected = json.load(f)['topics']['topic5']
+    monolithic_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reader = ShardedIndexReader(tmp_path / "search_index")
+    file_ids = reader.lookup('topics', 'topic5')
+    sharded_seconds = time.perf_counter() - start
+
+    print(f"\n{count} files: monolithic {monolithic_seconds * 1000:.1f} ms, "
+          f"sharded {sharded_seconds * 1000:.2f} ms ({reader.files_loaded} posting file)")
+    assert len(file_ids) == len(expected)
+    assert reader.files_loaded == 1
@@ -0,0 +1,67 @@
+"""
+Unit tests for the shared audio extraction cache
+"""
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+np = pytest.importorskip("numpy")
+
+if shutil.which("ffmpeg") is None:
+    pytest.skip("ffmpeg not available", allow_module_level=True)
+
+from audio_cache import SAMPLE_RATE, AudioCache
+
+
+def make_video(path, seconds=2, frequency=440):
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency={frequency}:duration={seconds}",
+        "-f", "lavfi", "-i", f"color=size=64x36:duration={seconds}:rate=5",
+        "-shortest", "-c:a", "aac", str(path)
+    ], check=True)
+    return path
+
+
+@pytest.mark.unit
+class TestAudioCache:
+    """Test hits, content addressing and eviction"""
+
+    def test_second_load_is_a_hit(self, tmp_path):
+        video = make_video(tmp_path / "lecture.mp4")
+        cache = AudioCache(tmp_path / "cache")
+
+        first = cache.load_audio(video)
+        second = cache.load_audio(video)
+
+        assert cache.stats == {"hits": 1, "misses": 1, "evicted": 0}
+        assert first.dtype == np.float32
+        assert abs(len(first) / SAMPLE_RATE - 2) < 0.1
+        assert np.array_equal(first, second)
+
+    def test_copies_share_one_entry(self, tmp_path):
+        video = make_video(tmp_path / "lecture.mp4")
+        copy = tmp_path / "copy" / "lecture.mp4"
+        copy.parent.mkdir()
+        shutil.copy(video, copy)
+        cache = AudioCache(tmp_path / "cache")
+
+        assert cache.audio_path(video) == cache.audio_path(copy)
+        assert cache.stats["misses"] == 1
+
+    def test_least_recently_used_evicted(self, tmp_path):
+        videos = [make_video(tmp_path / f"v{i}.mp4", frequency=300 + 100 * i) for i in range(3)]
+        cache = AudioCache(tmp_path / "cache")
+        paths = [cache.audio_path(video) for video in videos]
+
+        cache.max_bytes = paths[0].stat().st_size * 2
+        cache.audio_path(videos[0])  # Touch the oldest entry
+        cache.evict()
+
+        assert [path.exists() for path in paths] == [True, False, True]
@@ -0,0 +1,95 @@
+"""
+Unit tests for corpus-wide duplicate chunk suppression
+"""
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "ai_optimization"))
+
+pytest.importorskip("bs4")
+pytest.importorskip("tiktoken")
+
+from chunk_deduplicator import ChunkDeduplicator  # noqa: E402
+from document_chunker import DocumentChunk  # noqa: E402
+
+
+class FakeEncoding:
+    """Whitespace tokenizer standing in for tiktoken (no network in tests)"""
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [text.split() for text in texts]
+
+
+def make_chunk(chunk_id, content, document_id="doc"):
+    return DocumentChunk(
+        chunk_id=chunk_id, document_id=document_id, content=content,
+        chunk_type="paragraph", chunk_index=0, metadata={},
+        word_count=len(content.split()), token_count=len(content.split()), context={}
+    )
+
+
+BODY = " ".join(f"word{i}" for i in range(200))
+
+
+@pytest.mark.unit
+class TestChunkDeduplicator:
+    """Test exact and near-duplicate detection"""
+
+    def test_exact_duplicates_ignore_case_and_spacing(self):
+        dedup = ChunkDeduplicator()
+        assert dedup.check(make_chunk("a", "Accept  cookies!\n\nPrivacy policy")) is None
+
+        link = dedup.check(make_chunk("b", "accept cookies privacy POLICY", "other"))
+        assert (link.duplicate_of, link.kind, link.document_id) == ("a", "exact", "other")
+
+    def test_near_duplicate_linked(self):
+        dedup = ChunkDeduplicator()
+        dedup.check(make_chunk("a", f"Updated 2023 {BODY}"))
+
+        link = dedup.check(make_chunk("b", f"Updated 2024 {BODY}"))
+        assert (link.duplicate_of, link.kind) == ("a", "near")
+
+    def test_distinct_chunks_kept(self):
+        dedup = ChunkDeduplicator()
+        other = " ".join(f"term{i}" for i in range(60))
+
+        kept = list(dedup.filter([make_chunk("a", BODY), make_chunk("b", other)]))
+        assert [chunk.chunk_id for chunk in kept] == ["a", "b"]
+        assert dedup.report()["chunks_suppressed"] == 0
+
+    def test_report_counts_work_avoided(self):
+        dedup = ChunkDeduplicator()
+        chunks = [make_chunk(str(i), BODY, f"page-{i}") for i in range(4)]
+
+        kept = list(dedup.filter(chunks))
+        report = dedup.report()
+
+        assert len(kept) == 1
+        assert report["embeddings_avoided"] == 3
+        assert report["tokens_avoided"] == 3 * chunks[0].token_count
+        assert report["suppressed_ratio"] == 0.75
+
+    def test_chunker_drops_shared_boilerplate(self):
+        with patch("tiktoken.get_encoding", return_value=FakeEncoding()):
+            from document_chunker import SemanticDocumentChunker
+            dedup = ChunkDeduplicator()
+            chunker = SemanticDocumentChunker(max_chunk_size=200, overlap_size=40,
+                                              deduplicator=dedup)
+
+        footer = "<footer><p>Copyright Creatio. All rights reserved.</p></footer>"
+        first = chunker.chunk_html_document(f"<body><h1>One</h1><p>First page</p><h2>Footer</h2>{footer}</body>", "p1")
+        second = chunker.chunk_html_document(f"<body><h1>Two</h1><p>Second page</p><h2>Footer</h2>{footer}</body>", "p2")
+
+        assert any("Copyright" in chunk.content for chunk in first)
+        assert not any("Copyright" in chunk.content for chunk in second)
+        assert [link.document_id for link in dedup.links] == ["p2"]
@@ -0,0 +1,168 @@
+"""
+Unit tests for the resumable Developer Course processor
+"""
+import json
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "ai_optimization"))
+
+for module in ("bs4", "tiktoken", "whisper", "cv2", "PyPDF2"):
+    pytest.importorskip(module)
+
+
+class FakeEncoding:
+    """Whitespace tokenizer standing in for tiktoken (no network in tests)"""
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def course(tmp_path):
+    source = tmp_path / "course"
+    (source / "transcripts").mkdir(parents=True)
+    for i in range(3):
+        paragraphs = [f"Session {i} paragraph {j} " + f"topic{i}_{j} " * 40 for j in range(4)]
+        (source / "transcripts" / f"session_{i}.txt").write_text("\n\n".join(paragraphs))
+    return source, tmp_path / "hub"
+
+
+def make_processor(source, output, **options):
+    with patch("tiktoken.get_encoding", return_value=FakeEncoding()), \
+            patch("whisper.load_model", side_effect=RuntimeError("no model")):
+        from developer_course_processor import DeveloperCourseProcessor
+        return DeveloperCourseProcessor(str(source), str(output), workers=1, **options)
+
+
+def ledger_lines(output):
+    path = output / "developer_course" / "processing_ledger.jsonl"
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.unit
+class TestProcessingLedger:
+    """Test resumable processing"""
+
+    def test_rerun_reuses_completed_items(self, course):
+        source, output = course
+        first = make_processor(source, output).process_all_materials()
+
+        processor = make_processor(source, output)
+        with patch.object(processor, "extract_transcript", side_effect=AssertionError("re-extracted")):
+            second = processor.process_all_materials()
+
+        assert [c.content_id for c in second] == [c.content_id for c in first]
+        assert [c.chunk_count for c in second] == [c.chunk_count for c in first]
+        assert len(ledger_lines(output)) == 3
+
+    def test_failures_are_retried(self, course):
+        source, output = course
+        processor = make_processor(source, output)
+        original = processor.extract_transcript
+
+        def flaky(path, content_id):
+            if path.name == "session_1.txt":
+                raise RuntimeError("disk error")
+            return original(path, content_id)
+
+        with patch.object(processor, "extract_transcript", side_effect=flaky):
+            assert len(processor.process_all_materials()) == 2
+
+        processor = make_processor(source, output)
+        extracted = []
+        original = processor.extract_transcript
+
+        def record(path, content_id):
+            extracted.append(path.name)
+            return original(path, content_id)
+
+        with patch.object(processor, "extract_transcript", side_effect=record):
+            assert len(processor.process_all_materials()) == 3
+        assert extracted == ["session_1.txt"]
+
+    def test_changed_source_is_reprocessed(self, course):
+        source, output = course
+        make_processor(source, output).process_all_materials()
+        (source / "transcripts" / "session_0.txt").write_text("Rewritten session " * 50)
+
+        content = make_processor(source, output).process_all_materials()
+
+        statuses = [(e["key"], e["status"]) for e in ledger_lines(output)]
+        assert statuses[-1] == ("transcript:transcripts/session_0.txt", "done")
+        assert len(statuses) == 4
+        assert len(content) == 3
+
+        # The superseded entry is dropped when the ledger is next loaded
+        make_processor(source, output).process_all_materials()
+        assert len(ledger_lines(output)) == 3
+
+    def test_deleted_text_is_extracted_again(self, course):
+        source, output = course
+        make_processor(source, output).process_all_materials()
+        text_file = next(e["text_file"] for e in ledger_lines(output) if e["key"].endswith("session_2.txt"))
+        Path(text_file).unlink()
+
+        processor = make_processor(source, output)
+        extracted = []
+        original = processor.extract_transcript
+
+        def record(path, content_id):
+            extracted.append(path.name)
+            return original(path, content_id)
+
+        with patch.object(processor, "extract_transcript", side_effect=record):
+            content = processor.process_all_materials()
+        assert extracted == ["session_2.txt"]
+        assert all(c.chunk_count > 0 for c in content)
+
+
+@pytest.mark.unit
+class TestKeyFrames:
+    """Test sequential scene-change key frame extraction"""
+
+    def write_slides_video(self, path, slides, seconds_per_slide=3, fps=10):
+        import cv2
+        import numpy as np
+
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (320, 180))
+        for slide in range(slides):
+            frame = np.full((180, 320, 3), 255, np.uint8)
+            cv2.putText(frame, f"Slide {slide}", (20, 40 + 30 * slide),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 0, 0), 2)
+            cv2.rectangle(frame, (40 * slide, 120), (40 * slide + 60, 170), (0, 0, 255), -1)
+            for _ in range(seconds_per_slide * fps):
+                writer.write(frame)
+        writer.release()
+        if not path.exists() or path.stat().st_size == 0:
+            pytest.skip("OpenCV cannot write mp4v video here")
+
+    def test_frames_picked_at_slide_changes(self, course):
+        source, output = course
+        video = source / "lesson.mp4"
+        self.write_slides_video(video, slides=4)
+
+        processor = make_processor(source, output, keyframe_method="opencv")
+        frames = processor.extract_key_frames(video, num_frames=10)
+
+        assert [Path(frame).name for frame in frames] == [
+            "frame_000000.jpg", "frame_000030.jpg", "frame_000060.jpg", "frame_000090.jpg"
+        ]
+
+    def test_phash_dedupe_skips_repeated_slides(self, course):
+        processor = make_processor(*course)
+        candidates = [(50.0, 0, "a", 0b1111), (40.0, 30, "b", 0b1110), (30.0, 60, "c", (1 << 255) - 1)]
+
+        assert [c[2] for c in processor.select_key_frames(candidates, 3)] == ["a", "c"]
+        processor.keyframe_dedupe = False
+        assert [c[2] for c in processor.select_key_frames(candidates, 3)] == ["a", "b", "c"]
@@ -0,0 +1,237 @@
+"""
+Unit tests for the semantic document chunker
+"""
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "ai_optimization"))
+
+bs4 = pytest.importorskip("bs4")
+pytest.importorskip("tiktoken")
+
+ARCHIVE_DIR = ROOT / "creatio-academy-archive" / "pages" / "raw"
+HEADINGS = ["h1", "h2", "h3", "h4", "h5", "h6"]
+
+
+class FakeEncoding:
+    """Whitespace tokenizer standing in for tiktoken (no network in tests)"""
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_ordinary(self, text):
+        return text.split()
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def chunker():
+    with patch("tiktoken.get_encoding", return_value=FakeEncoding()):
+        from document_chunker import SemanticDocumentChunker
+        return SemanticDocumentChunker(max_chunk_size=200, overlap_size=40)
+
+
+def compact(text):
+    return "".join(text.split())
+
+
+def block_texts(structure):
+    texts = []
+    for section in structure["sections"]:
+        if section["heading"]:
+            texts.append(section["heading"]["text"])
+        texts.extend(text for _, text in section["content_elements"])
+    return texts
+
+
+def visible_text(soup):
+    root = soup.body or soup
+    for tag in root.find_all(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    return root.get_text()
+
+
+def archive_pages(limit=40):
+    if not ARCHIVE_DIR.exists():
+        pytest.skip("creatio-academy-archive pages not available")
+    return sorted(ARCHIVE_DIR.glob("*.html"))[:limit]
+
+
+@pytest.mark.unit
+class TestDocumentStructure:
+    """Test the single-pass DOM walk"""
+
+    def test_nested_containers_read_once(self, chunker):
+        html = """
+        <body><div><section><div>
+            <p>Alpha <code>beta</code></p>
+            Loose <b>text</b> here
+            <div><div><pre class="language-js">var x = 1;</pre></div></div>
+        </div></section></div></body>
+        """
+        soup = bs4.BeautifulSoup(html, "html.parser")
+        structure = chunker._extract_document_structure(soup)
+
+        assert block_texts(structure) == ["Alpha beta", "Loose text here", "var x = 1;"]
+
+    def test_heading_hierarchy_preserved(self, chunker):
+        html = """
+        <body><div>
+            <h1>Title</h1><div><p>Intro</p></div>
+            <a href="#"><h2>Card</h2><p>Card body</p></a>
+            <div><h3>Deep</h3><ul><li>one</li><li>two</li></ul></div>
+        </div></body>
+        """
+        soup = bs4.BeautifulSoup(html, "html.parser")
+        structure = chunker._extract_document_structure(soup)
+
+        headings = [(s["heading"]["level"], s["heading"]["text"]) for s in structure["sections"]]
+        assert headings == [(1, "Title"), (2, "Card"), (3, "Deep")]
+        assert [text for _, text in structure["sections"][2]["content_elements"]] == ["onetwo"]
+
+    def test_chunks_have_no_duplicated_text(self, chunker):
+        inner = "<p>needle</p>"
+        for _ in range(20):
+            inner = f"<div>{inner}</div>"
+        chunks = chunker.chunk_html_document(f"<body>{inner}</body>", "doc")
+
+        assert sum(chunk.content.count("needle") for chunk in chunks) == 1
+
+
+@pytest.mark.unit
+class TestArchiveDifferential:
+    """Compare the walk against the archived Creatio pages"""
+
+    def test_walk_covers_visible_text_exactly_once(self, chunker):
+        for page in archive_pages():
+            html = page.read_text(encoding="utf-8", errors="ignore")
+            soup = bs4.BeautifulSoup(html, chunker.html_parser)
+            structure = chunker._extract_document_structure(soup)
+
+            expected = compact(visible_text(bs4.BeautifulSoup(html, chunker.html_parser)))
+            assert compact("".join(block_texts(structure))) == expected, page.name
+
+    def test_headings_match_legacy_order(self, chunker):
+        for page in archive_pages():
+            html = page.read_text(encoding="utf-8", errors="ignore")
+            soup = bs4.BeautifulSoup(html, chunker.html_parser)
+            structure = chunker._extract_document_structure(soup)
+
+            root = soup.body or soup
+            legacy = [
+                h.get_text().strip() for h in root.find_all(HEADINGS)
+                if not h.find_parent(["p", "pre", "code", "table", "ul", "ol",
+                                      "script", "style", "noscript", "template"])
+            ]
+            walked = [s["heading"]["text"] for s in structure["sections"] if s["heading"]]
+            assert walked == legacy, page.name
+
+
+@pytest.mark.unit
+class TestStreamingChunks:
+    """Test the iterator API and the streaming export writer"""
+
+    TEXT = "\n\n".join(
+        f"Section {i}\n\n" + "\n\n".join(f"word{i}_{j} " * 30 for j in range(6))
+        for i in range(5)
+    )
+
+    def test_iterator_matches_list(self, chunker):
+        streamed = list(chunker.iter_text_chunks(self.TEXT, "doc"))
+        listed = chunker.chunk_text_document(self.TEXT, "doc")
+
+        assert [c.content for c in streamed] == [c.content for c in listed]
+        assert [c.chunk_index for c in streamed] == list(range(len(streamed)))
+
+    @pytest.mark.parametrize("suffix", [".json", ".jsonl"])
+    def test_writer_round_trips(self, chunker, tmp_path, suffix):
+        from document_chunker import chunk_to_rag_entry
+
+        chunks = chunker.chunk_text_document(self.TEXT, "doc")
+        output = tmp_path / f"export{suffix}"
+        chunker.export_chunks_for_rag(iter(chunks), output)
+
+        if suffix == ".jsonl":
+            entries = [json.loads(line) for line in output.read_text().splitlines()]
+        else:
+            entries = json.loads(output.read_text())
+        assert entries == [chunk_to_rag_entry(c) for c in chunks]
+
+    def test_writer_empty_export_is_valid_json(self, chunker, tmp_path):
+        output = tmp_path / "empty.json"
+        chunker.export_chunks_for_rag([], output)
+        assert json.loads(output.read_text()) == []
+
+
+@pytest.mark.unit
+class TestCompactChunk:
+    """Test the slotted chunk representation"""
+
+    HTML = """
+    <body>
+        <h1>Guide</h1><p>Intro text</p><pre class="language-js">var x = 1;</pre>
+        <h2>Setup</h2><ul><li>one</li><li>two</li></ul><p>More text</p>
+    </body>
+    """
+
+    @pytest.fixture
+    def compact_chunker(self):
+        with patch("tiktoken.get_encoding", return_value=FakeEncoding()):
+            from document_chunker import SemanticDocumentChunker
+            return SemanticDocumentChunker(max_chunk_size=200, overlap_size=40,
+                                           compact_chunks=True)
+
+    def test_compact_chunks_are_lossless(self, chunker, compact_chunker):
+        from document_chunker import CompactChunk, chunk_to_rag_entry
+
+        metadata = {"source": "archive", "tags": ["a", "b"]}
+        plain = chunker.chunk_html_document(self.HTML, "doc", metadata)
+        compact = compact_chunker.chunk_html_document(self.HTML, "doc", metadata)
+
+        assert all(isinstance(chunk, CompactChunk) for chunk in compact)
+        assert [c.to_dict() for c in compact] == [asdict(c) for c in plain]
+        assert [chunk_to_rag_entry(c) for c in compact] == [chunk_to_rag_entry(c) for c in plain]
+        assert [c.to_document_chunk() for c in compact] == plain
+
+    def test_metadata_is_read_only_and_chunks_hashable(self, compact_chunker):
+        chunk = compact_chunker.chunk_text_document("para " * 60, "doc", {"source": "archive"})[0]
+
+        with pytest.raises(TypeError, match="read-only"):
+            chunk.metadata["source"] = "web"
+        with pytest.raises(TypeError, match="read-only"):
+            chunk.metadata.update(source="web")
+        assert chunk.metadata["source"] == "archive"
+        assert json.loads(json.dumps(chunk.metadata)) == chunk.to_dict()["metadata"]
+
+        copy = compact_chunker.chunk_text_document("para " * 60, "doc", {"source": "archive"})[0]
+        assert len({chunk, copy}) == 1
+
+    def test_document_metadata_shared(self, compact_chunker):
+        metadata = {"source": "archive"}
+        chunks = compact_chunker.chunk_text_document(
+            "\n\n".join(f"para {i} " * 60 for i in range(8)), "doc", metadata
+        )
+
+        assert len(chunks) > 1
+        assert all(chunk.document_metadata is metadata for chunk in chunks)
+
+    def test_interner_shares_loaded_metadata(self, chunker):
+        from document_chunker import ChunkInterner, CompactChunk, chunk_as_dict
+
+        chunks = chunker.chunk_html_document(self.HTML, "doc", {"source": "archive"})
+        interner = ChunkInterner()
+        loaded = [
+            CompactChunk(**json.loads(json.dumps(chunk_as_dict(c))), interner=interner)
+            for c in chunks
+        ]
+
+        assert len({id(c.document_metadata) for c in loaded}) == 1
+        assert [chunk_as_dict(c) for c in loaded] == [chunk_as_dict(c) for c in chunks]
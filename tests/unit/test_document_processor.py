@@ -0,0 +1,163 @@
+"""
+Unit tests for incremental directory conversion in the document processor
+"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+import document_processor
+from document_processor import DocumentProcessor
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / "docs"
+    files = {
+        "guide/intro.txt": "Introduction to the Creatio designer",
+        "notes.md": "# Notes\n\nSection wizard settings",
+        "data.json": '{"entity": "Contact"}',
+        "node_modules/package/readme.txt": "Dependency readme",
+        ".cache/cached.txt": "Hidden directory",
+    }
+    for relative, text in files.items():
+        path = source / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return source
+
+
+def make_processor(source, **kwargs):
+    # Output and temp directories inside the input tree must not be picked up as input
+    return DocumentProcessor(output_dir=str(source / "markdown"), temp_dir=str(source / "tmp"),
+                             workers=1, **kwargs)
+
+
+def manifest_of(processor):
+    with open(processor.manifest_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.mark.unit
+class TestProcessDirectory:
+    """Test the manifest skip, stable output names and the pruned walk"""
+
+    def test_second_run_skips_everything(self, source):
+        first = make_processor(source).process_directory(source)
+        assert first['files_processed'] == 3
+        outputs = sorted(os.listdir(source / "markdown"))
+
+        second = make_processor(source).process_directory(source)
+        assert second['files_processed'] == 0
+        assert second['files_unchanged'] == 3
+        assert all(item['result']['skipped'] for item in second['results'])
+        assert sorted(os.listdir(source / "markdown")) == outputs
+
+        forced = make_processor(source).process_directory(source, force=True)
+        assert forced['files_processed'] == 3
+        assert sorted(os.listdir(source / "markdown")) == outputs
+
+    def test_edited_file_is_reconverted_to_the_same_output(self, source):
+        processor = make_processor(source)
+        processor.process_directory(source)
+        intro = source / "guide" / "intro.txt"
+        output_file = manifest_of(processor)[str(intro.resolve())]['output_file']
+
+        # Same size, so only the content hash can tell the difference
+        intro.write_text("Introduction to the Creatio DESIGNER")
+        stat = intro.stat()
+        os.utime(intro, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = make_processor(source).process_directory(source)
+        assert result['files_processed'] == 1
+        assert result['files_unchanged'] == 2
+        assert manifest_of(processor)[str(intro.resolve())]['output_file'] == output_file
+        assert "DESIGNER" in Path(output_file).read_text()
+
+    def test_touched_but_unchanged_file_is_skipped(self, source):
+        processor = make_processor(source)
+        processor.process_directory(source)
+        notes = source / "notes.md"
+        stat = notes.stat()
+        os.utime(notes, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = make_processor(source).process_directory(source)
+        assert result['files_processed'] == 0
+        assert manifest_of(processor)[str(notes.resolve())]['mtime_ns'] == stat.st_mtime_ns + 10**9
+
+    def test_missing_output_is_reconverted(self, source):
+        processor = make_processor(source)
+        processor.process_directory(source)
+        data = str((source / "data.json").resolve())
+        os.remove(manifest_of(processor)[data]['output_file'])
+
+        assert make_processor(source).process_directory(source)['files_processed'] == 1
+
+    def test_deleted_inputs_are_pruned_from_the_manifest(self, source):
+        processor = make_processor(source)
+        processor.process_directory(source)
+        notes = str((source / "notes.md").resolve())
+        assert notes in manifest_of(processor)
+
+        os.remove(notes)
+        (source / "broken.txt").symlink_to(source / "missing.txt")
+        result = make_processor(source).process_directory(source)
+        assert result['files_unchanged'] == 2
+        assert notes not in manifest_of(processor)
+        assert len(manifest_of(processor)) == 2
+
+    def test_walk_skips_dependencies_hidden_and_own_directories(self, source):
+        processor = make_processor(source)
+        processor.process_directory(source)
+        (source / "tmp" / "scratch.txt").write_text("Intermediate file")
+
+        found = processor.find_files(source)
+        assert sorted(path.relative_to(source).as_posix() for path, _ in found) == [
+            "data.json", "guide/intro.txt", "notes.md"]
+        assert dict((path.name, file_type) for path, file_type in found) == {
+            "data.json": "other", "intro.txt": "text", "notes.md": "text"}
+        assert [path.name for path, _ in processor.find_files(source, recursive=False)] == [
+            "data.json", "notes.md"]
+
+
+@pytest.mark.unit
+class TestConvertFiles:
+    """Test the per-type concurrency limits of the conversion pool"""
+
+    def test_concurrency_limits_by_type(self, tmp_path, monkeypatch):
+        lock = threading.Lock()
+        running, peak = Counter(), Counter()
+
+        def convert(file_path, file_type, output_name):
+            with lock:
+                running[file_type] += 1
+                running['all'] += 1
+                peak[file_type] = max(peak[file_type], running[file_type])
+                peak['all'] = max(peak['all'], running['all'])
+            time.sleep(0.01)
+            with lock:
+                running[file_type] -= 1
+                running['all'] -= 1
+            return {'success': True, 'seconds': 0.01}
+
+        monkeypatch.setattr(document_processor, 'ProcessPoolExecutor', ThreadPoolExecutor)
+        monkeypatch.setattr(document_processor, '_convert_in_worker', convert)
+        processor = DocumentProcessor(output_dir=str(tmp_path / "out"), workers=4)
+        jobs = [(tmp_path / f"{file_type}{i}", file_type, f"{file_type}{i}")
+                for file_type in ('video', 'pdf', 'text') for i in range(6)]
+
+        results = list(processor.convert_files(jobs))
+
+        assert sorted(job[2] for job, _ in results) == sorted(job[2] for job in jobs)
+        assert peak['video'] == 1
+        assert peak['pdf'] <= 2
+        assert peak['all'] <= 4
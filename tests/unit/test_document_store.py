@@ -0,0 +1,81 @@
+"""
+Unit tests for the SQLite-backed semantic search document store
+"""
+import json
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "search-index" / "engines"))
+
+from document_store import DocumentStore
+
+
+def make_documents(count):
+    return [{'id': f"doc{i}", 'title': f"Doc {i}", 'content': f"Body {i}",
+             'metadata': {'content_type': 'pdf', 'page': i}} for i in range(count)]
+
+
+@pytest.mark.unit
+class TestDocumentStore:
+    """Test persistence, the legacy import and write consistency"""
+
+    def test_documents_survive_reopening(self, tmp_path):
+        store = DocumentStore(tmp_path / "documents.db")
+        store.replace_all(make_documents(3))
+        assert store.add({'id': 'extra', 'content': 'More', 'type': 'video'}) == 3
+        store.close()
+
+        store = DocumentStore(tmp_path / "documents.db")
+        assert len(store) == 4
+        assert store.row_of('doc1') == 1
+        assert store.get(1) == {'id': 'doc1', 'title': 'Doc 1', 'content': 'Body 1',
+                                'metadata': {'content_type': 'pdf', 'page': 1}}
+        assert store.get(3, ['id', 'type', 'content']) == {'id': 'extra', 'type': 'video', 'content': 'More'}
+
+    def test_import_legacy_json(self, tmp_path):
+        documents_file = tmp_path / "documents.json"
+        documents_file.write_text(json.dumps(make_documents(5)))
+
+        store = DocumentStore(tmp_path / "documents.db")
+        assert store.import_json(documents_file) == 5
+        assert store.ids == [f"doc{i}" for i in range(5)]
+        assert store.types == ['pdf'] * 5
+        assert store.get(4, ['title', 'metadata']) == {'title': 'Doc 4',
+                                                       'metadata': {'content_type': 'pdf', 'page': 4}}
+
+    def test_failed_writes_leave_memory_unchanged(self, tmp_path):
+        store = DocumentStore(tmp_path / "documents.db")
+        store.replace_all(make_documents(2))
+
+        with pytest.raises(KeyError):
+            store.replace_all(make_documents(2) + [{'title': 'no id'}])
+        store.conn.execute('CREATE TRIGGER reject BEFORE INSERT ON documents '
+                           'BEGIN SELECT RAISE(ABORT, "rejected"); END')
+        with pytest.raises(sqlite3.IntegrityError):
+            store.add({'id': 'doc2', 'content': 'x'})
+
+        assert store.ids == ['doc0', 'doc1']
+        assert store.row_of('doc2') is None
+        assert store.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0] == 2
+
+    def test_concurrent_adds_get_distinct_rows(self, tmp_path):
+        store = DocumentStore(tmp_path / "documents.db")
+
+        def add_many(thread):
+            for i in range(50):
+                store.add({'id': f"t{thread}-{i}", 'content': ''})
+
+        threads = [threading.Thread(target=add_many, args=(t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(store) == 200
+        for row, doc_id in store.conn.execute('SELECT row, id FROM documents'):
+            assert store.ids[row] == doc_id
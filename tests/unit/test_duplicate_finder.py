@@ -0,0 +1,103 @@
+"""
+Unit tests for staged duplicate detection and link-based dedupe
+"""
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+from duplicate_finder import DuplicateFinder, link_duplicate
+
+
+@pytest.fixture
+def files(tmp_path):
+    large = os.urandom(300 * 1024)
+    middle_changed = bytearray(large)
+    middle_changed[150 * 1024] ^= 0xFF
+    contents = {
+        "a/video.mp4": large,
+        "b/video copy.mp4": large,
+        "c/edited.mp4": bytes(middle_changed),  # same size, head and tail
+        "a/notes.txt": b"notes",
+        "b/notes.txt": b"notes",
+        "c/other.txt": b"other",  # same size as notes, different content
+        "c/unique.bin": os.urandom(1000),
+    }
+    for relative, data in contents.items():
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return tmp_path
+
+
+@pytest.mark.unit
+class TestDuplicateFinder:
+    """Test staged duplicate detection and link replacement"""
+
+    def test_groups_match_full_hashes(self, files):
+        paths = sorted(str(path) for path in files.rglob("*") if path.is_file())
+        finder = DuplicateFinder(partial_bytes=4096)
+        duplicates = finder.find(paths)
+
+        assert sorted(map(sorted, duplicates.values())) == [
+            [str(files / "a/notes.txt"), str(files / "b/notes.txt")],
+            [str(files / "a/video.mp4"), str(files / "b/video copy.mp4")],
+        ]
+        for digest, group in duplicates.items():
+            assert digest == hashlib.md5(Path(group[0]).read_bytes()).hexdigest()
+        # The unique-size file is never read; the edited video needs a full hash to rule out
+        assert finder.stats.partial_hashed == 6
+        assert finder.stats.full_hashed == 3
+
+    def test_hard_links_are_not_duplicates(self, files):
+        os.link(files / "c/unique.bin", files / "c/unique link.bin")
+        assert DuplicateFinder().find([str(files / "c/unique.bin"), str(files / "c/unique link.bin")]) == {}
+
+    def test_files_without_inode_numbers_are_compared(self, files, monkeypatch):
+        import duplicate_finder
+
+        real_stat = os.stat
+
+        def stat_without_inode(path, *args, **kwargs):
+            st = real_stat(path, *args, **kwargs)
+            return os.stat_result((st.st_mode, 0, 0, st.st_nlink, st.st_uid, st.st_gid,
+                                   st.st_size, st.st_atime, st.st_mtime, st.st_ctime))
+
+        monkeypatch.setattr(duplicate_finder.os, 'stat', stat_without_inode)
+        paths = sorted(str(path) for path in files.rglob("*") if path.is_file())
+        duplicates = DuplicateFinder().find(paths)
+
+        assert sorted(map(sorted, duplicates.values())) == [
+            [str(files / "a/notes.txt"), str(files / "b/notes.txt")],
+            [str(files / "a/video.mp4"), str(files / "b/video copy.mp4")],
+        ]
+
+    def test_overlapping_inputs_are_counted_once(self, files):
+        from file_walker import FileWalker
+
+        walker = FileWalker()
+        entries = list(walker.files(files)) + list(walker.files(files / "a"))
+        finder = DuplicateFinder()
+        duplicates = finder.find(entries + [str(files / "b" / ".." / "b/notes.txt")])
+
+        assert finder.stats.files == 7
+        assert sorted(map(sorted, duplicates.values())) == [
+            [str(files / "a/notes.txt"), str(files / "b/notes.txt")],
+            [str(files / "a/video.mp4"), str(files / "b/video copy.mp4")],
+        ]
+
+    def test_link_duplicate_replaces_only_identical_files(self, files):
+        original, duplicate = files / "a/video.mp4", files / "b/video copy.mp4"
+        assert link_duplicate(original, duplicate)
+        assert os.path.samefile(original, duplicate)
+        assert not link_duplicate(original, duplicate)
+
+        assert not link_duplicate(files / "a/notes.txt", files / "c/other.txt")
+        assert (files / "c/other.txt").read_bytes() == b"other"
+        with pytest.raises(ValueError):
+            link_duplicate(original, duplicate, mode="symlink")
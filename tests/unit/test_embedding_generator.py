@@ -0,0 +1,380 @@
+"""
+Unit tests for the embedding generator's indices and search
+"""
+import json
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "ai_optimization"))
+
+for module in ("bs4", "tiktoken", "faiss", "sklearn", "torch", "sentence_transformers"):
+    pytest.importorskip(module)
+
+import embedding_generator
+from embedding_generator import AdvancedEmbeddingGenerator, MetadataColumns, iter_json_array
+
+DIMENSION = 8
+
+
+class FakeModel:
+    """Deterministic per-text vectors standing in for a sentence transformer"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def get_sentence_embedding_dimension(self):
+        return DIMENSION
+
+    def encode(self, texts, normalize_embeddings=False, **kwargs):
+        vectors = np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIMENSION)
+            for text in texts
+        ]).astype(np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+@pytest.fixture
+def make_generator(tmp_path, monkeypatch):
+    monkeypatch.setattr(embedding_generator, 'SentenceTransformer', FakeModel)
+
+    def make(**kwargs):
+        return AdvancedEmbeddingGenerator(output_path=str(tmp_path / "embeddings"), **kwargs)
+    return make
+
+
+@pytest.fixture
+def generator(make_generator):
+    return make_generator()
+
+
+def write_shard(generator, content_type, vectors, metadata_rows=None):
+    """Save vectors, metadata and a flat index the way generate_embeddings_for_chunks does"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    np.save(generator.output_path / "vectors" / f"{content_type}_embeddings.npy", vectors)
+    rows = len(vectors) if metadata_rows is None else metadata_rows
+    metadata = [{'embedding_id': f"{content_type}-e{i}", 'chunk_id': f"{content_type}-{i}",
+                 'model_name': generator.model_name, 'embedding_dimension': DIMENSION,
+                 'created_timestamp': '2026-01-01T00:00:00', 'similarity_cluster': i % 2,
+                 'topic_keywords': ['api', 'schema'][:i % 3]} for i in range(rows)]
+    with open(generator.output_path / "metadata" / f"{content_type}_metadata.json", 'w') as f:
+        json.dump(metadata, f, indent=2)
+    generator.create_faiss_index(vectors.copy(), content_type)
+    return metadata
+
+
+def random_vectors(count, seed):
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+
+def blobs(count, clusters, seed=0):
+    """Unit vectors tightly grouped around `clusters` random directions"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, DIMENSION))
+    groups = np.arange(count) % clusters
+    points = centers[groups] / np.linalg.norm(centers[groups], axis=1, keepdims=True)
+    points += rng.standard_normal((count, DIMENSION)) * 0.02
+    points /= np.linalg.norm(points, axis=1, keepdims=True)
+    return points.astype(np.float32)
+
+
+def cluster_info(generator, content_type):
+    with open(generator.output_path / "clusters" / f"{content_type}_clusters.json") as f:
+        return json.load(f)
+
+
+@pytest.mark.unit
+class TestMetadataColumns:
+    """Test the columnar metadata and its per-version cache"""
+
+    RECORDS = [
+        {'embedding_id': 'e0', 'chunk_id': 'c0', 'model_name': 'mini', 'embedding_dimension': 8,
+         'created_timestamp': '2026-01-01T00:00:00', 'similarity_cluster': 3,
+         'topic_keywords': ['api', 'schema']},
+        {'embedding_id': 'e1', 'chunk_id': 'c1', 'model_name': 'large', 'embedding_dimension': 16,
+         'created_timestamp': '2026-01-02T00:00:00', 'similarity_cluster': None,
+         'topic_keywords': []},
+        {'embedding_id': 'e2', 'chunk_id': 'c2', 'model_name': 'mini', 'embedding_dimension': 8,
+         'created_timestamp': '2026-01-03T00:00:00', 'similarity_cluster': 0,
+         'topic_keywords': ['workflow']},
+    ]
+
+    def test_records_round_trip(self):
+        columns = MetadataColumns.from_records(self.RECORDS, (1, 2))
+
+        assert len(columns) == 3
+        assert [columns.record(row) for row in range(3)] == self.RECORDS
+        assert columns.model_names == ['mini', 'large']
+        assert columns.clusters.tolist() == [3, -1, 0]
+        assert columns.keyword_offsets.tolist() == [0, 2, 2, 3]
+        assert columns.topic_keywords(1) == []
+        assert columns.cluster(1) is None
+
+    def test_missing_optional_fields_get_defaults(self):
+        columns = MetadataColumns.from_records([{'chunk_id': 'c0'}], (1, 2))
+
+        assert columns.record(0) == {
+            'embedding_id': '', 'chunk_id': 'c0', 'model_name': '', 'embedding_dimension': 0,
+            'created_timestamp': '', 'similarity_cluster': None, 'topic_keywords': []}
+
+    def test_metadata_is_parsed_once_per_file_version(self, generator):
+        metadata = write_shard(generator, 'pdf', random_vectors(3, 1))
+        metadata_file = generator.output_path / "metadata" / "pdf_metadata.json"
+
+        columns = generator.load_search_metadata('pdf')
+        assert generator.load_search_metadata('pdf') is columns
+        assert [columns.record(row) for row in range(3)] == metadata
+
+        metadata[0]['topic_keywords'] = ['changed']
+        metadata_file.write_text(json.dumps(metadata))
+        reloaded = generator.load_search_metadata('pdf')
+        assert reloaded is not columns
+        assert reloaded.topic_keywords(0) == ['changed']
+
+        metadata_file.unlink()
+        assert generator.load_search_metadata('pdf') is None
+        assert 'pdf' not in generator.metadata_cache
+
+    def test_jsonl_metadata_is_preferred(self, generator):
+        metadata_dir = generator.output_path / "metadata"
+        (metadata_dir / "pdf_metadata.json").write_text(json.dumps(self.RECORDS[:1]))
+        (metadata_dir / "pdf_metadata.jsonl").write_text(
+            "".join(json.dumps(record) + "\n" for record in self.RECORDS) + "\n")
+
+        columns = generator.load_search_metadata('pdf')
+        assert [columns.record(row) for row in range(len(columns))] == self.RECORDS
+
+    def test_search_results_carry_the_full_record(self, generator):
+        query = generator.encode_query("entity schema")[0]
+        vectors = random_vectors(3, 1)
+        vectors[2] = query
+        metadata = write_shard(generator, 'pdf', vectors)
+
+        result = generator.semantic_search("entity schema", 'pdf', top_k=1, similarity_threshold=0.0)[0]
+        assert result['metadata'] == metadata[2]
+        assert (result['chunk_id'], result['cluster'], result['topic_keywords']) == ('pdf-2', 0, ['api', 'schema'])
+
+
+@pytest.mark.unit
+class TestShardedSearch:
+    """Test the concurrent per-type search and the merge of its hits"""
+
+    @staticmethod
+    def at_similarity(query, similarity, seed):
+        """A unit vector whose cosine similarity to the unit query is `similarity`"""
+        other = random_vectors(1, seed)[0]
+        other -= (other @ query) * query
+        other /= np.linalg.norm(other)
+        return similarity * query + np.sqrt(1 - similarity ** 2) * other
+
+    @pytest.fixture
+    def shards(self, generator):
+        query = generator.encode_query("entity schema")[0]
+        pdf_vectors = random_vectors(6, 1) * 0.1
+        pdf_vectors[0] = query
+        pdf_vectors[1] = self.at_similarity(query, 0.8, 11)
+        video_vectors = random_vectors(6, 2) * 0.1
+        video_vectors[0] = self.at_similarity(query, 0.97, 12)
+        video_vectors[1] = self.at_similarity(query, 0.7, 13)
+        write_shard(generator, 'pdf', pdf_vectors)
+        write_shard(generator, 'video', video_vectors)
+        return generator
+
+    def test_hits_are_merged_by_score_and_tagged(self, shards):
+        results = shards.sharded_search("entity schema", top_k=4, similarity_threshold=0.0)
+
+        assert [r['chunk_id'] for r in results] == ['pdf-0', 'video-0', 'pdf-1', 'video-1']
+        assert [r['shard'] for r in results] == ['pdf', 'video', 'pdf', 'video']
+        scores = [r['weighted_score'] for r in results]
+        assert scores == sorted(scores, reverse=True)
+        assert all(r['weighted_score'] == r['similarity_score'] for r in results)
+
+    def test_weights_reorder_the_merge(self, shards):
+        results = shards.sharded_search("entity schema", top_k=2, similarity_threshold=0.0,
+                                        shard_weights={'pdf': 0.5})
+
+        assert [r['chunk_id'] for r in results] == ['video-0', 'video-1']
+        pdf = shards.sharded_search("entity schema", ['pdf'], top_k=1, similarity_threshold=0.0,
+                                    shard_weights={'pdf': 0.5})[0]
+        assert pdf['weighted_score'] == pytest.approx(pdf['similarity_score'] * 0.5)
+
+    def test_filters_apply_per_shard_and_still_fill_top_k(self, shards):
+        # Only odd rows of the pdf shard pass; the video shard is unfiltered
+        results = shards.sharded_search(
+            "entity schema", top_k=3, similarity_threshold=-1.0,
+            shard_filters={'pdf': lambda r: r['metadata']['similarity_cluster'] == 1})
+
+        pdf_hits = [r['chunk_id'] for r in results if r['shard'] == 'pdf']
+        assert pdf_hits and all(int(chunk.split('-')[1]) % 2 for chunk in pdf_hits)
+        assert len(results) == 3
+
+        only_pdf = shards.sharded_search(
+            "entity schema", ['pdf'], top_k=3, similarity_threshold=-1.0,
+            shard_filters={'pdf': lambda r: r['metadata']['similarity_cluster'] == 1})
+        assert sorted(r['chunk_id'] for r in only_pdf) == ['pdf-1', 'pdf-3', 'pdf-5']
+        assert only_pdf[0]['chunk_id'] == 'pdf-1'
+
+    def test_threshold_drops_weak_hits(self, shards):
+        results = shards.sharded_search("entity schema", top_k=10, similarity_threshold=0.95)
+
+        assert [r['chunk_id'] for r in results] == ['pdf-0', 'video-0']
+
+    def test_missing_shards_are_skipped(self, shards):
+        assert shards.list_shards() == ['pdf', 'video']
+
+        results = shards.sharded_search("entity schema", ['missing', 'video'], top_k=1,
+                                        similarity_threshold=0.0)
+        assert [r['chunk_id'] for r in results] == ['video-0']
+        assert shards.sharded_search("entity schema", ['missing'], top_k=1) == []
+
+
+@pytest.mark.unit
+class TestUnifiedIndex:
+    """Test the streamed merge into the unified index and its fan-out search"""
+
+    def test_iter_json_array_streams_elements(self, tmp_path):
+        records = [{'text': 'a], [b', 'n': i, 'nested': {'list': [i, ',']}} for i in range(50)]
+        path = tmp_path / "records.json"
+        path.write_text(json.dumps(records, indent=2))
+
+        assert list(iter_json_array(path, read_size=7)) == records
+        (tmp_path / "empty.json").write_text(' [ ] ')
+        assert list(iter_json_array(tmp_path / "empty.json")) == []
+
+        (tmp_path / "truncated.json").write_text(json.dumps(records)[:-40])
+        with pytest.raises(ValueError):
+            list(iter_json_array(tmp_path / "truncated.json", read_size=16))
+
+    def test_unified_metadata_and_vectors_follow_the_shards(self, generator):
+        pdf = write_shard(generator, 'pdf', random_vectors(5, 1))
+        video = write_shard(generator, 'video', random_vectors(3, 2))
+
+        shards_file = generator.create_unified_index(['pdf', 'video'], block_size=2)
+
+        with open(shards_file) as f:
+            shards = json.load(f)
+        assert shards['total_vectors'] == 8
+        assert [(s['content_type'], s['start'], s['end']) for s in shards['shards']] == [
+            ('pdf', 0, 5), ('video', 5, 8)]
+
+        with open(generator.output_path / "metadata" / "unified_metadata.jsonl") as f:
+            rows = [json.loads(line) for line in f]
+        assert [row['chunk_id'] for row in rows] == [r['chunk_id'] for r in pdf + video]
+        assert [(row['content_type'], row['shard_row']) for row in rows[4:6]] == [('pdf', 4), ('video', 0)]
+
+        unified = np.load(generator.output_path / "vectors" / "unified_embeddings.npy")
+        assert unified.shape == (8, DIMENSION)
+        np.testing.assert_allclose(np.linalg.norm(unified, axis=1), 1.0, rtol=1e-5)
+        assert not (generator.output_path / "indices" / "unified_index.faiss").exists()
+
+    def test_unified_search_fans_out_over_shards(self, generator):
+        query = generator.encode_query("entity schema")[0]
+        pdf_vectors = random_vectors(5, 1)
+        pdf_vectors[3] = query
+        video_vectors = random_vectors(4, 2)
+        video_vectors[1] = query * 0.9 + random_vectors(1, 3)[0] * 0.1
+        write_shard(generator, 'pdf', pdf_vectors)
+        write_shard(generator, 'video', video_vectors)
+        generator.create_unified_index(['pdf', 'video'])
+
+        results = generator.semantic_search("entity schema", 'unified', top_k=2, similarity_threshold=0.0)
+        assert [(r['shard'], r['chunk_id']) for r in results] == [('pdf', 'pdf-3'), ('video', 'video-1')]
+        assert results[0]['similarity_score'] == pytest.approx(1.0, abs=1e-5)
+
+    def test_mismatched_metadata_is_skipped(self, generator):
+        write_shard(generator, 'pdf', random_vectors(4, 1))
+        write_shard(generator, 'video', random_vectors(3, 2), metadata_rows=2)
+
+        shards_file = generator.create_unified_index(['pdf', 'video', 'missing'])
+
+        assert generator.unified_shards() == ['pdf']
+        with open(shards_file) as f:
+            assert json.load(f)['total_vectors'] == 4
+        assert generator.create_unified_index(['video']) == ""
+
+
+@pytest.mark.unit
+class TestSemanticClustering:
+    """Test both clustering backends and warm starts from saved centroids"""
+
+    @pytest.mark.parametrize("backend", ["faiss", "minibatch"])
+    def test_clusters_are_found_and_saved(self, make_generator, backend):
+        generator = make_generator(clustering_backend=backend)
+        embeddings = blobs(200, 5)
+
+        labels = generator.perform_semantic_clustering(embeddings, [None] * 200, max_clusters=5,
+                                                       content_type='pdf')
+
+        centroids = generator.load_cluster_centroids('pdf')
+        assert centroids.shape == (5, DIMENSION)
+        # Every embedding is labelled with its nearest saved centroid
+        np.testing.assert_array_equal(labels, np.argmax(embeddings @ centroids.T, axis=1))
+        info = cluster_info(generator, 'pdf')
+        assert info['backend'] == backend
+        assert info['warm_start'] is False
+        assert sum(info['cluster_sizes']) == 200
+        np.testing.assert_array_equal(
+            np.load(generator.output_path / "clusters" / "pdf_labels.npy"), labels)
+
+    @pytest.mark.parametrize("backend", ["faiss", "minibatch"])
+    def test_rerun_warm_starts_from_saved_centroids(self, make_generator, backend):
+        generator = make_generator(clustering_backend=backend)
+        embeddings = blobs(200, 5)
+        first = generator.perform_semantic_clustering(embeddings, [None] * 200, max_clusters=5,
+                                                      content_type='pdf')
+
+        grown = blobs(260, 5)
+        second = generator.perform_semantic_clustering(grown, [None] * 260, max_clusters=5,
+                                                       content_type='pdf')
+
+        assert cluster_info(generator, 'pdf')['warm_start'] is True
+        # Starting from the saved centroids keeps the cluster numbering
+        np.testing.assert_array_equal(second[:200], first)
+
+    @pytest.mark.parametrize("backend", ["faiss", "minibatch"])
+    def test_changed_cluster_count_still_warm_starts(self, make_generator, backend):
+        generator = make_generator(clustering_backend=backend)
+        embeddings = blobs(300, 13)
+
+        for n_clusters in (10, 13, 7):
+            labels = generator.perform_semantic_clustering(embeddings, [None] * 300,
+                                                           max_clusters=n_clusters, content_type='pdf')
+            assert labels.max() < n_clusters
+            assert generator.load_cluster_centroids('pdf').shape == (n_clusters, DIMENSION)
+        assert cluster_info(generator, 'pdf')['warm_start'] is True
+
+    def test_fewer_clusters_keep_the_largest(self, generator):
+        embeddings = blobs(100, 4)
+        generator.perform_semantic_clustering(embeddings, [None] * 100, max_clusters=4, content_type='pdf')
+        saved = generator.load_cluster_centroids('pdf')
+
+        # Record uneven sizes, as if the clusters had grown differently
+        info = cluster_info(generator, 'pdf')
+        info['cluster_sizes'] = [5, 50, 10, 35]
+        with open(generator.output_path / "clusters" / "pdf_clusters.json", 'w') as f:
+            json.dump(info, f)
+
+        kept = generator.warm_start_centroids(saved, embeddings, 2, 'pdf')
+        np.testing.assert_array_equal(kept, saved[[1, 3]])
+
+    def test_more_clusters_add_sampled_embeddings(self, generator):
+        embeddings = blobs(50, 5)
+        saved = embeddings[:3].copy()
+
+        centroids = generator.warm_start_centroids(saved, embeddings, 5, 'pdf')
+
+        assert centroids.shape == (5, DIMENSION)
+        np.testing.assert_array_equal(centroids[:3], saved)
+        assert all(any(np.array_equal(row, e) for e in embeddings) for row in centroids[3:])
+
+    def test_other_dimension_clusters_from_scratch(self, generator):
+        embeddings = blobs(50, 5)
+        assert generator.warm_start_centroids(np.ones((5, DIMENSION + 1), np.float32),
+                                              embeddings, 5, 'pdf') is None
+        assert generator.warm_start_centroids(None, embeddings, 5, 'pdf') is None
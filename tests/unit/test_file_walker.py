@@ -0,0 +1,55 @@
+"""
+Unit tests for the pruned directory walker
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+from file_walker import FileWalker
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative in ["docs/guide.md", "docs/api/index.html", "docs/.draft.md", "script.py",
+                     "script.pyc", "node_modules/pkg/index.js", ".git/config",
+                     "output/report.md", "docs/__pycache__/cache.pyc"]:
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relative)
+    return tmp_path
+
+
+def relative_files(walker, root):
+    return sorted(os.path.relpath(entry.path, root) for entry in walker.files(root))
+
+
+@pytest.mark.unit
+class TestFileWalker:
+    """Test pruning and filtering of the shared walker"""
+
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_excluded_directories_and_patterns_are_pruned(self, tree, workers):
+        walker = FileWalker(exclude_patterns=['.*', '*.pyc'], skip_paths=[tree / "output"], workers=workers)
+        assert relative_files(walker, tree) == ["docs/api/index.html", "docs/guide.md", "script.py"]
+
+    def test_extensions_filter(self, tree):
+        assert relative_files(FileWalker(extensions=['.MD']), tree) == [
+            "docs/.draft.md", "docs/guide.md", "output/report.md"]
+
+    def test_walk_prunes_like_os_walk(self, tree, monkeypatch):
+        walker = FileWalker()
+        scanned = []
+        original_scan = walker._scan
+        monkeypatch.setattr(walker, "_scan", lambda directory: scanned.append(directory) or original_scan(directory))
+
+        for directory, dirs, files in walker.walk(tree):
+            dirs[:] = [entry for entry in dirs if entry.name != "docs"]
+
+        assert str(tree / "docs") not in scanned
+        assert str(tree / "node_modules") not in scanned
+        assert str(tree / "output") in scanned
@@ -0,0 +1,56 @@
+"""
+Unit tests for the shared keyword matcher
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+from keyword_matcher import KeywordMatcher
+
+
+@pytest.mark.unit
+class TestKeywordMatcher:
+    """Test that matches agree with per-keyword substring checks"""
+
+    GROUPS = {
+        'bpm': ['business process', 'workflow'],
+        'integration': ['api', 'webhook'],
+        'database': ['sql', 'schema'],
+    }
+
+    def test_matches_substring_checks(self):
+        matcher = KeywordMatcher([self.GROUPS, ['beginner', 'api']])
+        text = "Configure a Business Process that calls the REST APIs"
+        text_lower = text.lower()
+
+        matches = matcher.match(text)
+
+        assert matches.found == {k for k in matcher.keywords if k in text_lower}
+        assert matches.labels(self.GROUPS) == ['bpm', 'integration']
+        assert matches.count(['api', 'sql', 'business process']) == 2
+        assert not matches.has_any(['beginner'])
+
+    def test_shared_keywords_looked_up_once(self):
+        matcher = KeywordMatcher([self.GROUPS, ['api', 'sql']])
+
+        assert len(matcher.keywords) == len(set(matcher.keywords)) == 6
+
+    def test_same_text_reuses_match(self):
+        matcher = KeywordMatcher([self.GROUPS])
+        text = "workflow schema"
+
+        assert matcher.match(text) is matcher.match(text)
+        assert matcher.match("sql").found == {'sql'}
+
+    def test_overlapping_and_nested_keywords(self):
+        keywords = ['process', 'business process', 'pro', 'sql', 'sqlite', 'lite', 'api']
+        matcher = KeywordMatcher([keywords])
+        text = "A BUSINESS PROCESS stores rows in SQLite via Capital.Get()"
+
+        assert matcher.match(text).found == {
+            'process', 'business process', 'pro', 'sql', 'sqlite', 'lite', 'api'}
+        assert matcher.match("business pr, sq lite").found == {'lite'}
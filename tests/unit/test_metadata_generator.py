@@ -0,0 +1,83 @@
+"""
+Unit tests for incremental metadata generation
+"""
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from metadata_generator import MetadataGenerator
+
+
+@pytest.fixture
+def hub(tmp_path):
+    root = tmp_path / "hub"
+    (root / "docs").mkdir(parents=True)
+    for i in range(4):
+        (root / "docs" / f"guide_{i}.md").write_text(f"# Guide {i}\n\nCreatio business process {i} " * 20)
+    return root, tmp_path / "metadata_output"
+
+
+def run(root, output_dir, **kwargs):
+    generator = MetadataGenerator(str(root), str(output_dir), workers=1)
+    output = generator.generate_all_metadata(**kwargs)
+    generator.save_metadata(output)
+    return output
+
+
+@pytest.mark.unit
+class TestMetadataGenerator:
+    """Test incremental reruns and the file scan"""
+
+    def test_rerun_reuses_unchanged_files(self, hub):
+        root, output_dir = hub
+        first = run(root, output_dir)
+        assert first['generation_info']['files_generated'] == 4
+
+        changed = root / "docs" / "guide_2.md"
+        changed.write_text("# Rewritten\n\nworkflow designer " * 30)
+        stat = changed.stat()
+        os.utime(changed, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        (root / "docs" / "guide_3.md").unlink()
+
+        second = run(root, output_dir)
+        info = second['generation_info']
+        assert (info['files_generated'], info['files_unchanged']) == (1, 2)
+        assert second['metadata'][str(changed)]['title'] == "Rewritten"
+        assert str(root / "docs" / "guide_3.md") not in second['metadata']
+        for name in ("guide_0.md", "guide_1.md"):
+            key = str(root / "docs" / name)
+            assert second['metadata'][key]['metadata_generated'] == first['metadata'][key]['metadata_generated']
+
+        forced = run(root, output_dir, force=True)
+        assert forced['generation_info']['files_generated'] == 3
+
+    def test_output_directory_is_not_scanned(self, tmp_path):
+        root = tmp_path / "hub"
+        root.mkdir()
+        (root / "readme.md").write_text("# Readme")
+        run(root, root / "metadata_output")
+        assert run(root, root / "metadata_output")['generation_info']['total_files_processed'] == 1
+
+    def test_file_hash_is_streamed(self, tmp_path):
+        path = tmp_path / "video.mp4"
+        path.write_bytes(os.urandom(3 << 20))
+        generator = MetadataGenerator(str(tmp_path), str(tmp_path / "out"), workers=1)
+        assert generator.calculate_file_hash(path) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+    def test_related_files_follow_the_related_settings(self, hub):
+        root, output_dir = hub
+        generator = MetadataGenerator(str(root), str(output_dir), workers=1)
+        generator.max_related_files = 1
+        generator.save_metadata(generator.generate_all_metadata())
+        assert all(len(m['related_files']) == 1 for m in generator.file_metadata.values())
+
+        # No file changed, but related files found with other settings are recomputed
+        output = run(root, output_dir)
+        assert output['generation_info']['files_generated'] == 0
+        assert all(len(m['related_files']) == 3 for m in output['metadata'].values())
@@ -0,0 +1,76 @@
+"""
+Unit tests for the MinHash LSH index behind related-file detection
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+from minhash_lsh import MinHashLSH
+
+
+def tokens(start, stop):
+    return {f"word{i}" for i in range(start, stop)}
+
+
+def jaccard_pair(similarity, size=200, offset=0):
+    """Two token sets of `size` tokens with the given Jaccard similarity"""
+    shared = round(2 * size * similarity / (1 + similarity))
+    first = tokens(offset, offset + size)
+    second = tokens(offset, offset + shared) | tokens(offset + size, offset + 2 * size - shared)
+    return first, second
+
+
+@pytest.mark.unit
+class TestMinHashLSH:
+    """Test similarity estimates, bucket recall and query options"""
+
+    def test_band_layout_must_divide_the_signature(self):
+        with pytest.raises(ValueError):
+            MinHashLSH(num_perm=128, rows_per_band=3)
+        assert MinHashLSH(num_perm=256, rows_per_band=2).bands == 128
+
+    def test_estimates_track_jaccard_similarity(self):
+        index = MinHashLSH(num_perm=256, rows_per_band=2)
+        for similarity in (0.2, 0.5, 0.8):
+            first, second = jaccard_pair(similarity)
+            estimate = (index.signature(first) == index.signature(second)).mean()
+            assert estimate == pytest.approx(similarity, abs=0.08)
+
+    def test_query_ranks_candidates_and_leaves_out_the_key(self):
+        index = MinHashLSH(num_perm=256, rows_per_band=2)
+        base = tokens(0, 100)
+        index.add('base', base)
+        index.add('near', tokens(0, 90) | tokens(1000, 1010))
+        index.add('far', tokens(0, 40) | tokens(2000, 2060))
+        index.add('unrelated', tokens(5000, 5100))
+        index.add('empty', set())
+
+        results = index.query('base', threshold=0.1)
+        assert [key for key, _ in results] == ['near', 'far']
+        assert results[0][1] > results[1][1]
+        assert index.query('base', threshold=0.1, limit=1) == results[:1]
+        assert index.query('base', threshold=0.6) == results[:1]
+        assert len(index) == 4
+        assert index.query('empty', threshold=0.1) == []
+
+        # An unindexed token set is looked up without being added
+        assert [key for key, _ in index.query('new', threshold=0.5, tokens=base)] == ['base', 'near']
+
+        index.add('copy', base)
+        assert index.query('base', threshold=0.1)[0] == ('copy', 1.0)
+
+    def test_pairs_at_the_related_threshold_share_a_bucket(self):
+        # The metadata generator's layout: 128 bands of 2 rows for threshold 0.1
+        index = MinHashLSH(num_perm=256, rows_per_band=2)
+        pairs = 100
+        for pair in range(pairs):
+            first, second = jaccard_pair(0.15, offset=pair * 1000)
+            index.add((pair, 0), first)
+            index.add((pair, 1), second)
+
+        found = sum((pair, 1) in dict(index.query((pair, 0), threshold=0.0)) for pair in range(pairs))
+        assert found >= 85
@@ -0,0 +1,141 @@
+"""
+Unit tests for the content-addressed OCR cache, with Tesseract stubbed out
+"""
+import shutil
+import sys
+import types
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "search-index" / "engines"))
+
+# Only the stub below is ever called; Tesseract need not be installed
+sys.modules.setdefault('pytesseract', types.ModuleType('pytesseract'))
+
+import ocr_cache
+from ocr_cache import OCRCache, text_likelihood
+
+
+class FakeTesseract:
+    """Counts OCR runs and returns text derived from the image size"""
+
+    def __init__(self):
+        self.version = '5.3.0'
+        self.calls = 0
+
+    def get_tesseract_version(self):
+        return self.version
+
+    def image_to_string(self, image, lang, config):
+        self.calls += 1
+        return f"text {image.size[0]}x{image.size[1]} {lang}"
+
+
+@pytest.fixture
+def tesseract(monkeypatch):
+    fake = FakeTesseract()
+    monkeypatch.setattr(ocr_cache, 'pytesseract', fake)
+    return fake
+
+
+def write_text_image(path, lines=8):
+    image = Image.new('L', (600, 200), 255)
+    draw = ImageDraw.Draw(image)
+    for i in range(lines):
+        draw.text((10, 10 + i * 22), f"Configure the business process designer {i}", fill=0)
+    image.save(path)
+    return str(path)
+
+
+@pytest.mark.unit
+class TestOCRCache:
+    """Test cache hits, cache keys and the no-text pre-check"""
+
+    def test_cache_hit_after_restart(self, tmp_path, tesseract):
+        image = write_text_image(tmp_path / "slide.png")
+
+        cache = OCRCache(tmp_path / "ocr.db", workers=1)
+        first = cache.ocr_images([image])
+        cache.close()
+
+        cache = OCRCache(tmp_path / "ocr.db", workers=1)
+        assert cache.ocr_images([image]) == first == {image: 'text 600x200 eng'}
+        assert tesseract.calls == 1
+        assert cache.stats == {'hits': 1, 'misses': 0, 'skipped': 0, 'failed': 0}
+
+    def test_copied_image_hits_by_content(self, tmp_path, tesseract):
+        image = write_text_image(tmp_path / "slide.png")
+        copy = str(tmp_path / "renamed copy.png")
+        shutil.copy(image, copy)
+
+        cache = OCRCache(tmp_path / "ocr.db", workers=1)
+        texts = cache.ocr_images([image, copy])
+        assert texts[image] == texts[copy] == 'text 600x200 eng'
+        assert tesseract.calls == 1
+
+        another = str(tmp_path / "another copy.png")
+        shutil.copy(image, another)
+        assert cache.ocr_images([another]) == {another: 'text 600x200 eng'}
+        assert tesseract.calls == 1
+
+    def test_changed_settings_miss(self, tmp_path, tesseract):
+        image = write_text_image(tmp_path / "slide.png")
+        OCRCache(tmp_path / "ocr.db", workers=1).ocr_images([image])
+
+        assert OCRCache(tmp_path / "ocr.db", lang='deu', workers=1).ocr_images([image]) == {
+            image: 'text 600x200 deu'}
+        assert tesseract.calls == 2
+
+        tesseract.version = '5.4.0'
+        cache = OCRCache(tmp_path / "ocr.db", workers=1)
+        cache.ocr_images([image])
+        assert tesseract.calls == 3
+        assert cache.stats['misses'] == 1
+
+    def test_blank_and_gradient_images_are_skipped(self, tmp_path, tesseract):
+        blank = str(tmp_path / "blank.png")
+        Image.new('RGB', (400, 300), 'white').save(blank)
+        gradient = str(tmp_path / "gradient.png")
+        Image.linear_gradient('L').resize((400, 300)).save(gradient)
+
+        cache = OCRCache(tmp_path / "ocr.db", workers=1)
+        assert cache.ocr_images([blank, gradient]) == {blank: '', gradient: ''}
+        assert tesseract.calls == 0
+        assert cache.stats['skipped'] == 2
+
+    def test_tiny_images_score_zero(self):
+        for size in [(1, 1), (2, 2), (2000, 10), (1200, 4), (4, 1200)]:
+            assert text_likelihood(Image.new('L', size, 0)) == 0.0
+
+    def test_tiny_and_unreadable_images_do_not_abort_the_pass(self, tmp_path, tesseract):
+        paths = []
+        for size in [(1, 1), (2000, 10), (1200, 4)]:
+            path = str(tmp_path / f"tiny_{size[0]}x{size[1]}.png")
+            Image.new('RGB', size, 'black').save(path)
+            paths.append(path)
+        broken = str(tmp_path / "broken.png")
+        Path(broken).write_bytes(b'not an image')
+        image = write_text_image(tmp_path / "slide.png")
+
+        cache = OCRCache(tmp_path / "ocr.db", workers=1)
+        texts = cache.ocr_images(paths + [broken, image])
+        assert texts == {**{path: '' for path in paths}, broken: '', image: 'text 600x200 eng'}
+        assert cache.stats['skipped'] == 3
+        assert cache.stats['failed'] == 1
+
+        # Failures are not cached, so the broken image is retried
+        cache.ocr_images([broken])
+        assert cache.stats['failed'] == 2
+
+    def test_pool_failures_are_per_image(self, tmp_path, tesseract):
+        tiny = str(tmp_path / "tiny.png")
+        Image.new('RGB', (1, 1), 'black').save(tiny)
+        broken = str(tmp_path / "broken.png")
+        Path(broken).write_bytes(b'not an image')
+
+        cache = OCRCache(tmp_path / "ocr.db", workers=2)
+        assert cache.ocr_images([tiny, broken]) == {tiny: '', broken: ''}
+        assert cache.stats['failed'] >= 1
@@ -0,0 +1,150 @@
+"""
+Unit tests for page-parallel PDF extraction, on small generated PDFs
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+pytest.importorskip("PyPDF2")
+
+import document_processor
+import pdf_extractor
+from pdf_extractor import PAGES_PER_TASK, PDFTextExtractor, _extract_pages
+
+
+def write_pdf(path, pages):
+    """
+    Write a PDF whose pages are ('text', line), ('image', None) or ('blank', None);
+    image pages draw a 1x1 image and have no text layer
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Page tree, filled in once the page objects are numbered
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Type /XObject /Subtype /Image /Width 1 /Height 1 /ColorSpace /DeviceGray "
+        b"/BitsPerComponent 8 /Length 1 >>\nstream\n\x80\nendstream",
+    ]
+    kids = []
+    for kind, line in pages:
+        if kind == 'text':
+            resources = b"<< /Font << /F1 3 0 R >> >>"
+            content = b"BT /F1 12 Tf 72 720 Td (" + line.encode('latin-1') + b") Tj ET"
+        elif kind == 'image':
+            resources = b"<< /XObject << /Im1 4 0 R >> >>"
+            content = b"q 200 0 0 200 72 500 cm /Im1 Do Q"
+        else:
+            resources = b"<< >>"
+            content = b""
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources %s "
+                       b"/Contents %d 0 R >>" % (resources, len(objects)))
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(data))
+    return str(path)
+
+
+def page_line(number):
+    return f"Page {number} describes the business process designer"
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    """OCR every image-only page as 'OCR text N' without Tesseract or pdftoppm"""
+    def ocr_page(pdf_path, page_number, dpi, lang):
+        return page_number, f"OCR text {page_number + 1}"
+
+    monkeypatch.setattr(pdf_extractor, 'ocr_available', lambda: True)
+    monkeypatch.setattr(pdf_extractor, '_ocr_page', ocr_page)
+
+
+@pytest.mark.unit
+class TestPDFTextExtractor:
+    """Test page order, image-only page detection and OCR of those pages"""
+
+    def test_pages_keep_their_order_across_the_pool(self, tmp_path):
+        page_count = 2 * PAGES_PER_TASK + 3
+        pdf = write_pdf(tmp_path / "course.pdf", [('text', page_line(i + 1)) for i in range(page_count)])
+
+        with PDFTextExtractor(workers=2, ocr=False) as extractor:
+            extraction = extractor.extract(pdf)
+
+        assert extraction.page_count == page_count
+        for number, text in enumerate(extraction.pages, 1):
+            assert page_line(number) in text
+        assert extraction.text.index(page_line(2)) < extraction.text.index(page_line(page_count))
+        assert extraction.ocr_pages == []
+        assert extraction.method == 'PyPDF2'
+
+    def test_only_image_pages_without_text_need_ocr(self, tmp_path):
+        pdf = write_pdf(tmp_path / "mixed.pdf", [
+            ('text', page_line(1)), ('image', None), ('blank', None), ('text', 'Fig. 2'),
+        ])
+
+        results = _extract_pages(pdf, [0, 1, 2, 3])
+
+        assert [number for number, _, _ in results] == [0, 1, 2, 3]
+        # Page 4 has too little text to use, but draws no image either
+        assert [needs_ocr for _, _, needs_ocr in results] == [False, True, False, False]
+
+    def test_image_pages_are_ocred_in_place(self, tmp_path, fake_ocr):
+        pdf = write_pdf(tmp_path / "scanned.pdf", [
+            ('text', page_line(1)), ('image', None), ('blank', None), ('image', None),
+        ])
+
+        extraction = PDFTextExtractor(workers=1).extract(pdf)
+
+        assert extraction.ocr_pages == [1, 3]
+        assert extraction.pages[1:] == ['OCR text 2', '', 'OCR text 4']
+        assert extraction.method == 'PyPDF2+OCR'
+
+    def test_image_pages_are_left_empty_without_ocr(self, tmp_path):
+        pdf = write_pdf(tmp_path / "scanned.pdf", [('image', None), ('text', page_line(2))])
+
+        extraction = PDFTextExtractor(workers=1, ocr=False).extract(pdf)
+
+        assert extraction.pages[0] == ''
+        assert extraction.ocr_pages == []
+
+    def test_unreadable_pdf_raises(self, tmp_path):
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"%PDF-1.4\nnot really a PDF")
+
+        with pytest.raises(Exception):
+            PDFTextExtractor(workers=1).extract(broken)
+
+
+@pytest.mark.unit
+class TestDocumentProcessorOCR:
+    """Test how the document processor joins the OCRed pages"""
+
+    def test_ocr_pdf_joins_ocred_pages(self, tmp_path, fake_ocr, monkeypatch):
+        monkeypatch.setattr(document_processor, 'TESSERACT_AVAILABLE', True)
+        pdf = write_pdf(tmp_path / "scanned.pdf", [
+            ('image', None), ('text', page_line(2)), ('image', None),
+        ])
+        processor = document_processor.DocumentProcessor(output_dir=str(tmp_path / "out"), workers=1)
+
+        assert processor.ocr_pdf(Path(pdf)) == (
+            "\n--- Page 1 ---\nOCR text 1\n\n--- Page 3 ---\nOCR text 3\n")
+
+    def test_ocr_pdf_returns_nothing_for_unreadable_pdf(self, tmp_path):
+        broken = tmp_path / "broken.pdf"
+        broken.write_bytes(b"%PDF-1.4\nnot really a PDF")
+        processor = document_processor.DocumentProcessor(output_dir=str(tmp_path / "out"), workers=1)
+
+        assert processor.ocr_pdf(broken) == ""
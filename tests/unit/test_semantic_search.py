@@ -0,0 +1,172 @@
+"""
+Unit tests for the semantic search engine's neighbour table and saved index
+"""
+import sys
+import types
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+
+for module in ("faiss", "sentence_transformers"):
+    pytest.importorskip(module)
+
+# Load the engine without the package __init__, which needs Elasticsearch and Whoosh
+engines = types.ModuleType('engines')
+engines.__path__ = [str(ROOT / "search-index" / "engines")]
+sys.modules.setdefault('engines', engines)
+
+from engines import semantic_search
+from engines.semantic_search import SemanticSearchEngine
+
+DIMENSION = 16
+
+
+class FakeModel:
+    """Deterministic, unnormalized per-text vectors standing in for a sentence transformer"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def encode(self, texts):
+        return np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(DIMENSION)
+            for text in texts
+        ]).astype(np.float32)
+
+
+@pytest.fixture
+def make_engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic_search, 'SentenceTransformer', FakeModel)
+
+    def make():
+        return SemanticSearchEngine(index_path=str(tmp_path / "embeddings"))
+    return make
+
+
+def make_documents(count, start=0):
+    return [{'id': f"doc{i}", 'title': f"Doc {i}", 'content': f"Body of document {i}"}
+            for i in range(start, start + count)]
+
+
+def brute_force_neighbours(embeddings, k):
+    """The k most similar other documents of every document, by exact dot product"""
+    similarities = embeddings @ embeddings.T
+    np.fill_diagonal(similarities, -np.inf)
+    ids = np.argsort(-similarities, axis=1, kind='stable')[:, :k]
+    return ids, np.take_along_axis(similarities, ids, axis=1)
+
+
+@pytest.mark.unit
+class TestKnnGraph:
+    """Test the precomputed neighbour table against exact search"""
+
+    def test_table_matches_brute_force(self, make_engine):
+        engine = make_engine()
+        engine.create_document_embeddings(make_documents(40))
+
+        ids, scores = brute_force_neighbours(engine.embeddings, 10)
+        assert engine.knn_ids.shape == (40, 10)
+        np.testing.assert_array_equal(engine.knn_ids, ids)
+        np.testing.assert_allclose(engine.knn_scores.astype(np.float32), scores, atol=1e-3)
+
+    def test_small_collections_leave_empty_slots(self, make_engine):
+        engine = make_engine()
+        engine.create_document_embeddings(make_documents(4))
+
+        assert (engine.knn_ids[:, 3:] == -1).all()
+        assert (engine.knn_ids[:, :3] >= 0).all()
+        assert [len(engine.find_similar_documents(f"doc{i}")) for i in range(4)] == [3] * 4
+
+    def test_added_documents_match_a_full_rebuild(self, make_engine):
+        engine = make_engine()
+        engine.create_document_embeddings(make_documents(5))
+        for document in make_documents(30, start=5):
+            engine.add_document(document)
+        incremental_ids = engine.knn_ids.copy()
+        incremental_scores = engine.knn_scores.copy()
+
+        engine.build_knn_graph()
+
+        np.testing.assert_array_equal(incremental_ids, engine.knn_ids)
+        np.testing.assert_allclose(incremental_scores.astype(np.float32),
+                                   engine.knn_scores.astype(np.float32), atol=1e-3)
+
+    def test_table_answers_like_the_index(self, make_engine):
+        engine = make_engine()
+        engine.create_document_embeddings(make_documents(30))
+
+        from_table = engine.find_similar_documents('doc7', top_k=5, fields=['id'])
+        knn_ids, knn_scores = engine.knn_ids, engine.knn_scores
+        engine.knn_ids = engine.knn_scores = None
+        from_index = engine.find_similar_documents('doc7', top_k=5, fields=['id'])
+
+        assert [r['id'] for r in from_table] == [r['id'] for r in from_index]
+        assert 'doc7' not in [r['id'] for r in from_table]
+        np.testing.assert_allclose([r['similarity_score'] for r in from_table],
+                                   [r['similarity_score'] for r in from_index], atol=1e-3)
+
+        # Deeper than the table, the index is searched instead
+        engine.knn_ids, engine.knn_scores = knn_ids, knn_scores
+        assert len(engine.find_similar_documents('doc7', top_k=15)) == 15
+        assert engine.find_similar_documents('missing') == []
+
+    def test_table_is_reloaded_with_the_index(self, make_engine):
+        engine = make_engine()
+        engine.create_document_embeddings(make_documents(20))
+        engine.add_document(make_documents(1, start=20)[0])
+
+        reloaded = make_engine()
+        np.testing.assert_array_equal(reloaded.knn_ids, engine.knn_ids)
+        np.testing.assert_array_equal(reloaded.knn_scores, engine.knn_scores)
+
+
+@pytest.mark.unit
+class TestLoadIndex:
+    """Test that a reloaded index, its embeddings and the documents agree"""
+
+    @pytest.fixture
+    def saved(self, make_engine):
+        engine = make_engine()
+        engine.create_document_embeddings(make_documents(10))
+        return engine
+
+    def test_index_behind_the_documents_is_rebuilt(self, make_engine, saved):
+        # As if the index file had been restored from an older save
+        index_file = saved.index_path / 'faiss.index'
+        stale_index = index_file.read_bytes()
+        saved.add_document(make_documents(1, start=10)[0])
+        index_file.write_bytes(stale_index)
+
+        engine = make_engine()
+        assert engine.index.ntotal == len(engine.embeddings) == len(engine.store) == 11
+        assert engine.knn_ids.shape[0] == 11
+        assert engine.search("Body of document 10", top_k=1)[0]['id'] == 'doc10'
+        assert make_engine().index.ntotal == 11  # The repair was saved
+
+    def test_stale_embeddings_are_restored_from_the_index(self, make_engine, saved):
+        # As if the process stopped after saving the index but before the embeddings
+        np.save(saved.index_path / 'embeddings.npy', saved.embeddings[:7])
+
+        engine = make_engine()
+        np.testing.assert_allclose(engine.embeddings, saved.embeddings, atol=1e-6)
+        assert engine.find_similar_documents('doc3', top_k=3) == saved.find_similar_documents('doc3', top_k=3)
+
+    def test_missing_embeddings_are_restored_from_the_index(self, make_engine, saved):
+        (saved.index_path / 'embeddings.npy').unlink()
+
+        engine = make_engine()
+        np.testing.assert_allclose(engine.embeddings, saved.embeddings, atol=1e-6)
+
+    def test_nothing_matching_the_documents_is_refused(self, make_engine, saved):
+        # As if the process stopped after storing a document but before saving
+        saved.store.add({'id': 'orphan', 'content': 'Stored without an embedding'})
+
+        engine = make_engine()
+        assert engine.index is None
+        assert engine.embeddings is None
+        assert engine.load_index() is False
+        assert engine.search("Body of document 1") == []
@@ -0,0 +1,90 @@
+"""
+Unit tests for the sharded metadata search index
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "scripts" / "utilities"))
+
+from sharded_search_index import ShardedIndexReader, write_sharded_index
+
+
+def make_index(count):
+    index = {'files': {}, 'topics': {}, 'concepts': {}, 'categories': {}, 'extensions': {},
+             'index_generated': '2026-01-01T00:00:00+00:00'}
+    for i in range(count):
+        path = f"docs/file_{i}.md"
+        topics = [f"topic{i % 50}", "creatio"]
+        index['files'][path] = {'title': f"File {i}", 'searchable_text': f"file {i} " + " ".join(topics),
+                                'category': 'documents', 'topics': topics, 'concepts': []}
+        for topic in topics:
+            index['topics'].setdefault(topic, []).append(path)
+        index['categories'].setdefault('documents', []).append(path)
+        index['extensions'].setdefault('.md', []).append(path)
+    return index
+
+
+@pytest.mark.unit
+class TestShardedSearchIndex:
+    """Test shard lookups, reads and versioned rewrites"""
+
+    def test_lookups_match_the_monolithic_index(self, tmp_path):
+        index = make_index(1000)
+        write_sharded_index(index, tmp_path / "search_index", shard_size=100)
+        reader = ShardedIndexReader(tmp_path / "search_index")
+
+        assert len(reader) == 1000
+        for topic, paths in index['topics'].items():
+            assert reader.files('topics', topic) == paths
+        assert reader.find_file("docs/file_7.md")['title'] == "File 7"
+        assert reader.find_file("docs/missing.md") is None
+        assert reader.lookup('topics', 'unknown') == []
+        with pytest.raises(KeyError):
+            reader.lookup('authors', 'someone')
+
+    def test_only_needed_files_are_read(self, tmp_path):
+        write_sharded_index(make_index(1000), tmp_path / "search_index", shard_size=100)
+        reader = ShardedIndexReader(tmp_path / "search_index")
+
+        assert reader.lookup('topics', 'topic3')
+        assert reader.files_loaded == 1
+        assert [record['title'] for record in reader.search('file 5', limit=1)] == ["File 5"]
+        assert reader.files_loaded == 2
+
+        results = reader.search('topic3', topics='topic3')
+        assert len(results) == 20
+
+    def test_rewrite_replaces_the_index(self, tmp_path):
+        index_dir = tmp_path / "search_index"
+        write_sharded_index(make_index(300), index_dir, shard_size=100)
+        reader = ShardedIndexReader(index_dir)
+        write_sharded_index(make_index(50), index_dir, shard_size=100)
+
+        # A reader opened before the rewrite keeps loading its own version
+        assert len(reader) == 300
+        assert reader.find_file("docs/file_250.md")['title'] == "File 250"
+        assert len(ShardedIndexReader(index_dir)) == 50
+
+        write_sharded_index(make_index(20), index_dir, shard_size=100)
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["search_index"]
+        assert sorted(p.name for p in index_dir.iterdir()) == ["CURRENT", "v000002", "v000003"]
+        assert len(ShardedIndexReader(index_dir)) == 20
+
+    def test_flat_layout_is_read_and_replaced(self, tmp_path):
+        from sharded_search_index import current_version_dir
+
+        index_dir = tmp_path / "search_index"
+        write_sharded_index(make_index(30), index_dir, shard_size=100)
+        version_dir = current_version_dir(index_dir)
+        for path in version_dir.iterdir():
+            path.rename(index_dir / path.name)
+        version_dir.rmdir()
+        (index_dir / "CURRENT").unlink()
+        assert len(ShardedIndexReader(index_dir)) == 30
+
+        write_sharded_index(make_index(40), index_dir, shard_size=100)
+        assert sorted(p.name for p in index_dir.iterdir()) == ["CURRENT", "v000001"]
+        assert len(ShardedIndexReader(index_dir)) == 40